@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime
 
 from database import SessionLocal
 from models import Alert, ETF
+from services import admin_service
 from templating import templates
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -20,69 +20,35 @@ def get_db():
 
 
 @router.get("/alerts")
-def alert_history(request: Request, db: Session = Depends(get_db)):
+def alert_history(
+    request: Request,
+    cursor: str = "",
+    db: Session = Depends(get_db),
+):
     # -------------------------
-    # Alert history (last 10)
+    # Alert history (po 10, keyset puslapiai)
     # -------------------------
-    results = (
-        db.query(
-            Alert.id,
-            Alert.price,
-            Alert.created_at,
-            ETF.ticker,
-            ETF.ath_price,
-        )
-        .join(ETF, Alert.etf_id == ETF.id)
-        .order_by(Alert.created_at.desc())
-        .limit(10)
-        .all()
-    )
-
-    alerts = [
-        {
-            "id": r.id,
-            "price": float(r.price),
-            "created_at": r.created_at,
-            "ticker": r.ticker,
-            "ath_price": float(r.ath_price) if r.ath_price is not None else None,
-        }
-        for r in results
-    ]
+    page = admin_service.list_alerts(db, cursor=cursor or None, limit=10)
+    alerts = page["items"]
 
     # -------------------------
     # Alert settings + last alert price
     # -------------------------
     etfs = db.query(ETF).all()
 
-    last_alerts = (
-        db.query(
-            Alert.etf_id,
-            func.max(Alert.created_at).label("last_time"),
-        )
-        .group_by(Alert.etf_id)
-        .subquery()
-    )
-
-    last_prices = (
-        db.query(Alert.etf_id, Alert.price)
-        .join(
-            last_alerts,
-            (Alert.etf_id == last_alerts.c.etf_id)
-            & (Alert.created_at == last_alerts.c.last_time),
-        )
-        .all()
-    )
-
-    last_price_map = {etf_id: float(price) for etf_id, price in last_prices}
+    last_alerts = admin_service.last_alerts(db)
 
     for etf in etfs:
-        etf.last_alert_price = last_price_map.get(etf.id)
+        last = last_alerts.get(etf.id)
+        etf.last_alert_price = float(last["price"]) if last else None
 
     return templates.TemplateResponse(
         "admin/alerts.html",
         {
             "request": request,
             "alerts": alerts,
+            "next_cursor": page["next_cursor"],
+            "is_first_page": not cursor,
             "etfs": etfs,
         },
     )
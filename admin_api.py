@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Form
+from fastapi import APIRouter, Depends, HTTPException, File, Form, Request, UploadFile
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import datetime
+from sqlalchemy import func
+from datetime import date, datetime
+import io
 from sqlalchemy.exc import IntegrityError
 
 from database import SessionLocal
-from models import Alert, ETF, Purchase, PortfolioYTD
+from models import ETF, Purchase
+from services import admin_service
+from services.http_cache import cached_json
+from services.positions import refresh_position
+from services.price_history import invalidate_history
+from services.purchase_import import import_purchases
+from services.quote_cache import quote_cache
+from services.ytd_service import (
+    apply_purchase_change_to_ytd,
+    invalidate_current_year_ytd,
+)
 
 router = APIRouter(
     prefix="/admin/api",
@@ -23,16 +34,6 @@ def get_db():
     finally:
         db.close()
 
-# =========================================================
-# YTD INVALIDATION (CRITICAL)
-# =========================================================
-def invalidate_current_year_ytd(db: Session):
-    current_year = datetime.utcnow().year
-    db.query(PortfolioYTD).filter(
-        PortfolioYTD.year == current_year
-    ).delete()
-    db.commit()
-
 # =========================================================
 # HELPERS
 # =========================================================
@@ -42,7 +43,8 @@ def get_units_until(
     until_dt: datetime,
     exclude_id: int | None = None,
 ):
-    query = db.query(Purchase).filter(
+    # SUM DB pusėje, per (etf_id, purchased_at) indeksą
+    query = db.query(func.coalesce(func.sum(Purchase.units), 0.0)).filter(
         Purchase.etf_id == etf_id,
         Purchase.purchased_at <= until_dt,
     )
@@ -50,55 +52,75 @@ def get_units_until(
     if exclude_id is not None:
         query = query.filter(Purchase.id != exclude_id)
 
-    return sum(p.units for p in query.all())
+    return query.scalar()
 
 # =========================================================
 # GET /admin/api/alerts
 # =========================================================
 @router.get("/alerts")
-def get_alert_history(db: Session = Depends(get_db)):
-    results = (
-        db.query(
-            Alert.id,
-            ETF.ticker,
-            Alert.price,
-            ETF.ath_price,
-            Alert.created_at,
-        )
-        .join(ETF, Alert.etf_id == ETF.id)
-        .order_by(desc(Alert.created_at))
-        .all()
+def get_alert_history(
+    request: Request,
+    ticker: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+    db: Session = Depends(get_db),
+):
+    # ticker / ath_price ateina iš etfs – versija priklauso nuo abiejų
+    return cached_json(
+        request, db, ("alerts", "etfs"),
+        lambda: admin_service.list_alerts(
+            db, ticker, date_from, date_to, cursor, limit
+        ),
     )
 
-    return [
-        {
-            "id": r.id,
-            "ticker": r.ticker,
-            "price": r.price,
-            "ath_price": r.ath_price,
-            "created_at": r.created_at,
-        }
-        for r in results
-    ]
+# =========================================================
+# GET /admin/api/alerts/latest
+# =========================================================
+@router.get("/alerts/latest")
+def get_last_alerts(request: Request, db: Session = Depends(get_db)):
+    # Paskutinis alertas kiekvienam ETF – statuso lentelei, atskirai
+    # nuo puslapiuotos istorijos
+    return cached_json(
+        request, db, ("alerts", "etfs"),
+        lambda: list(admin_service.last_alerts(db).values()),
+    )
+
+# =========================================================
+# GET /admin/api/quotes/stats
+# =========================================================
+@router.get("/quotes/stats")
+def get_quote_cache_stats():
+    return quote_cache.stats()
+
+# =========================================================
+# POST /admin/api/history/{ticker}/invalidate
+# =========================================================
+@router.post("/history/{ticker}/invalidate")
+def invalidate_price_history(
+    ticker: str,
+    db: Session = Depends(get_db),
+):
+    """
+    Po split'o: ištrina visą saugotą istoriją ir ATH (bus parsiųsta /
+    apskaičiuotas iš naujo) ir pažymi YTD bazę pasenusia.
+    """
+    ticker = ticker.upper()
+    deleted = invalidate_history(db, ticker)
+    invalidate_current_year_ytd(db)
+
+    return {"status": "invalidated", "ticker": ticker, "deleted": deleted}
 
 # =========================================================
 # GET /admin/api/etfs
 # =========================================================
 @router.get("/etfs")
-def get_etfs(db: Session = Depends(get_db)):
-    etfs = db.query(ETF).all()
-
-    return [
-        {
-            "id": etf.id,
-            "ticker": etf.ticker,
-            "ath_price": etf.ath_price,
-            "drop_threshold": etf.drop_threshold,
-            "ath_alert_sent": etf.ath_alert_sent,
-            "manual_reset_at": etf.manual_reset_at,
-        }
-        for etf in etfs
-    ]
+def get_etfs(request: Request, db: Session = Depends(get_db)):
+    return cached_json(
+        request, db, ("etfs",),
+        lambda: admin_service.list_etfs(db),
+    )
 
 # =========================================================
 # POST /admin/api/etfs
@@ -152,27 +174,7 @@ def update_etf(
 # =========================================================
 @router.delete("/etfs/{etf_id}")
 def delete_etf(etf_id: int, db: Session = Depends(get_db)):
-    etf = db.query(ETF).filter(ETF.id == etf_id).first()
-    if not etf:
-        raise HTTPException(status_code=404, detail="ETF not found")
-
-    has_purchases = (
-        db.query(Purchase)
-        .filter(Purchase.etf_id == etf_id)
-        .count() > 0
-    )
-
-    if has_purchases:
-        raise HTTPException(
-            status_code=400,
-            detail="ETF cannot be deleted because it has purchases",
-        )
-
-    db.query(Alert).filter(Alert.etf_id == etf_id).delete()
-    db.delete(etf)
-    db.commit()
-
-    return {"status": "deleted", "id": etf_id}
+    return admin_service.delete_etf(db, etf_id)
 
 # =========================================================
 # PURCHASES (BUY / SELL)
@@ -210,49 +212,46 @@ def create_purchase(
     )
 
     db.add(purchase)
+    refresh_position(db, etf_id)
     db.commit()
-    invalidate_current_year_ytd(db)
+    apply_purchase_change_to_ytd(db, etf_id, new=(units, purchased_dt))
 
     # ✅ FIXED REDIRECT
     return RedirectResponse("/admin", status_code=303)
 
+# CSV importas – prieš /purchases/{purchase_id}, kad "import" nebūtų ID
+@router.post("/purchases/import")
+def import_purchases_csv(
+    file: UploadFile = File(...),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db),
+):
+    # Skaitoma srautu iš įkelto failo, ne visas turinys į atmintį
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    return import_purchases(db, lines, dry_run=dry_run)
+
 @router.get("/purchases")
-def list_purchases(etf_id: int | None = None, db: Session = Depends(get_db)):
-    query = db.query(Purchase)
-
-    if etf_id is not None:
-        query = query.filter(Purchase.etf_id == etf_id)
-
-    purchases = query.order_by(Purchase.id.asc()).all()
-
-    return [
-        {
-            "id": p.id,
-            "etf_id": p.etf_id,
-            "units": p.units,
-            "price": p.price,
-            "purchased_at": p.purchased_at,
-            "currency": p.currency,
-            "comment": p.comment,
-        }
-        for p in purchases
-    ]
+def list_purchases(
+    request: Request,
+    etf_id: int | None = None,
+    ticker: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+    db: Session = Depends(get_db),
+):
+    # ticker filtras jungia etfs
+    return cached_json(
+        request, db, ("purchases", "etfs"),
+        lambda: admin_service.list_purchases(
+            db, etf_id, ticker, date_from, date_to, cursor, limit
+        ),
+    )
 
 @router.get("/purchases/{purchase_id}")
 def get_purchase(purchase_id: int, db: Session = Depends(get_db)):
-    purchase = db.query(Purchase).filter(Purchase.id == purchase_id).first()
-    if not purchase:
-        raise HTTPException(status_code=404, detail="Purchase not found")
-
-    return {
-        "id": purchase.id,
-        "etf_id": purchase.etf_id,
-        "units": purchase.units,
-        "price": purchase.price,
-        "purchased_at": purchase.purchased_at,
-        "currency": purchase.currency,
-        "comment": purchase.comment,
-    }
+    return admin_service.get_purchase(db, purchase_id)
 
 @router.post("/purchases/{purchase_id}")
 def update_purchase(
@@ -286,26 +285,27 @@ def update_purchase(
             )
         units = -units
 
+    old_units = purchase.units
+    old_purchased_at = purchase.purchased_at
+
     purchase.units = units
     purchase.price = price
     purchase.purchased_at = purchased_dt
     purchase.currency = currency.upper()
     purchase.comment = comment
 
+    refresh_position(db, purchase.etf_id)
     db.commit()
-    invalidate_current_year_ytd(db)
+    apply_purchase_change_to_ytd(
+        db,
+        purchase.etf_id,
+        old=(old_units, old_purchased_at),
+        new=(units, purchased_dt),
+    )
 
     # ✅ FIXED REDIRECT
     return RedirectResponse("/admin", status_code=303)
 
 @router.delete("/purchases/{purchase_id}")
 def delete_purchase(purchase_id: int, db: Session = Depends(get_db)):
-    purchase = db.query(Purchase).filter(Purchase.id == purchase_id).first()
-    if not purchase:
-        raise HTTPException(status_code=404, detail="Purchase not found")
-
-    db.delete(purchase)
-    db.commit()
-    invalidate_current_year_ytd(db)
-
-    return {"status": "deleted", "id": purchase_id}
+    return admin_service.delete_purchase(db, purchase_id)
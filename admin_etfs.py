@@ -1,31 +1,28 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi.responses import RedirectResponse
-import requests
+from sqlalchemy.orm import Session
 
+from database import SessionLocal
+from services import admin_service
 from templating import templates
 
 router = APIRouter(prefix="/admin", tags=["admin-etfs"])
 
 
-def fetch_json(request: Request, path: str):
-    base_url = str(request.base_url).rstrip("/")
-    url = f"{base_url}{path}"
-
-    r = requests.get(url)
-    if r.status_code != 200:
-        raise HTTPException(
-            status_code=500,
-            detail=f"API error {r.status_code}: {r.text}"
-        )
-    return r.json()
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 
 # -------------------------
 # ETFs list (HTML)
 # -------------------------
 @router.get("/etfs")
-def etfs_list(request: Request):
-    etfs = fetch_json(request, "/admin/api/etfs")
+def etfs_list(request: Request, db: Session = Depends(get_db)):
+    etfs = admin_service.list_etfs(db)
 
     return templates.TemplateResponse(
         "admin/etfs.html",
@@ -56,12 +53,8 @@ def new_etf_form(request: Request):
 # Edit ETF form
 # -------------------------
 @router.get("/etfs/{etf_id}/edit")
-def edit_etf_form(etf_id: int, request: Request):
-    etfs = fetch_json(request, "/admin/api/etfs")
-    etf = next((e for e in etfs if e["id"] == etf_id), None)
-
-    if not etf:
-        raise HTTPException(status_code=404, detail="ETF not found")
+def edit_etf_form(etf_id: int, request: Request, db: Session = Depends(get_db)):
+    etf = admin_service.get_etf(db, etf_id)
 
     return templates.TemplateResponse(
         "admin/etf_form.html",
@@ -77,19 +70,14 @@ def edit_etf_form(etf_id: int, request: Request):
 # Delete ETF (POST wrapper)
 # -------------------------
 @router.post("/etfs/{etf_id}/delete")
-def delete_etf(etf_id: int, request: Request):
-    base_url = str(request.base_url).rstrip("/")
-    r = requests.delete(f"{base_url}/admin/api/etfs/{etf_id}")
-
-    if r.status_code != 200:
-        error_msg = "ETF cannot be deleted"
-
-        try:
-            error_msg = r.json().get("detail", error_msg)
-        except Exception:
-            pass
-
-        etfs = fetch_json(request, "/admin/api/etfs")
+def delete_etf(etf_id: int, request: Request, db: Session = Depends(get_db)):
+    try:
+        admin_service.delete_etf(db, etf_id)
+    except HTTPException as e:
+        db.rollback()
+        error_msg = e.detail or "ETF cannot be deleted"
+
+        etfs = admin_service.list_etfs(db)
 
         return templates.TemplateResponse(
             "admin/etfs.html",
@@ -0,0 +1,48 @@
+from datetime import date, datetime
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from services.data_export import (
+    EXPORTS,
+    MEDIA_TYPES,
+    available_formats,
+    build_statement,
+    stream_export,
+)
+
+router = APIRouter(
+    prefix="/admin/api/export",
+    tags=["admin-export"],
+)
+
+# DB dependency nereikia: eksporto generatorius atsidaro savo sesiją
+
+
+# =========================================================
+# GET /admin/api/export/{purchases|alerts|price_history}
+# =========================================================
+@router.get("/{name}")
+def export_table(
+    name: str,
+    format: str = "csv",
+    ticker: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    if name not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    if format not in available_formats():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format must be one of: {', '.join(available_formats())}",
+        )
+
+    stmt = build_statement(name, ticker, date_from, date_to)
+    filename = f"{name}_{datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+
+    return StreamingResponse(
+        stream_export(name, stmt, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
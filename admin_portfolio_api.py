@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from database import SessionLocal
-from models import ETF, Purchase
+from models import ETF, Position
+from services.chart_series import RANGE_NAMES, get_chart_series
+from services.nav_series import portfolio_nav_series, series_to_dict
 
 router = APIRouter(
     prefix="/admin/api/portfolio",
@@ -30,11 +35,11 @@ def get_etf_portfolio_summary(db: Session = Depends(get_db)):
         db.query(
             ETF.id,
             ETF.ticker,
-            func.coalesce(func.sum(Purchase.units * Purchase.price), 0).label("total_value"),
-            func.coalesce(func.sum(Purchase.units), 0).label("total_units"),
+            func.coalesce(Position.invested, 0).label("total_value"),
+            func.coalesce(Position.units, 0).label("total_units"),
         )
-        .outerjoin(Purchase, Purchase.etf_id == ETF.id)
-        .group_by(ETF.id, ETF.ticker)
+        # Materializuotos pozicijos – be GROUP BY per visą žurnalą
+        .outerjoin(Position, Position.etf_id == ETF.id)
         .order_by(ETF.ticker)
         .all()
     )
@@ -48,3 +53,42 @@ def get_etf_portfolio_summary(db: Session = Depends(get_db)):
         }
         for r in results
     ]
+
+
+# =========================================================
+# GET /admin/api/portfolio/nav
+# =========================================================
+@router.get("/nav")
+def get_portfolio_nav(
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Dienos NAV, investuoto kapitalo ir P/L eilutės (stulpeliais).
+    """
+    return series_to_dict(portfolio_nav_series(db, start, end))
+
+
+# =========================================================
+# GET /admin/api/portfolio/series
+# =========================================================
+@router.get("/series")
+def get_portfolio_chart_series(
+    range: str = "1y",
+    points: int = 200,
+    db: Session = Depends(get_db),
+):
+    """
+    Grafikams: NAV ir turimų ETF kainos, sumažintos iki `points` taškų.
+    """
+    if range not in RANGE_NAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"range must be one of {', '.join(RANGE_NAMES)}",
+        )
+
+    return Response(
+        content=get_chart_series(db, range, points),
+        media_type="application/json",
+    )
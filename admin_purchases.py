@@ -1,45 +1,64 @@
-from fastapi import APIRouter, Request, HTTPException
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Request, Depends
 from fastapi.responses import RedirectResponse
-import requests
+from sqlalchemy.orm import Session
 
+from database import SessionLocal
+from services import admin_service
 from templating import templates
 
 router = APIRouter(prefix="/admin", tags=["admin-purchases"])
 
 
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 @router.get("/__ping")
 def ping():
     return {"ok": True}
 
 
-def fetch_json(request: Request, path: str):
-    base_url = str(request.base_url).rstrip("/")
-    url = f"{base_url}{path}"
-
-    r = requests.get(url)
-    if r.status_code != 200:
-        raise HTTPException(
-            status_code=500,
-            detail=f"API error {r.status_code}: {r.text}"
-        )
-    return r.json()
-
-
 # -------------------------
 # Purchases list (HTML)
 # -------------------------
 @router.get("/purchases")
-def purchases_list(request: Request):
-    purchases = fetch_json(request, "/admin/api/purchases")
-    etfs = fetch_json(request, "/admin/api/etfs")
+def purchases_list(
+    request: Request,
+    ticker: str = "",
+    date_from: str = "",
+    date_to: str = "",
+    cursor: str = "",
+    db: Session = Depends(get_db),
+):
+    # Tušti formos laukai = be filtro
+    page = admin_service.list_purchases(
+        db,
+        ticker=ticker or None,
+        date_from=admin_service.parse_date(date_from, "date_from"),
+        date_to=admin_service.parse_date(date_to, "date_to"),
+        cursor=cursor or None,
+    )
+    etfs = admin_service.list_etfs(db)
 
     etf_map = {e["id"]: e["ticker"] for e in etfs}
+    filters = {"ticker": ticker, "date_from": date_from, "date_to": date_to}
 
     return templates.TemplateResponse(
         "admin/purchases.html",
         {
             "request": request,
-            "purchases": purchases,
+            "purchases": page["items"],
+            "next_cursor": page["next_cursor"],
+            "is_first_page": not cursor,
+            "filters": filters,
+            "filter_query": urlencode({k: v for k, v in filters.items() if v}),
+            "tickers": sorted(etf_map.values()),
             "etf_map": etf_map,
         },
     )
@@ -49,8 +68,8 @@ def purchases_list(request: Request):
 # New purchase form
 # -------------------------
 @router.get("/purchases/new")
-def new_purchase_form(request: Request):
-    etfs = fetch_json(request, "/admin/api/etfs")
+def new_purchase_form(request: Request, db: Session = Depends(get_db)):
+    etfs = admin_service.list_etfs(db)
 
     return templates.TemplateResponse(
         "admin/purchase_form.html",
@@ -68,9 +87,13 @@ def new_purchase_form(request: Request):
 # Edit purchase form
 # -------------------------
 @router.get("/purchases/{purchase_id}/edit")
-def edit_purchase_form(purchase_id: int, request: Request):
-    purchase = fetch_json(request, f"/admin/api/purchases/{purchase_id}")
-    etfs = fetch_json(request, "/admin/api/etfs")
+def edit_purchase_form(
+    purchase_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    purchase = admin_service.get_purchase(db, purchase_id)
+    etfs = admin_service.list_etfs(db)
 
     return templates.TemplateResponse(
         "admin/purchase_form.html",
@@ -88,12 +111,8 @@ def edit_purchase_form(purchase_id: int, request: Request):
 # Delete purchase (POST)
 # -------------------------
 @router.post("/purchases/{purchase_id}/delete")
-def delete_purchase_post(purchase_id: int, request: Request):
-    base_url = str(request.base_url).rstrip("/")
-    r = requests.delete(f"{base_url}/admin/api/purchases/{purchase_id}")
-
-    if r.status_code != 200:
-        raise HTTPException(status_code=500, detail=r.text)
+def delete_purchase_post(purchase_id: int, db: Session = Depends(get_db)):
+    admin_service.delete_purchase(db, purchase_id)
 
     return RedirectResponse("/admin/purchases", status_code=303)
 
@@ -102,11 +121,7 @@ def delete_purchase_post(purchase_id: int, request: Request):
 # Delete purchase (GET fallback – admin UI)
 # -------------------------
 @router.get("/purchases/{purchase_id}/delete")
-def delete_purchase_get(purchase_id: int, request: Request):
-    base_url = str(request.base_url).rstrip("/")
-    r = requests.delete(f"{base_url}/admin/api/purchases/{purchase_id}")
-
-    if r.status_code != 200:
-        raise HTTPException(status_code=500, detail=r.text)
+def delete_purchase_get(purchase_id: int, db: Session = Depends(get_db)):
+    admin_service.delete_purchase(db, purchase_id)
 
     return RedirectResponse("/admin/purchases", status_code=303)
@@ -0,0 +1,104 @@
+"""
+Admin HTML puslapių latencija per tikrą uvicorn serverį.
+
+„loopback“ stulpelis – kiek kainavo senasis kelias: puslapis + tie
+JSON API kvietimai, kuriuos handleris darydavo atgal į save
+(requests.get /admin/api/...). „tiesiogiai“ – dabartinis puslapis,
+kuris servisų sluoksnį kviečia procese.
+
+Paleidimas:
+    python -m benchmarks.bench_admin_pages [--requests 200] [--purchases 500]
+"""
+import argparse
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from benchmarks.common import use_temp_database
+from database import SessionLocal
+from models import ETF, Purchase
+
+PORT = 8765
+
+# puslapis → JSON API kvietimai, kuriuos darydavo senasis handleris
+PAGES = {
+    "/admin/purchases": ["/admin/api/purchases", "/admin/api/etfs"],
+    "/admin/etfs/1/edit": ["/admin/api/etfs"],
+}
+
+
+def seed(purchases: int):
+    db = SessionLocal()
+    db.add_all(ETF(ticker=f"T{i:02d}") for i in range(20))
+    db.commit()
+    start = datetime(2020, 1, 1)
+    db.add_all(
+        Purchase(
+            etf_id=1 + i % 20,
+            units=1.0,
+            price=100.0,
+            purchased_at=start + timedelta(days=i),
+            currency="EUR",
+        )
+        for i in range(purchases)
+    )
+    db.commit()
+    db.close()
+
+
+def start_server() -> uvicorn.Server:
+    from admin_api import router as admin_api_router
+    from admin_etfs import router as admin_etfs_router
+    from admin_purchases import router as admin_purchases_router
+
+    app = FastAPI()
+    app.include_router(admin_api_router)
+    app.include_router(admin_purchases_router)
+    app.include_router(admin_etfs_router)
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, port=PORT, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def timed(client: httpx.Client, paths: list[str]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        client.get(path).raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--purchases", type=int, default=500)
+    args = parser.parse_args()
+
+    use_temp_database()
+    seed(args.purchases)
+    server = start_server()
+
+    print(f"{'puslapis':<20} | {'loopback p50 ms':>15} | {'tiesiogiai p50 ms':>17}")
+    with httpx.Client(base_url=f"http://127.0.0.1:{PORT}") as client:
+        for page, api_calls in PAGES.items():
+            loopback = [timed(client, [page] + api_calls) for _ in range(args.requests)]
+            direct = [timed(client, [page]) for _ in range(args.requests)]
+            print(
+                f"{page:<20} | {statistics.median(loopback):>15.2f} | "
+                f"{statistics.median(direct):>17.2f}"
+            )
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+/admin/api/portfolio/series: atsakymo dydis ir laikas, kai saugomos
+istorijos vis daugiau. Palyginimui – kiek taškų būtų siunčiama be
+sumažinimo (dienos × (ETF + portfelis)).
+
+Paleidimas:
+    python -m benchmarks.bench_chart_series [--etfs 20] [--points 300]
+"""
+import argparse
+import time
+from datetime import date, datetime
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from benchmarks.common import fake_close, use_temp_database
+from database import SessionLocal
+from models import ETF, PriceHistory, Purchase
+from services import price_history
+from services.positions import rebuild_positions
+
+
+def seed(etf_count: int, years: int):
+    tickers = [f"T{i:03d}" for i in range(etf_count)]
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1),
+                           periods=years * 261)
+
+    db = SessionLocal()
+    db.query(PriceHistory).delete()
+    db.query(Purchase).delete()
+    db.query(ETF).delete()
+    db.add_all(ETF(id=i + 1, ticker=t) for i, t in enumerate(tickers))
+    db.flush()
+
+    db.execute(insert(PriceHistory), [
+        {"ticker": t, "date": d.date(), "open": c, "high": c, "low": c, "close": c}
+        for t in tickers
+        for d in dates
+        for c in (fake_close(t, d),)
+    ])
+    db.execute(insert(Purchase), [
+        {
+            "etf_id": 1 + i % etf_count,
+            "units": 1.0,
+            "price": 100.0,
+            "purchased_at": datetime.combine(dates[i * 20].date(), datetime.min.time()),
+            "currency": "EUR",
+        }
+        for i in range(len(dates) // 20)
+    ])
+    rebuild_positions(db)
+    db.commit()
+    db.close()
+
+    # Istorija jau vietoje – sinchronizacija šiandien nereikalinga
+    for t in tickers:
+        price_history._synced_on[t] = date.today()
+    price_history._bump_bars_version()
+
+    return len(dates)
+
+
+def timed_get(client: TestClient, url: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    response = client.get(url)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etfs", type=int, default=20)
+    parser.add_argument("--points", type=int, default=300)
+    args = parser.parse_args()
+
+    use_temp_database()
+    from admin_portfolio_api import router
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    series_url = f"/admin/api/portfolio/series?range=max&points={args.points}"
+
+    print(
+        f"{'metai':>5} | {'taškų be LTTB':>13} | {'taškų':>6} | {'KiB':>6} | "
+        f"{'šaltas ms':>9} | {'cache ms':>8}"
+    )
+    for years in (1, 3, 10):
+        days = seed(args.etfs, years)
+
+        cold_ms, size = timed_get(client, series_url)
+        warm_ms, _ = timed_get(client, series_url)
+
+        payload = client.get(series_url).json()
+        sent = len(payload["portfolio"]["dates"]) + sum(
+            len(t["dates"]) for t in payload["tickers"].values()
+        )
+        assert len(payload["portfolio"]["dates"]) <= args.points
+
+        print(
+            f"{years:>5} | {days * (args.etfs + 1):>13} | {sent:>6} | "
+            f"{size / 1024:>6.1f} | {cold_ms:>9.1f} | {warm_ms:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
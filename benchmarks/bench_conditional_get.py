@@ -0,0 +1,93 @@
+"""
+/admin/api/etfs ir /admin/api/alerts apklausa (polling):
+pilnas atsakymas iš DB vs cache'uotas 200 vs 304 Not Modified.
+
+Paleidimas:
+    python -m benchmarks.bench_conditional_get [--etfs 500] [--alerts 20000]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from benchmarks.common import use_temp_database
+from database import SessionLocal
+from models import Alert, ETF
+from services import http_cache
+
+
+def seed(etf_count: int, alert_count: int):
+    db = SessionLocal()
+    db.execute(insert(ETF), [
+        {"ticker": f"T{i:04d}", "ath_price": 100.0, "drop_threshold": 5.0}
+        for i in range(etf_count)
+    ])
+    start = datetime(2020, 1, 1)
+    db.execute(insert(Alert), [
+        {
+            "etf_id": 1 + i % etf_count,
+            "price": 90.0,
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(alert_count)
+    ])
+    db.commit()
+    db.close()
+
+
+def p50(client: TestClient, path: str, runs: int, headers=None, clear=False) -> tuple[float, int]:
+    timings = []
+    status = None
+    for _ in range(runs):
+        if clear:
+            http_cache._cache.clear()
+        start = time.perf_counter()
+        response = client.get(path, headers=headers or {})
+        timings.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+    return statistics.median(timings), status
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etfs", type=int, default=500)
+    parser.add_argument("--alerts", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    use_temp_database()
+    seed(args.etfs, args.alerts)
+
+    from admin_api import router
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    print(f"{'kelias':<18} | {'be cache ms':>11} | {'cache 200 ms':>12} | {'304 ms':>7}")
+    for path in ("/admin/api/etfs", "/admin/api/alerts"):
+        etag = client.get(path).headers["etag"]
+
+        cold, _ = p50(client, path, args.runs, clear=True)
+        warm, _ = p50(client, path, args.runs)
+        not_modified, status = p50(client, path, args.runs, {"If-None-Match": etag})
+        assert status == 304
+
+        print(f"{path:<18} | {cold:>11.2f} | {warm:>12.2f} | {not_modified:>7.2f}")
+
+    # Rašymas (kaip scheduleris – kitu keliu nei API) keičia ETag
+    etag = client.get("/admin/api/alerts").headers["etag"]
+    db = SessionLocal()
+    db.execute(insert(Alert), [{"etf_id": 1, "price": 80.0, "created_at": datetime.utcnow()}])
+    db.commit()
+    db.close()
+    response = client.get("/admin/api/alerts", headers={"If-None-Match": etag})
+    print(f"po naujo alerto: {response.status_code}, ETag {etag} → {response.headers['etag']}")
+
+
+if __name__ == "__main__":
+    main()
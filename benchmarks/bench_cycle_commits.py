@@ -0,0 +1,138 @@
+"""
+Scheduler ciklo DB kaina: commit'ų / SQL sakinių skaičius ir trukmė.
+Lyginama senoji schema (sesija + commit kiekvienam pakeitimui)
+su vienu unit of work per ciklą.
+
+Paleidimas:
+    python -m benchmarks.bench_cycle_commits [--etfs 500]
+"""
+import argparse
+import contextlib
+import io
+import time
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from benchmarks.common import fake_price, use_temp_database
+from database import SessionLocal
+from models import Alert, ETF
+import scheduler
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.commits = 0
+        self.statements = 0
+        event.listen(engine, "commit", self._on_commit)
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def _on_execute(self, conn, cursor, statement, params, context, executemany):
+        self.statements += 1
+
+    def reset(self):
+        self.commits = 0
+        self.statements = 0
+
+
+def seed(count: int) -> dict[str, float]:
+    """
+    Pusė ETF pasiekia naują ATH, kita pusė – krenta > slenksčio (alertas).
+    Grąžina ciklo kainų žemėlapį.
+    """
+    db = SessionLocal()
+    db.query(Alert).delete()
+    db.query(ETF).delete()
+
+    prices = {}
+    for i in range(count):
+        ticker = f"T{i:04d}"
+        price = fake_price(ticker)
+        ath = price * 0.95 if i % 2 == 0 else price * 1.2
+        db.add(ETF(ticker=ticker, ath_price=ath, drop_threshold=5.0))
+        prices[ticker] = price
+
+    db.commit()
+    db.close()
+    return prices
+
+
+def legacy_cycle(prices: dict[str, float]):
+    """
+    Senojo kodo atkartojimas: kiekvienas ATH / alert pakeitimas –
+    atskira SessionLocal() + merge + commit, ir dar išorinis commit.
+    """
+    db = SessionLocal()
+    try:
+        for etf in db.query(ETF).all():
+            price = prices[etf.ticker]
+
+            if price > etf.ath_price:
+                inner = SessionLocal()
+                etf.ath_price = price
+                etf.ath_alert_sent = False
+                etf.manual_reset_at = None
+                inner.merge(etf)
+                inner.commit()
+                inner.close()
+                db.commit()
+                continue
+
+            drop = (etf.ath_price - price) / etf.ath_price * 100
+            if drop < etf.drop_threshold or etf.ath_alert_sent:
+                continue
+
+            inner = SessionLocal()
+            inner.execute(
+                text(
+                    "INSERT INTO alerts (etf_id, price, created_at) "
+                    "VALUES (:etf_id, :price, :created_at)"
+                ),
+                {"etf_id": etf.id, "price": price, "created_at": datetime.utcnow()},
+            )
+            etf.ath_alert_sent = True
+            inner.merge(etf)
+            inner.commit()
+            inner.close()
+            db.commit()
+    finally:
+        db.close()
+
+
+def measure(counter: StatementCounter, run) -> tuple[float, int, int]:
+    counter.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run()
+    return time.perf_counter() - start, counter.commits, counter.statements
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etfs", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = use_temp_database()
+    counter = StatementCounter(engine)
+
+    prices = seed(args.etfs)
+    legacy = measure(counter, lambda: legacy_cycle(prices))
+
+    prices = seed(args.etfs)
+    scheduler.collect_current_prices = lambda tickers: (prices, [])
+    scheduler.quote_cache.persist = False
+    batched = measure(counter, scheduler.check_etf_prices)
+
+    print(f"{'ciklas':<16} | {'s':>8} | {'commit':>7} | {'SQL':>6}")
+    for name, (seconds, commits, statements) in (
+        ("po commit'ą", legacy),
+        ("unit of work", batched),
+    ):
+        print(f"{name:<16} | {seconds:>8.3f} | {commits:>7} | {statements:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Laiškų outbox prieš vietinį SMTP (aiosmtpd, tik benchmarkui:
+pip install aiosmtpd).
+
+1) Ciklo trukmė, kai SMTP lėtas: siuntimas cikle vs įrašymas į outbox
+2) Iškrovimas: naujas prisijungimas kiekvienam laiškui vs vienas
+   pernaudojamas prisijungimas batch'ui
+3) Gedimai: serveris nepasiekiamas → atidėjimas → pristatymas be
+   dublikatų; 5xx gavėjas → nebekartojama
+
+Paleidimas:
+    python -m benchmarks.bench_email_outbox [--etfs 200] [--smtp-delay 1.0] [--messages 200]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import smtplib
+import socket
+import time
+from datetime import datetime
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Prieš email_service importą: SMTP – vietinis aiosmtpd be TLS / AUTH
+SMTP_PORT = _free_port()
+os.environ["MAIL_SERVER"] = "127.0.0.1"
+os.environ["MAIL_PORT"] = str(SMTP_PORT)
+os.environ["MAIL_STARTTLS"] = "0"
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+
+from benchmarks.common import FakeYahoo, fake_price, install_fake_yahoo, use_temp_database  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from models import ETF, EmailOutbox  # noqa: E402
+import scheduler  # noqa: E402
+from services import email_outbox  # noqa: E402
+from services.email_outbox import drain_outbox, enqueue_email  # noqa: E402
+
+REJECTED = "bounce@example.com"
+
+
+class Handler:
+    def __init__(self):
+        self.delay = 0.0
+        self.received = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED:
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(envelope.content)
+        return "250 Message accepted"
+
+
+def start_server(handler: Handler) -> Controller:
+    controller = Controller(handler, hostname="127.0.0.1", port=SMTP_PORT)
+    controller.start()
+    return controller
+
+
+def seed_etfs(count: int):
+    # Visi ETF gerokai žemiau ATH → kiekvienas ciklas sukuria alertus
+    db = SessionLocal()
+    db.query(ETF).delete()
+    for i in range(count):
+        ticker = f"M{i:04d}"
+        db.add(ETF(ticker=ticker, ath_price=fake_price(ticker) * 1.5))
+    db.commit()
+    db.close()
+
+
+def reset_outbox():
+    db = SessionLocal()
+    db.query(EmailOutbox).delete()
+    db.commit()
+    db.close()
+
+
+def outbox_rows() -> list[EmailOutbox]:
+    db = SessionLocal()
+    try:
+        return db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+    finally:
+        db.close()
+
+
+def make_due():
+    # „Praleidžiam“ backoff laiką
+    db = SessionLocal()
+    db.execute(update(EmailOutbox).values(next_attempt_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+
+def enqueue_many(count: int, recipients=None):
+    db = SessionLocal()
+    for i in range(count):
+        enqueue_email(db, f"Test {i}", f"Laiškas {i}\n", recipients)
+    db.commit()
+    db.close()
+
+
+def quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+# =========================================================
+# 1) Ciklas su lėtu SMTP
+# =========================================================
+def bench_cycle(handler: Handler, etfs: int, smtp_delay: float):
+    seed_etfs(etfs)
+    reset_outbox()
+    handler.delay = smtp_delay
+
+    start = time.perf_counter()
+    quiet(scheduler.check_etf_prices)
+    cycle_s = time.perf_counter() - start
+
+    # Senasis kelias: ciklas + laiško siuntimas tame pačiame thread'e
+    start = time.perf_counter()
+    result = quiet(drain_outbox)
+    send_s = time.perf_counter() - start
+    handler.delay = 0.0
+
+    print(f"SMTP atsako per {smtp_delay:.1f} s, ETF: {etfs}")
+    print(f"  ciklas + siuntimas cikle: {cycle_s + send_s:>7.3f} s")
+    print(f"  ciklas su outbox:         {cycle_s:>7.3f} s (laiškas išsiųstas atskirai: {result['sent']})")
+
+
+# =========================================================
+# 2) Iškrovimas: prisijungimų pernaudojimas
+# =========================================================
+def send_one_connection_each(count: int):
+    rows = outbox_rows()[:count]
+    for row in rows:
+        with smtplib.SMTP("127.0.0.1", SMTP_PORT) as smtp:
+            smtp.send_message(email_outbox._message(row))
+
+
+def bench_drain(handler: Handler, messages: int, batch: int):
+    reset_outbox()
+    enqueue_many(messages)
+    email_outbox.close_smtp()
+
+    start = time.perf_counter()
+    send_one_connection_each(messages)
+    per_message_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sent = 0
+    while sent < messages:
+        result = quiet(drain_outbox, batch)
+        if not result["sent"]:
+            break
+        sent += result["sent"]
+    reused_s = time.perf_counter() - start
+
+    print(f"Iškrovimas, {messages} laiškų:")
+    print(f"  prisijungimas kiekvienam:  {per_message_s:>7.3f} s ({messages / per_message_s:>7.0f} laiškų/s)")
+    print(f"  vienas, po {batch:<3} batch'e:   {reused_s:>7.3f} s ({sent / reused_s:>7.0f} laiškų/s)")
+
+
+# =========================================================
+# 3) Gedimai
+# =========================================================
+def bench_faults(handler: Handler, controller: Controller) -> Controller:
+    reset_outbox()
+    enqueue_many(10)
+    enqueue_many(1, [REJECTED])
+    handler.received.clear()
+
+    controller.stop()
+    email_outbox.close_smtp()
+    down = quiet(drain_outbox, 50)
+    attempts = {row.attempts for row in outbox_rows()}
+
+    controller = start_server(handler)
+    not_due = quiet(drain_outbox, 50)
+    make_due()
+    up = quiet(drain_outbox, 50)
+    make_due()
+    again = quiet(drain_outbox, 50)
+
+    rows = outbox_rows()
+    delivered = sum(1 for row in rows if row.sent_at is not None)
+    bounced = [row for row in rows if row.sent_at is None]
+
+    print("Gedimai:")
+    print(f"  serveris išjungtas:  atidėta {down['deferred']}, bandymai {sorted(attempts)}")
+    print(f"  prieš backoff:       išsiųsta {not_due['sent']}")
+    print(f"  serveris įjungtas:   išsiųsta {up['sent']}, atidėta {up['deferred']}")
+    print(f"  pakartotinai:        išsiųsta {again['sent']}, atidėta {again['deferred']}")
+    ok = delivered == 10 and len(handler.received) == 10 and len(bounced) == 1
+    print(
+        f"  {'✅' if ok else '❌'} pristatyta {delivered}/10, gauta serveryje "
+        f"{len(handler.received)}, 5xx: {bounced[0].attempts if bounced else '-'} "
+        f"bandymas(-ai), {bounced[0].last_error if bounced else ''}"
+    )
+    return controller
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etfs", type=int, default=200)
+    parser.add_argument("--smtp-delay", type=float, default=1.0)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    use_temp_database()
+    install_fake_yahoo(FakeYahoo(latency=0, per_ticker=0))
+
+    handler = Handler()
+    controller = start_server(handler)
+    try:
+        bench_cycle(handler, args.etfs, args.smtp_delay)
+        bench_drain(handler, args.messages, args.batch)
+        controller = bench_faults(handler, controller)
+    finally:
+        email_outbox.close_smtp()
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
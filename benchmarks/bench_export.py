@@ -0,0 +1,104 @@
+"""
+Srautinis eksportas vs pilnas sąrašas atmintyje.
+
+Matuojama: laikas iki pirmų baitų, visas laikas ir atminties pikas
+(tracemalloc) – generatorius skaitomas tiesiogiai, nes TestClient
+StreamingResponse atsakymą surenka visą.
+
+Paleidimas:
+    python -m benchmarks.bench_export [--rows 1000000]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from benchmarks.common import use_temp_database
+from database import SessionLocal
+from models import ETF, Purchase
+from services import admin_service
+from services.data_export import available_formats, build_statement, stream_export
+
+
+def seed(rows: int, etfs: int = 50):
+    db = SessionLocal()
+    db.execute(insert(ETF), [{"ticker": f"T{i:02d}"} for i in range(etfs)])
+    start = datetime(2010, 1, 1)
+    for offset in range(0, rows, 100_000):
+        n = min(100_000, rows - offset)
+        db.execute(insert(Purchase.__table__), [
+            {
+                "etf_id": 1 + (offset + i) % etfs,
+                "units": 1.0 if (offset + i) % 5 else -0.5,
+                "price": 100.0,
+                "purchased_at": start + timedelta(minutes=offset + i),
+                "currency": "EUR",
+                "comment": "",
+            }
+            for i in range(n)
+        ])
+    db.commit()
+    db.close()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(start)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def consume(fmt: str):
+    def run(start):
+        first = None
+        size = 0
+        for chunk in stream_export("purchases", build_statement("purchases"), fmt):
+            if first is None and chunk:
+                first = time.perf_counter() - start
+            size += len(chunk)
+        return first, size
+    return run
+
+
+def full_list(start):
+    db = SessionLocal()
+    items = [admin_service.purchase_to_dict(p) for p in db.query(Purchase).all()]
+    db.close()
+    return None, len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    seed(args.rows)
+
+    print(f"{'būdas':<14} | {'1-i baitai ms':>13} | {'viso s':>7} | {'atm. pikas MiB':>14} | {'MiB':>7}")
+    for fmt in available_formats():
+        (first, size), elapsed, peak = measure(consume(fmt))
+        print(
+            f"{'export ' + fmt:<14} | {first * 1000:>13.1f} | {elapsed:>7.2f} | "
+            f"{peak:>14.1f} | {size / 1024 / 1024:>7.1f}"
+        )
+
+    (_, count), elapsed, peak = measure(full_list)
+    print(f"{'pilnas sąrašas':<14} | {'-':>13} | {elapsed:>7.2f} | {peak:>14.1f} | {'-':>7}")
+
+    if "parquet" in available_formats():
+        import pyarrow.parquet as pq
+
+        data = b"".join(stream_export("purchases", build_statement("purchases"), "parquet"))
+        table = pq.read_table(io.BytesIO(data))
+        print(f"parquet eilučių: {table.num_rows} (DB: {count})")
+
+
+if __name__ == "__main__":
+    main()
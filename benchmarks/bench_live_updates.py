@@ -0,0 +1,120 @@
+"""
+SSE apkrovos testas: daug vienu metu prisijungusių dashboardų,
+scheduleris publikuoja įvykius iš savo thread'o.
+
+Matuojama: ar kiekvienas klientas gavo kiekvieną įvykį, pristatymo
+vėlinimas (publish → kliento gavimas) ir kiek kainuoja vienas publish.
+
+Paleidimas:
+    python -m benchmarks.bench_live_updates [--subscribers 500] [--events 20]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from live_api import router as live_api_router
+from services.live_updates import broker
+
+PORT = 8766
+
+
+def start_server() -> uvicorn.Server:
+    app = FastAPI()
+    app.include_router(live_api_router)
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, port=PORT, log_level="warning", timeout_graceful_shutdown=1)
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def subscriber(client: httpx.AsyncClient, expected: int, latencies: list, ready: list):
+    received = 0
+    async with client.stream("GET", "/api/live/stream") as response:
+        ready.append(1)
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = json.loads(line[len("data: "):])
+            latencies.append(time.time() - data["sent"])
+            received += 1
+            if received == expected:
+                return received
+    return received
+
+
+def publisher(events: int, interval: float, publish_costs: list):
+    # Kaip scheduleris: publikuoja iš atskiro (ne asyncio) thread'o
+    for seq in range(events):
+        time.sleep(interval)
+        start = time.perf_counter()
+        broker.publish("prices", {"seq": seq, "sent": time.time(), "prices": {"VOO": 500.0 + seq}})
+        publish_costs.append(time.perf_counter() - start)
+
+
+async def run(subscribers: int, events: int, interval: float):
+    latencies: list[float] = []
+    ready: list[int] = []
+    publish_costs: list[float] = []
+
+    limits = httpx.Limits(max_connections=subscribers + 10)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=None
+    ) as client:
+        tasks = [
+            asyncio.create_task(subscriber(client, events, latencies, ready))
+            for _ in range(subscribers)
+        ]
+
+        while broker.subscriber_count() < subscribers:
+            await asyncio.sleep(0.05)
+
+        thread = threading.Thread(target=publisher, args=(events, interval, publish_costs))
+        start = time.perf_counter()
+        thread.start()
+        received = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        thread.join()
+
+    return received, latencies, publish_costs, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = start_server()
+    received, latencies, costs, elapsed = asyncio.run(
+        run(args.subscribers, args.events, args.interval)
+    )
+    server.should_exit = True
+
+    latencies.sort()
+    delivered = sum(received)
+    expected = args.subscribers * args.events
+
+    print(f"{args.subscribers} prenumeratorių × {args.events} įvykių per {elapsed:.1f} s")
+    print(f"pristatyta {delivered}/{expected}")
+    print(
+        f"vėlinimas p50 {statistics.median(latencies) * 1000:.1f} ms | "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms | "
+        f"max {latencies[-1] * 1000:.1f} ms"
+    )
+    print(f"publish (fan-out) p50 {statistics.median(costs) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+NAV laiko eilutė: vienas vektorizuotas perėjimas vs skaičiavimas
+kiekvienai dienai atskirai (kaip calculate_portfolio() kas dieną).
+
+Paleidimas:
+    python -m benchmarks.bench_nav_series [--years 10] [--etfs 50] [--trades 10000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.nav_series import compute_nav_series
+
+
+def synthetic(years: int, etfs: int, trade_count: int, seed: int = 42):
+    rnd = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=years * 261)
+    tickers = [f"T{i:03d}" for i in range(etfs)]
+
+    walk = np.exp(np.cumsum(rnd.normal(0, 0.01, (len(dates), etfs)), axis=0))
+    prices = pd.DataFrame(100 * walk, index=dates, columns=tickers)
+
+    # Kalendorinės dienos – dalis sandorių patenka į savaitgalius
+    span = (dates[-1] - dates[0]).days
+    days = dates[0] + pd.to_timedelta(rnd.integers(0, span, trade_count), unit="D")
+    trades = pd.DataFrame({
+        "ticker": rnd.choice(tickers, trade_count),
+        "date": days,
+        "units": rnd.uniform(0.1, 5, trade_count).round(4),
+    })
+    trades["cash"] = trades["units"] * rnd.uniform(50, 500, trade_count)
+
+    return trades, prices
+
+
+def per_day(trades: pd.DataFrame, prices: pd.DataFrame) -> np.ndarray:
+    """
+    Senasis būdas: kiekvienai dienai – pozicijos iš žurnalo iš naujo.
+    """
+    nav = np.empty(len(prices))
+    for i, day in enumerate(prices.index):
+        held = trades[trades["date"] <= day].groupby("ticker")["units"].sum()
+        nav[i] = (held * prices.loc[day, held.index]).sum()
+    return nav
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--etfs", type=int, default=50)
+    parser.add_argument("--trades", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    trades, prices = synthetic(args.years, args.etfs, args.trades)
+    print(f"{len(prices)} dienų × {args.etfs} ETF, {args.trades} sandorių")
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        series = compute_nav_series(trades, prices)
+        timings.append(time.perf_counter() - start)
+    print(f"vektorizuotai | p50 {np.median(timings) * 1000:>8.2f} ms")
+
+    # Kitos dienos taisyklė: savaitgalio sandoris įskaitomas pirmadienį
+    aligned = trades.copy()
+    aligned["date"] = prices.index[
+        np.clip(prices.index.searchsorted(aligned["date"]), 0, len(prices) - 1)
+    ]
+
+    start = time.perf_counter()
+    expected = per_day(aligned, prices)
+    print(f"kas dieną     |     {(time.perf_counter() - start) * 1000:>8.2f} ms")
+
+    diff = np.abs(series["nav"].to_numpy() - expected).max()
+    print(f"didžiausias NAV skirtumas: {diff:.6f}")
+
+
+if __name__ == "__main__":
+    main()
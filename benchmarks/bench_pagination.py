@@ -0,0 +1,92 @@
+"""
+Keyset puslapiavimas: puslapio kaina nepriklauso nuo lentelės dydžio
+ir nuo to, kiek giliai puslapiuojama.
+
+Paleidimas:
+    python -m benchmarks.bench_pagination [--rows 200000] [--limit 50]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from benchmarks.common import use_temp_database
+from database import SessionLocal
+from models import Alert, ETF, Purchase
+from services import admin_service
+
+
+def seed(rows: int):
+    db = SessionLocal()
+    db.execute(insert(ETF), [{"ticker": f"T{i:02d}"} for i in range(50)])
+    start = datetime(2015, 1, 1)
+    for offset in range(0, rows, 50_000):
+        n = min(50_000, rows - offset)
+        db.execute(insert(Alert), [
+            {"etf_id": 1 + i % 50, "price": 1.0, "created_at": start + timedelta(minutes=5 * (offset + i))}
+            for i in range(n)
+        ])
+        db.execute(insert(Purchase), [
+            {
+                "etf_id": 1 + i % 50,
+                "units": 1.0,
+                "price": 1.0,
+                "purchased_at": start + timedelta(hours=offset + i),
+                "currency": "EUR",
+            }
+            for i in range(n)
+        ])
+    db.commit()
+    db.close()
+
+
+def walk(list_fn, limit: int, pages: int) -> list[float]:
+    db = SessionLocal()
+    timings = []
+    cursor = None
+    for _ in range(pages):
+        start = time.perf_counter()
+        page = list_fn(db, cursor=cursor, limit=limit)
+        timings.append((time.perf_counter() - start) * 1000)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    db.close()
+    return timings
+
+
+def full_list_ms(model, order_col) -> float:
+    db = SessionLocal()
+    start = time.perf_counter()
+    db.query(model).order_by(order_col.desc()).all()
+    elapsed = (time.perf_counter() - start) * 1000
+    db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    use_temp_database()
+    seed(args.rows)
+
+    print(f"{'lentelė':<10} | {'visas .all() ms':>15} | {'1 psl. ms':>9} | {'p50 ms':>7} | {'max ms':>7}")
+    for name, fn, model, col in (
+        ("alerts", admin_service.list_alerts, Alert, Alert.created_at),
+        ("purchases", admin_service.list_purchases, Purchase, Purchase.purchased_at),
+    ):
+        timings = walk(fn, args.limit, args.pages)
+        print(
+            f"{name:<10} | {full_list_ms(model, col):>15.1f} | {timings[0]:>9.2f} | "
+            f"{statistics.median(timings):>7.2f} | {max(timings):>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+calculate_portfolio: Python ciklai per joinedload pirkimus
+vs vienas GROUP BY su sąlyginėmis sumomis.
+
+Paleidimas:
+    python -m benchmarks.bench_portfolio_calc [--etfs 50] [--purchases 1000000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+from benchmarks.common import fake_price, use_temp_database
+from database import SessionLocal
+from models import ETF, Purchase
+from services import portfolio_calc
+
+
+def seed(etf_count: int, purchase_count: int):
+    db = SessionLocal()
+    db.add_all(ETF(ticker=f"T{i:03d}") for i in range(etf_count))
+    db.commit()
+
+    rnd = random.Random(42)
+    start = datetime(2015, 1, 1)
+    chunk = []
+    for _ in range(purchase_count):
+        chunk.append({
+            "etf_id": rnd.randint(1, etf_count),
+            "units": round(rnd.uniform(0.1, 5), 4),
+            "price": round(rnd.uniform(50, 500), 2),
+            "purchased_at": start + timedelta(minutes=rnd.randint(0, 5_500_000)),
+            "currency": "EUR",
+        })
+        if len(chunk) == 50_000:
+            db.execute(insert(Purchase), chunk)
+            chunk = []
+    if chunk:
+        db.execute(insert(Purchase), chunk)
+    db.commit()
+    db.close()
+
+
+def legacy_invested(db) -> float:
+    """
+    Senasis kelias: joinedload + trys perėjimai per etf.purchases.
+    """
+    year_start = datetime(datetime.utcnow().year, 1, 1).date()
+    etfs = db.query(ETF).options(joinedload(ETF.purchases)).all()
+
+    invested_total = 0.0
+    cash_flows = 0.0
+    for etf in etfs:
+        units = sum(p.units for p in etf.purchases)
+        invested = sum(p.units * p.price for p in etf.purchases)
+        if units == 0:
+            continue
+        invested_total += invested
+        cash_flows += sum(
+            p.units * p.price
+            for p in etf.purchases
+            if p.purchased_at and p.purchased_at.date() >= year_start
+        )
+    return invested_total
+
+
+def grouped_invested(db) -> float:
+    return portfolio_calc.calculate_portfolio(db)["totals"]["invested"]
+
+
+def measure(fn, with_memory: bool):
+    db = SessionLocal()
+    if with_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(db)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if with_memory else None
+    if with_memory:
+        tracemalloc.stop()
+    db.close()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etfs", type=int, default=50)
+    parser.add_argument("--purchases", type=int, default=1_000_000)
+    parser.add_argument("--memory", action="store_true", help="tracemalloc peak (lėčiau)")
+    args = parser.parse_args()
+
+    use_temp_database()
+    portfolio_calc.ensure_portfolio_ytd = lambda db: None
+    portfolio_calc.get_current_prices_cached = (
+        lambda tickers: {t: fake_price(t) for t in tickers}
+    )
+
+    start = time.perf_counter()
+    seed(args.etfs, args.purchases)
+    print(f"Sugeneruota {args.purchases} pirkimų per {time.perf_counter() - start:.1f} s")
+
+    for name, fn in (("python ciklai", legacy_invested), ("GROUP BY", grouped_invested)):
+        elapsed, peak, invested = measure(fn, args.memory)
+        memory = f" | peak {peak / 1024 / 1024:.1f} MiB" if peak is not None else ""
+        print(f"{name:<14} | {elapsed:>7.3f} s | invested {invested:,.2f}{memory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Scheduler ciklo trukmė: kainos po vieną ETF vs grupuotas gavimas.
+
+Paleidimas:
+    python -m benchmarks.bench_price_batch [--latency 0.02] [--sizes 10,100,1000]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.common import (
+    FakeYahoo,
+    fake_price,
+    install_fake_yahoo,
+    use_temp_database,
+)
+from database import SessionLocal
+from models import ETF
+import scheduler
+from services.price_checker import collect_current_prices, fetch_current_price
+
+
+def seed_etfs(count: int):
+    db = SessionLocal()
+    db.query(ETF).delete()
+    for i in range(count):
+        ticker = f"T{i:04d}"
+        db.add(ETF(ticker=ticker, ath_price=fake_price(ticker) * 1.02))
+    db.commit()
+    db.close()
+
+
+def fetch_one_by_one(tickers: list[str]) -> tuple[dict[str, float], list[str]]:
+    """
+    Senasis kelias: vienas yf.download() kiekvienam ETF.
+    """
+    prices = {}
+    for ticker in tickers:
+        price = fetch_current_price(ticker)
+        if price is not None:
+            prices[ticker] = price
+    return prices, []
+
+
+def timed_cycle(fetcher, fake: FakeYahoo) -> tuple[float, int]:
+    scheduler.collect_current_prices = fetcher
+    fake.calls = 0
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scheduler.check_etf_prices()
+    return time.perf_counter() - start, fake.calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--sizes", default="10,100,1000")
+    args = parser.parse_args()
+
+    use_temp_database()
+    fake = install_fake_yahoo(FakeYahoo(latency=args.latency))
+
+    print(f"{'ETF':>6} | {'po vieną, s':>12} | {'užkl.':>6} | {'grupuotai, s':>12} | {'užkl.':>6}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        seed_etfs(size)
+        single_s, single_calls = timed_cycle(fetch_one_by_one, fake)
+        batch_s, batch_calls = timed_cycle(collect_current_prices, fake)
+        print(
+            f"{size:>6} | {single_s:>12.3f} | {single_calls:>6} | "
+            f"{batch_s:>12.3f} | {batch_calls:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
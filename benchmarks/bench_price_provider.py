@@ -0,0 +1,111 @@
+"""
+Kainų šaltiniai: scheduler ciklas ir istorijos backfill su yfinance
+(netikras Yahoo su RTT, įrašant į katalogą) vs replay iš to paties katalogo.
+
+Patikrina, kad replay grąžina tas pačias kainas ir barus kaip įrašyta,
+ir kiek ciklas greitesnis be tinklo.
+
+Paleidimas:
+    python -m benchmarks.bench_price_provider [--etfs 500] [--latency 0.05] [--keep DIR]
+"""
+import argparse
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import FakeYahoo, fake_price, use_temp_database
+from database import SessionLocal
+from models import ETF
+import scheduler
+from services import price_history
+from services.price_checker import collect_current_prices
+from services.price_provider import (
+    RecordingProvider,
+    ReplayProvider,
+    set_price_provider,
+)
+from services.yf_service import YFinanceProvider
+
+
+def seed_etfs(count: int) -> list[str]:
+    db = SessionLocal()
+    db.query(ETF).delete()
+    tickers = [f"R{i:04d}" for i in range(count)]
+    for ticker in tickers:
+        db.add(ETF(ticker=ticker, ath_price=fake_price(ticker) * 1.02))
+    db.commit()
+    db.close()
+    return tickers
+
+
+def timed_run(tickers: list[str]) -> dict:
+    """
+    Vienas ciklas + istorijos backfill (tuščia vietinė istorija).
+    """
+    timings = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        scheduler.check_etf_prices()
+        timings["cycle_s"] = time.perf_counter() - start
+
+        price_history._synced_on.clear()
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            price_history.sync_histories(db, tickers)
+            db.commit()
+            timings["backfill_s"] = time.perf_counter() - start
+        finally:
+            db.close()
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etfs", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--keep", metavar="DIR", help="įrašus palikti šiame kataloge")
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp(prefix="etf-prices-")
+
+    # 1) Įrašymas: yfinance (netikras Yahoo) → katalogas
+    use_temp_database()
+    tickers = seed_etfs(args.etfs)
+    fake = FakeYahoo(latency=args.latency, max_days=320)
+    recorder = RecordingProvider(YFinanceProvider(yf_module=fake), directory)
+    set_price_provider(recorder)
+    recorded = timed_run(tickers)
+    recorded_calls = fake.calls
+    with contextlib.redirect_stdout(io.StringIO()):
+        recorded_prices, _ = collect_current_prices(tickers)
+    recorded_bars = recorder.histories(tickers[:20])
+
+    # 2) Replay: ta pati DB schema, tas pats katalogas, be tinklo
+    use_temp_database()
+    seed_etfs(args.etfs)
+    replay = ReplayProvider(directory)
+    set_price_provider(replay)
+    replayed = timed_run(tickers)
+    with contextlib.redirect_stdout(io.StringIO()):
+        replayed_prices, _ = collect_current_prices(tickers)
+
+    prices_match = replayed_prices == recorded_prices
+    bars_match = replay.histories(tickers[:20]) == recorded_bars
+
+    print(f"📁 Įrašai: {directory}")
+    print(f"{'šaltinis':<10} | {'ciklas, s':>10} | {'backfill, s':>11} | {'Yahoo užkl.':>11}")
+    print(f"{'record':<10} | {recorded['cycle_s']:>10.3f} | {recorded['backfill_s']:>11.3f} | {recorded_calls:>11}")
+    print(f"{'replay':<10} | {replayed['cycle_s']:>10.3f} | {replayed['backfill_s']:>11.3f} | {0:>11}")
+    print(f"{'✅' if prices_match else '❌'} kainos sutampa ({len(replayed_prices)}/{len(tickers)})")
+    print(f"{'✅' if bars_match else '❌'} istorija sutampa")
+
+    if not args.keep:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
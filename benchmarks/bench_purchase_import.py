@@ -0,0 +1,121 @@
+"""
+Masinis CSV importas: 100k BUY / SELL eilučių per services.purchase_import
+vs ta pati logika po vieną eilutę (kaip create_purchase: get_units_until,
+commit ir YTD invalidacija kiekvienai eilutei).
+
+Paleidimas:
+    python -m benchmarks.bench_purchase_import [--rows 100000] [--etfs 50] [--single 500]
+"""
+import argparse
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+import services.ytd_service as ytd_service
+from benchmarks.common import use_temp_database
+from database import SessionLocal
+from models import ETF, Position, Purchase
+from services.positions import check_positions
+from services.purchase_import import import_purchases
+
+
+def make_csv(rows: int, etfs: int, bad_every: int = 1000) -> str:
+    rng = random.Random(42)
+    held = [0.0] * etfs
+    start = datetime(2015, 1, 1)
+    out = io.StringIO()
+    out.write("ticker,side,units,price,purchased_at,currency,comment\n")
+    for i in range(rows):
+        e = rng.randrange(etfs)
+        dt = (start + timedelta(minutes=30 * i)).isoformat(timespec="seconds")
+        if i % bad_every == bad_every - 1:
+            # Neįmanomas SELL – turi atsirasti klaidų ataskaitoje
+            out.write(f"T{e:03d},SELL,{held[e] + 1000},10.0,{dt},EUR,\n")
+        elif held[e] > 5 and rng.random() < 0.3:
+            units = round(rng.uniform(0.1, held[e] / 2), 4)
+            held[e] -= units
+            out.write(f"T{e:03d},SELL,{units},{rng.uniform(50, 150):.2f},{dt},EUR,\n")
+        else:
+            units = round(rng.uniform(0.5, 10), 4)
+            held[e] += units
+            out.write(f"T{e:03d},BUY,{units},{rng.uniform(50, 150):.2f},{dt},EUR,bench\n")
+    return out.getvalue()
+
+
+def seed_etfs(etfs: int):
+    db = SessionLocal()
+    db.execute(insert(ETF), [{"ticker": f"T{i:03d}"} for i in range(etfs)])
+    db.commit()
+    db.close()
+
+
+def reset():
+    db = SessionLocal()
+    db.query(Purchase).delete()
+    db.query(Position).delete()
+    db.commit()
+    db.close()
+
+
+def run_single(text: str, rows: int) -> float:
+    """
+    Po vieną eilutę per import_purchases – ta pati kaina kaip create_purchase
+    (SELL patikra, commit, YTD invalidacija eilutei).
+    """
+    lines = text.splitlines(keepends=True)
+    header, body = lines[0], lines[1:rows + 1]
+    db = SessionLocal()
+    start = time.perf_counter()
+    for line in body:
+        import_purchases(db, [header, line])
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--etfs", type=int, default=50)
+    parser.add_argument("--single", type=int, default=500)
+    args = parser.parse_args()
+
+    use_temp_database()
+    seed_etfs(args.etfs)
+
+    # YTD perskaičiavimas eina į tinklą – čia skaičiuojam tik invalidacijas
+    invalidations = []
+    ytd_service.schedule_ytd_recompute = lambda: invalidations.append(1)
+
+    text = make_csv(args.rows, args.etfs)
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    report = import_purchases(db, io.StringIO(text))
+    bulk = time.perf_counter() - start
+    mismatches = check_positions(db)
+    db.close()
+
+    print(
+        f"masinis: {args.rows} eilučių per {bulk:.2f} s "
+        f"({args.rows / bulk:,.0f} eil./s) | įrašyta {report['inserted']}, "
+        f"atmesta {report['rejected']} | YTD invalidacijų {len(invalidations)}"
+    )
+    print(f"pozicijos sutampa su žurnalu: {'taip' if not mismatches else mismatches[:3]}")
+
+    reset()
+    invalidations.clear()
+    single = run_single(text, args.single)
+    per_row = single / args.single
+    print(
+        f"po vieną: {args.single} eilučių per {single:.2f} s "
+        f"→ {args.rows} eilučių ≈ {per_row * args.rows:.0f} s "
+        f"| YTD invalidacijų {len(invalidations)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
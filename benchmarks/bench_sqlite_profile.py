@@ -0,0 +1,98 @@
+"""
+Lygiagretus skaitymas / rašymas: paprastas SQLite vs tuned profilis
+(WAL, synchronous=NORMAL, busy_timeout, cache/mmap, QueuePool).
+
+Rašytojas imituoja schedulerį (trumpos transakcijos su commit'u),
+skaitytojai – dashboard užklausas.
+
+Paleidimas:
+    python -m benchmarks.bench_sqlite_profile [--seconds 5] [--readers 8]
+"""
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import temp_database_url
+from database import Base, build_engine
+from models import Alert, ETF
+
+
+def run_profile(profile: str, seconds: float, readers: int) -> dict:
+    engine = build_engine(temp_database_url(), profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    db = Session()
+    db.add_all(ETF(ticker=f"T{i:03d}", ath_price=100.0) for i in range(200))
+    db.commit()
+    db.close()
+
+    stats = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def count(key):
+        with lock:
+            stats[key] += 1
+
+    def writer():
+        i = 0
+        while time.perf_counter() < stop_at:
+            db = Session()
+            try:
+                db.add(Alert(etf_id=1 + i % 200, price=90.0, created_at=datetime.utcnow()))
+                db.query(ETF).filter(ETF.id == 1 + i % 200).update({"ath_alert_sent": True})
+                db.commit()
+                count("writes")
+            except OperationalError:
+                db.rollback()
+                count("locked")
+            finally:
+                db.close()
+            i += 1
+
+    def reader():
+        while time.perf_counter() < stop_at:
+            db = Session()
+            try:
+                db.query(ETF).all()
+                db.query(func.count(Alert.id)).scalar()
+                count("reads")
+            except OperationalError:
+                count("locked")
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    engine.dispose()
+    return {k: v / seconds if k != "locked" else v for k, v in stats.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'profilis':<9} | {'skait./s':>9} | {'raš./s':>8} | {'locked':>6}")
+    for profile in ("default", "tuned"):
+        r = run_profile(profile, args.seconds, args.readers)
+        print(
+            f"{profile:<9} | {r['reads']:>9.0f} | {r['writes']:>8.0f} | "
+            f"{r['locked']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+YTD bazė: senasis kelias (istorija kiekvienam tickeriui atskirai,
+užklausa laukia) vs fono perskaičiavimas vienu grupuotu užklausimu.
+
+Taip pat patikrina:
+- single-flight: daug lygiagrečių užklausų su pasenusia baze paleidžia
+  tik vieną perskaičiavimą
+- einamųjų metų sandorių importas bazės neliečia (0 Yahoo kvietimų),
+  o atgaline data įvestas pirkimas ją koreguoja inkrementiškai
+
+Paleidimas:
+    python -m benchmarks.bench_ytd [--etfs 50] [--concurrent 50] [--trades 1000]
+"""
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.common import FakeYahoo, install_fake_yahoo, use_temp_database
+from database import SessionLocal
+from models import ETF, PortfolioYTD, PriceHistory, Purchase
+from services import price_history, ytd_service
+
+
+def seed(etf_count: int):
+    db = SessionLocal()
+    db.add_all(ETF(ticker=f"T{i:03d}") for i in range(etf_count))
+    db.commit()
+    last_year = datetime.utcnow().year - 1
+    db.add_all(
+        Purchase(
+            etf_id=i + 1,
+            units=10.0,
+            price=100.0,
+            purchased_at=datetime(last_year, 6, 1),
+            currency="EUR",
+        )
+        for i in range(etf_count)
+    )
+    db.commit()
+    db.close()
+
+
+def reset_history():
+    db = SessionLocal()
+    db.query(PriceHistory).delete()
+    db.query(PortfolioYTD).delete()
+    db.commit()
+    db.close()
+    price_history._synced_on.clear()
+
+
+def legacy_start_value(tickers: list[str]) -> float:
+    year_start = datetime(datetime.utcnow().year, 1, 1).date()
+    return sum(
+        10.0 * (price_history.get_close_on_or_before(t, year_start) or 0.0)
+        for t in tickers
+    )
+
+
+def wait_fresh(timeout: float = 60.0) -> PortfolioYTD:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        db = SessionLocal()
+        row = db.query(PortfolioYTD).first()
+        db.close()
+        if row is not None and not row.is_stale:
+            return row
+        time.sleep(0.01)
+    raise TimeoutError("YTD bazė nebuvo perskaičiuota")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etfs", type=int, default=50)
+    parser.add_argument("--concurrent", type=int, default=50)
+    parser.add_argument("--trades", type=int, default=1000)
+    args = parser.parse_args()
+
+    use_temp_database()
+    seed(args.etfs)
+    tickers = [f"T{i:03d}" for i in range(args.etfs)]
+    fake = install_fake_yahoo(FakeYahoo(latency=0.05))
+
+    # --- senasis kelias: užklausa laukia N istorijos užklausimų
+    start = time.perf_counter()
+    legacy = legacy_start_value(tickers)
+    legacy_s = time.perf_counter() - start
+    print(f"serijinis        | {legacy_s:>7.2f} s | Yahoo kvietimų {fake.calls:>4} | {legacy:,.2f}")
+
+    # --- fonas: užklausa grįžta iš karto, perskaičiavimas vienas
+    reset_history()
+    fake.calls = 0
+    runs = 0
+    original = ytd_service._compute_start_value
+
+    def counted(*a, **kw):
+        nonlocal runs
+        runs += 1
+        return original(*a, **kw)
+
+    ytd_service._compute_start_value = counted
+
+    latencies = []
+    barrier = threading.Barrier(args.concurrent)
+
+    def request():
+        db = SessionLocal()
+        barrier.wait()
+        t0 = time.perf_counter()
+        ytd_service.ensure_portfolio_ytd(db)
+        latencies.append(time.perf_counter() - t0)
+        db.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=request) for _ in range(args.concurrent)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    row = wait_fresh()
+    batched_s = time.perf_counter() - start
+
+    print(
+        f"fone, grupuotai  | {batched_s:>7.2f} s | Yahoo kvietimų {fake.calls:>4} | "
+        f"{row.start_value:,.2f}"
+    )
+    print(
+        f"{args.concurrent} lygiagrečių užklausų: perskaičiavimų {runs}, "
+        f"max užklausos laikas {max(latencies) * 1000:.1f} ms"
+    )
+
+    # --- importas per API: einamųjų metų sandoriai + vienas atgaline data
+    from admin_api import router as admin_api_router
+
+    app = FastAPI()
+    app.include_router(admin_api_router)
+    client = TestClient(app, follow_redirects=False)
+
+    fake.calls = 0
+    runs = 0
+    year = datetime.utcnow().year
+
+    def post(etf_id: int, purchased_at: datetime):
+        response = client.post("/admin/api/purchases", data={
+            "etf_id": etf_id,
+            "side": "BUY",
+            "units": 1,
+            "price": 100,
+            "purchased_at": purchased_at.isoformat(),
+        })
+        assert response.status_code == 303, response.text
+
+    start = time.perf_counter()
+    for i in range(args.trades):
+        post(1 + i % args.etfs, datetime(year, 1, 2) + timedelta(days=i % 250))
+    import_s = time.perf_counter() - start
+    print(
+        f"{args.trades} šių metų sandorių | {import_s:>6.2f} s | "
+        f"Yahoo kvietimų {fake.calls} | perskaičiavimų {runs}"
+    )
+
+    post(1, datetime(year - 1, 3, 1))
+    db = SessionLocal()
+    incremental = db.query(PortfolioYTD).one()
+    db.close()
+    full, _ = original()
+    print(
+        f"atgalinis pirkimas | Yahoo kvietimų {fake.calls} | perskaičiavimų {runs} | "
+        f"inkrementiškai {incremental.start_value:,.2f} vs pilnai {full:,.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+EXPLAIN QUERY PLAN patikra karštoms užklausoms.
+
+1. Sukuria SENOS schemos DB (be naujų stulpelių ir indeksų)
+2. Paleidžia create_all() + run_migrations(), kaip lifespan
+3. Per tikrus handlerius / helperius pagauna vykdomus SELECT'us
+4. Tikrina, kad jų planai naudoja migracijos indeksus
+
+Paleidimas (exit code 1, jei kuris nors planas be indekso):
+    python -m benchmarks.check_query_plans
+"""
+import sys
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from benchmarks.common import temp_database_url
+from database import Base, SessionLocal, build_engine
+
+LEGACY_SCHEMA = [
+    """
+    CREATE TABLE etfs (
+        id INTEGER PRIMARY KEY,
+        ticker VARCHAR NOT NULL UNIQUE,
+        ath_price FLOAT,
+        drop_threshold FLOAT NOT NULL DEFAULT 5.0,
+        ath_alert_sent BOOLEAN NOT NULL DEFAULT 0,
+        manual_reset_at DATETIME
+    )
+    """,
+    """
+    CREATE TABLE purchases (
+        id INTEGER PRIMARY KEY,
+        etf_id INTEGER NOT NULL REFERENCES etfs (id),
+        units FLOAT NOT NULL,
+        price FLOAT NOT NULL,
+        purchased_at DATETIME,
+        currency VARCHAR,
+        comment VARCHAR
+    )
+    """,
+    """
+    CREATE TABLE alerts (
+        id INTEGER PRIMARY KEY,
+        etf_id INTEGER NOT NULL REFERENCES etfs (id),
+        price FLOAT NOT NULL,
+        created_at DATETIME NOT NULL
+    )
+    """,
+]
+
+# (SQL fragmentas, kurio ieškom) → indeksas, kurį planas privalo naudoti
+EXPECTED = [
+    ("purchases.purchased_at <=", "ix_purchases_etf_id_purchased_at"),
+    ("max(alerts.created_at)", "ix_alerts_etf_id_created_at"),
+    ("ORDER BY alerts.created_at DESC", "ix_alerts_created_at"),
+    ("ORDER BY purchases.purchased_at DESC", "ix_purchases_purchased_at"),
+]
+
+
+def main():
+    engine = build_engine(temp_database_url())
+    with engine.begin() as conn:
+        for ddl in LEGACY_SCHEMA:
+            conn.execute(text(ddl))
+
+    import models  # noqa: F401
+    from migrations import run_migrations
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    SessionLocal.configure(bind=engine)
+
+    captured = []
+
+    def capture(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, params))
+
+    from fastapi.testclient import TestClient
+    from admin_alerts import router as alerts_router
+    from admin_api import get_units_until, router as api_router
+    from services.admin_service import encode_cursor
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    app.include_router(alerts_router)
+    app.include_router(api_router)
+    client = TestClient(app)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    db = SessionLocal()
+    get_units_until(db, 1, datetime.utcnow())
+    db.close()
+    client.get("/admin/alerts")
+    client.get("/admin/api/alerts")
+    # Antras puslapis – keyset sąlyga (created_at, id) < (...)
+    cursor = encode_cursor(datetime.utcnow(), 1)
+    client.get(f"/admin/api/alerts?cursor={cursor}")
+    client.get(f"/admin/api/purchases?cursor={cursor}")
+    event.remove(engine, "before_cursor_execute", capture)
+
+    failed = False
+    with engine.connect() as conn:
+        for fragment, index in EXPECTED:
+            matches = [(s, p) for s, p in captured if fragment in s]
+            if not matches:
+                print(f"❌ Nerasta užklausa su: {fragment}")
+                failed = True
+                continue
+
+            for statement, params in matches:
+                plan = " | ".join(
+                    row[-1]
+                    for row in conn.exec_driver_sql(
+                        "EXPLAIN QUERY PLAN " + statement, params
+                    )
+                )
+                ok = index in plan
+                failed |= not ok
+                print(f"{'✅' if ok else '❌'} {index}: {plan}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Bendri benchmarkų pagalbininkai:
+- laikina SQLite DB (SessionLocal perrišamas į ją)
+- netikras yfinance, kuris grąžina deterministines kainas su dirbtiniu RTT
+  (įdiegiamas per kainų šaltinio sąsają, ne keičiant modulius)
+"""
+import math
+import os
+import tempfile
+import time
+import zlib
+
+# email_service be šių ENV neužsikrauna – benchmarkams laiškų nereikia
+os.environ.setdefault("SMTP_USER", "bench@example.com")
+os.environ.setdefault("SMTP_PASS", "bench")
+os.environ.setdefault("ALERT_EMAIL", "bench@example.com")
+
+import pandas as pd
+from database import DB_PROFILE, Base, SessionLocal, build_engine
+import models  # noqa: F401 – užregistruoja lenteles
+
+
+def temp_database_url() -> str:
+    tmp_dir = tempfile.mkdtemp(prefix="etf-bench-")
+    return f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+
+def use_temp_database(profile: str | None = None):
+    """
+    Sukuria tuščią DB laikinam kataloge ir nukreipia SessionLocal į ją.
+    """
+    from migrations import run_migrations
+
+    url = temp_database_url()
+    engine = build_engine(url, profile or DB_PROFILE)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    SessionLocal.configure(bind=engine)
+
+    return engine
+
+
+def fake_price(ticker: str) -> float:
+    """
+    Deterministinė „kaina“ tickeriui (50–550).
+    """
+    return 50 + (zlib.crc32(ticker.encode()) % 5000) / 10
+
+
+def fake_dates(period=None, start=None, end=None, max_days: int = 10 * 261) -> pd.DatetimeIndex:
+    """
+    Darbo dienos kaip yf.download(): period="max" – max_days (10 metų),
+    period="5d" – 5 paskutinės, start/end – intervalas (end neimtinai).
+    """
+    last = pd.Timestamp(end) - pd.Timedelta(days=1) if end else pd.Timestamp.today().normalize()
+    if start:
+        return pd.bdate_range(start=start, end=last)
+    if period == "max":
+        return pd.bdate_range(end=last, periods=max_days)
+    return pd.bdate_range(end=last, periods=5)
+
+
+def fake_close(ticker: str, day) -> float:
+    """
+    Deterministinė Close kaina tickeriui konkrečią dieną (lėtas svyravimas).
+    """
+    return round(fake_price(ticker) * (1 + 0.1 * math.sin(day.toordinal() / 90)), 4)
+
+
+class FakeYahoo:
+    """
+    yfinance modulio pakaitalas (tik download()).
+    Kiekvienas kvietimas „kainuoja“ latency + per_ticker * tickerių sk.
+    """
+
+    def __init__(self, latency: float = 0.02, per_ticker: float = 0.0002, max_days: int = 10 * 261):
+        self.latency = latency
+        self.per_ticker = per_ticker
+        self.max_days = max_days
+        self.calls = 0
+
+    def download(self, tickers, group_by="column", period=None, start=None,
+                 end=None, **kwargs):
+        names = [tickers] if isinstance(tickers, str) else list(tickers)
+
+        self.calls += 1
+        time.sleep(self.latency + self.per_ticker * len(names))
+
+        dates = fake_dates(period=period, start=start, end=end, max_days=self.max_days)
+        frames = {}
+        for ticker in names:
+            close = [fake_close(ticker, d) for d in dates]
+            frames[ticker] = pd.DataFrame(
+                {"Open": close, "High": close, "Low": close, "Close": close},
+                index=dates,
+            )
+
+        if isinstance(tickers, str) and group_by != "ticker":
+            return frames[tickers]
+
+        return pd.concat(frames, axis=1)
+
+
+def install_fake_yahoo(fake: FakeYahoo):
+    """
+    Aktyvus kainų šaltinis – yfinance backend'as su netikru moduliu
+    (parsinimo kelias tas pats kaip su tikru Yahoo).
+    """
+    from services.price_provider import set_price_provider
+    from services.yf_service import YFinanceProvider
+
+    set_price_provider(YFinanceProvider(yf_module=fake))
+    return fake
@@ -0,0 +1,312 @@
+"""
+Karštųjų kelių benchmarkų rinkinys ant sintetinių duomenų
+(benchmarks.synthetic) su deterministiniu netikru kainų šaltiniu.
+
+Rezultatai – JSON; compare režimas palygina du paleidimus ir pažymi
+regresijas (exit code 1, tinka CI).
+
+Paleidimas:
+    python -m benchmarks.suite run --scale medium --out base.json
+    python -m benchmarks.suite run --scale medium --out new.json --only api_alerts,alert_history
+    python -m benchmarks.suite run --scale medium --replay price_recordings/
+    python -m benchmarks.suite compare base.json new.json [--threshold 0.15]
+
+--replay – kainos iš įrašyto katalogo (PRICE_PROVIDER=replay) vietoj
+netikro Yahoo; tickeriai turi sutapti su sintetiniais (S00000...).
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.common import FakeYahoo, install_fake_yahoo, use_temp_database
+from benchmarks.synthetic import SCALES, generate, ticker_name
+from services.price_provider import ReplayProvider, set_price_provider
+
+# Netikra istorija: ~1,2 metų užtenka sausio 1 d. kainoms (YTD)
+FAKE_HISTORY_DAYS = 320
+
+# pavadinimas → (paruošimo funkcija, cold); paruošimas grąžina matuojamą callable.
+# Tvarka svarbi: check_etf_prices užpildo quote cache, cold – prieš warm.
+BENCHMARKS: dict[str, tuple] = {}
+
+
+def benchmark(name: str, cold: bool = False):
+    def register(setup):
+        BENCHMARKS[name] = (setup, cold)
+        return setup
+    return register
+
+
+# =========================================================
+# Scheduleris / dashboardas
+# =========================================================
+@benchmark("check_etf_prices")
+def _check_etf_prices(ctx):
+    import scheduler
+
+    return scheduler.check_etf_prices
+
+
+def _with_session(fn):
+    # Kaip užklausa: nauja sesija kiekvienam kvietimui (švieži WAL snapshot'ai)
+    from database import SessionLocal
+
+    def run():
+        db = SessionLocal()
+        try:
+            fn(db)
+        finally:
+            db.close()
+
+    return run
+
+
+@benchmark("calculate_portfolio")
+def _calculate_portfolio(ctx):
+    from services.portfolio_calc import calculate_portfolio
+
+    return _with_session(calculate_portfolio)
+
+
+@benchmark("ensure_portfolio_ytd")
+def _ensure_portfolio_ytd(ctx):
+    from services.ytd_service import ensure_portfolio_ytd
+
+    return _with_session(ensure_portfolio_ytd)
+
+
+@benchmark("ytd_recompute_cold", cold=True)
+def _ytd_recompute_cold(ctx):
+    # Pirmas kartas: istorijos backfill visiems turimiems tickeriams
+    from services.ytd_service import compute_ytd_start_value
+
+    return compute_ytd_start_value
+
+
+@benchmark("ytd_recompute_warm")
+def _ytd_recompute_warm(ctx):
+    from services.ytd_service import compute_ytd_start_value
+
+    return compute_ytd_start_value
+
+
+# =========================================================
+# Admin puslapiai ir /admin/api/* sąrašai (per TestClient)
+# =========================================================
+def _get(ctx, path: str):
+    from services import http_cache
+
+    def run():
+        # Matuojam sąrašo sudarymą, ne atsakymų cache'ą
+        http_cache._cache.clear()
+        ctx["client"].get(path).raise_for_status()
+
+    return run
+
+
+@benchmark("alert_history")
+def _alert_history(ctx):
+    return _get(ctx, "/admin/alerts")
+
+
+@benchmark("api_etfs")
+def _api_etfs(ctx):
+    return _get(ctx, "/admin/api/etfs")
+
+
+@benchmark("api_alerts")
+def _api_alerts(ctx):
+    return _get(ctx, "/admin/api/alerts")
+
+
+@benchmark("api_alerts_ticker")
+def _api_alerts_ticker(ctx):
+    return _get(ctx, f"/admin/api/alerts?ticker={ticker_name(1)}")
+
+
+@benchmark("api_purchases")
+def _api_purchases(ctx):
+    return _get(ctx, "/admin/api/purchases")
+
+
+@benchmark("api_purchases_filtered")
+def _api_purchases_filtered(ctx):
+    return _get(ctx, f"/admin/api/purchases?ticker={ticker_name(1)}&date_from=2020-01-01")
+
+
+def _client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from admin_alerts import router as admin_alerts_router
+    from admin_api import router as admin_api_router
+
+    app = FastAPI()
+    app.include_router(admin_api_router)
+    app.include_router(admin_alerts_router)
+    return TestClient(app)
+
+
+# =========================================================
+# Vykdymas
+# =========================================================
+def _measure(fn, repeat: int, warmup: int) -> dict:
+    timings = []
+    # Ciklo print'ai netrukdo rezultatams
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(warmup + repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - start) * 1000
+            if i >= warmup:
+                timings.append(elapsed)
+
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "runs": len(timings),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    etfs, purchases, alerts = SCALES[args.scale]
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Nežinomi benchmarkai: {', '.join(unknown)}")
+
+    use_temp_database()
+    if args.replay:
+        set_price_provider(ReplayProvider(args.replay))
+    else:
+        install_fake_yahoo(FakeYahoo(latency=0, per_ticker=0, max_days=FAKE_HISTORY_DAYS))
+    data = generate(
+        args.etfs or etfs,
+        args.purchases or purchases,
+        args.alerts or alerts,
+        args.seed,
+    )
+    print(f"🧪 Duomenys: {data}")
+
+    ctx = {"client": _client()}
+    results = {}
+    for name in names:
+        setup, cold = BENCHMARKS[name]
+        fn = setup(ctx)
+        if cold:
+            results[name] = _measure(fn, repeat=1, warmup=0)
+        else:
+            results[name] = _measure(fn, repeat=args.repeat, warmup=args.warmup)
+        print(f"⏱️ {name:<24} p50 {results[name]['p50_ms']:>10.2f} ms")
+
+    return {
+        "meta": {
+            "scale": args.scale,
+            "data": data,
+            "repeat": args.repeat,
+            "prices": f"replay:{args.replay}" if args.replay else "fake",
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, metric: str, threshold: float, min_ms: float) -> int:
+    """
+    Regresija: naujas laikas ilgesnis daugiau nei threshold dalimi IR
+    daugiau nei min_ms (mažų skaičių triukšmas nelaikomas regresija).
+    """
+    if base["meta"].get("data", {}).get("etfs") != new["meta"].get("data", {}).get("etfs"):
+        print("⚠️ Skirtingi duomenų masteliai – palyginimas orientacinis")
+
+    regressions = 0
+    print(f"{'benchmarkas':<24} | {'bazė ms':>10} | {'nauja ms':>10} | {'pokytis':>8} |")
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        old = base["results"].get(name)
+        cur = new["results"].get(name)
+        if old is None or cur is None:
+            old_ms = "—" if old is None else f"{old[metric]:.2f}"
+            cur_ms = "—" if cur is None else f"{cur[metric]:.2f}"
+            print(f"{name:<24} | {old_ms:>10} | {cur_ms:>10} | {'':>8} | naujas / pašalintas")
+            continue
+
+        change = (cur[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+        if change > threshold and cur[metric] - old[metric] > min_ms:
+            status = "❌ REGRESIJA"
+            regressions += 1
+        elif change < -threshold and old[metric] - cur[metric] > min_ms:
+            status = "✅ greičiau"
+        else:
+            status = ""
+
+        print(f"{name:<24} | {old[metric]:>10.2f} | {cur[metric]:>10.2f} | {change:>+7.1%} | {status}")
+
+    print(f"\nRegresijų: {regressions} (slenkstis {threshold:.0%}, min {min_ms} ms, metrika {metric})")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run")
+    run_parser.add_argument("--scale", choices=SCALES, default="small")
+    run_parser.add_argument("--etfs", type=int)
+    run_parser.add_argument("--purchases", type=int)
+    run_parser.add_argument("--alerts", type=int)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--only", help="kableliais atskirti pavadinimai")
+    run_parser.add_argument("--out", help="JSON failas (numatyta – stdout)")
+    run_parser.add_argument("--replay", metavar="DIR", help="įrašytų kainų katalogas")
+
+    compare_parser = sub.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--metric", choices=("p50_ms", "min_ms", "mean_ms"), default="p50_ms")
+    compare_parser.add_argument("--threshold", type=float, default=0.15)
+    compare_parser.add_argument("--min-ms", type=float, default=0.5)
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        sys.exit(compare(base, new, args.metric, args.threshold, args.min_ms))
+
+    report = run(args)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
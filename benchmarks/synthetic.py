@@ -0,0 +1,168 @@
+"""
+Sintetiniai duomenys benchmarkams: etfs, purchases, alerts, portfolio_ytd
+(+ positions iš žurnalo). Deterministiniai pagal seed.
+
+Masteliai – nuo 10 ETF / 1k pirkimų iki 10k ETF / 1M pirkimų:
+
+    python -m benchmarks.synthetic --scale medium          # į laikiną DB
+    python -m benchmarks.synthetic --etfs 2000 --purchases 300000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from benchmarks.common import fake_price, use_temp_database
+from database import SessionLocal
+from models import Alert, ETF, PortfolioYTD, Purchase
+from services.positions import rebuild_positions
+
+# mastelis → (ETF, pirkimai, alertai)
+SCALES = {
+    "tiny": (10, 1_000, 1_000),
+    "small": (100, 10_000, 10_000),
+    "medium": (1_000, 100_000, 100_000),
+    "large": (10_000, 1_000_000, 1_000_000),
+}
+
+INSERT_CHUNK_ROWS = 50_000
+HISTORY_START = datetime(2015, 1, 1)
+
+
+def ticker_name(i: int) -> str:
+    return f"S{i:05d}"
+
+
+def _chunks(rows, size: int = INSERT_CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _timestamps(count: int, rng: random.Random, start: datetime, end: datetime):
+    # Chronologiškai didėjantys laikai su atsitiktiniais tarpais
+    span = (end - start).total_seconds()
+    step = span / max(count, 1)
+    moment = 0.0
+    for _ in range(count):
+        moment += rng.uniform(0.2, 1.8) * step
+        yield start + timedelta(seconds=min(moment, span))
+
+
+def _etf_rows(etfs: int, rng: random.Random):
+    for i in range(etfs):
+        price = fake_price(ticker_name(i))
+        yield {
+            "ticker": ticker_name(i),
+            # Dalis ETF – gerokai žemiau ATH (alertų kelias), dalis – šalia
+            "ath_price": round(price * rng.choice((1.02, 1.05, 1.2, 1.5)), 4),
+            "ath_updated_at": HISTORY_START,
+            "drop_threshold": rng.choice((3.0, 5.0, 7.5, 10.0)),
+            "ath_alert_sent": rng.random() < 0.3,
+        }
+
+
+def _purchase_rows(etfs: int, purchases: int, rng: random.Random, now: datetime):
+    held = [0.0] * etfs
+    for moment in _timestamps(purchases, rng, HISTORY_START, now):
+        i = rng.randrange(etfs)
+        price = round(fake_price(ticker_name(i)) * rng.uniform(0.6, 1.1), 4)
+
+        # ~15% pardavimų, tik kai yra ką parduoti (žurnalas visada galiojantis)
+        if held[i] > 1 and rng.random() < 0.15:
+            units = -round(rng.uniform(0.1, held[i] / 2), 4)
+        else:
+            units = round(rng.uniform(0.5, 20), 4)
+        held[i] += units
+
+        yield {
+            "etf_id": i + 1,
+            "units": units,
+            "price": price,
+            "purchased_at": moment,
+            "currency": "EUR",
+            "comment": "",
+        }
+
+
+def _alert_rows(etfs: int, alerts: int, rng: random.Random, now: datetime):
+    for moment in _timestamps(alerts, rng, HISTORY_START, now):
+        i = rng.randrange(etfs)
+        yield {
+            "etf_id": i + 1,
+            "price": round(fake_price(ticker_name(i)) * 0.9, 4),
+            "created_at": moment,
+        }
+
+
+def generate(etfs: int, purchases: int, alerts: int, seed: int = 42) -> dict:
+    """
+    Užpildo SessionLocal DB. Grąžina eilučių skaičius ir trukmę.
+    Einamųjų metų YTD bazė įrašoma šviežia – benchmarkai nelaukia fono.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(ETF.__table__), list(_etf_rows(etfs, rng)))
+
+        for chunk in _chunks(_purchase_rows(etfs, purchases, rng, now)):
+            db.execute(insert(Purchase.__table__), chunk)
+        for chunk in _chunks(_alert_rows(etfs, alerts, rng, now)):
+            db.execute(insert(Alert.__table__), chunk)
+
+        db.execute(insert(PortfolioYTD.__table__), [
+            {
+                "year": year,
+                "start_value": round(rng.uniform(10_000, 1_000_000), 2),
+                "created_at": datetime(year, 1, 1),
+                "is_stale": False,
+            }
+            for year in range(HISTORY_START.year, now.year + 1)
+        ])
+
+        rebuild_positions(db)
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "etfs": etfs,
+        "purchases": purchases,
+        "alerts": alerts,
+        "seed": seed,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--etfs", type=int)
+    parser.add_argument("--purchases", type=int)
+    parser.add_argument("--alerts", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    etfs, purchases, alerts = SCALES[args.scale]
+    engine = use_temp_database()
+    counts = generate(
+        args.etfs or etfs,
+        args.purchases or purchases,
+        args.alerts or alerts,
+        args.seed,
+    )
+    print(f"🧪 {counts} → {engine.url.database}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,54 @@
 # config.py
 
+import os
+
 DROP_THRESHOLD_PERCENT = 6.1   # 1 = 1%, 10 = 10%
+
+# --- KAINŲ GAVIMAS ---
+# Kiek tickerių siunčiam vienu yf.download() užklausimu
+PRICE_BATCH_SIZE = int(os.getenv("PRICE_BATCH_SIZE", "100"))
+
+# Kainų šaltinis: yfinance / record (yfinance + įrašymas) / replay (iš įrašų)
+PRICE_PROVIDER = os.getenv("PRICE_PROVIDER", "yfinance")
+PRICE_RECORD_DIR = os.getenv(
+    "PRICE_RECORD_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_recordings"),
+)
+
+# Istorija, kurios šaltinis negrąžino: kartojama po 5 min, 10 min, ... iki 6 h
+HISTORY_RETRY_SECONDS = float(os.getenv("HISTORY_RETRY_SECONDS", "300"))
+HISTORY_RETRY_MAX_SECONDS = float(os.getenv("HISTORY_RETRY_MAX_SECONDS", "21600"))
+
+# --- KAINŲ CACHE ---
+# Scheduleris rašo kas 5 min, todėl TTL turi būti ilgesnis už ciklą
+QUOTE_CACHE_TTL_SECONDS = int(os.getenv("QUOTE_CACHE_TTL_SECONDS", "600"))
+QUOTE_CACHE_MAX_SIZE = int(os.getenv("QUOTE_CACHE_MAX_SIZE", "1000"))
+# 1 = kainos saugomos ir `quotes` lentelėje (išlieka po restarto)
+QUOTE_CACHE_PERSIST = os.getenv("QUOTE_CACHE_PERSIST", "1") == "1"
+
+# Lygiagretus kainų gavimas: kiek batch'ų vienu metu ir kiek laukiam vieno
+PRICE_FETCH_WORKERS = int(os.getenv("PRICE_FETCH_WORKERS", "4"))
+PRICE_FETCH_TIMEOUT_SECONDS = float(os.getenv("PRICE_FETCH_TIMEOUT_SECONDS", "30"))
+
+# --- ADMIN SĄRAŠAI ---
+# Keyset puslapiavimas: numatytasis ir didžiausias puslapio dydis
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "50"))
+ADMIN_PAGE_SIZE_MAX = int(os.getenv("ADMIN_PAGE_SIZE_MAX", "500"))
+
+# --- PROFILIAVIMAS ---
+# SQL užklausos, lėtesnės nei tiek ms, logojamos su parametrais
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# HTTP užklausos, lėtesnės nei tiek ms, logojamos su SQL / kainų suvestine
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+# 1 = leidžiamas ?profile=1 (cProfile ataskaita vietoje atsakymo)
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "0") == "1"
+
+# --- LAIŠKŲ OUTBOX ---
+# Kas kiek sekundžių siuntėjas tikrina eilę ir kiek laiškų siunčia vienu kartu
+OUTBOX_INTERVAL_SECONDS = int(os.getenv("OUTBOX_INTERVAL_SECONDS", "30"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+# Pakartojimai: 1 min, 2 min, 4 min ... (ne daugiau nei MAX), kol pasiekiamas limitas
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "60"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
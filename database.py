@@ -1,16 +1,75 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from services.profiling import instrument_engine
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "etf.db")
 
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+# --- SQLITE PROFILIS (ENV) ---
+# tuned   – WAL + pragmos kiekvienam prisijungimui (numatytasis)
+# default – paprastas SQLite, kaip anksčiau
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024)))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Pragmos kiekvienam naujam SQLite prisijungimui.
+    WAL leidžia FastAPI skaitytojams netrukdomai skaityti, kol
+    scheduleris rašo; busy_timeout – laukti, o ne mesti „database is locked“.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    # Neigiama reikšmė = KiB, ne puslapiai
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def build_engine(url: str, profile: str = DB_PROFILE):
+    if profile != "tuned":
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+        )
+        instrument_engine(engine)
+        return engine
+
+    engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        # Prisijungimai pernaudojami tarp threadpool / scheduler thread'ų
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+    )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    # SQL skaičius / laikas užklausai ir lėtų užklausų logas
+    instrument_engine(engine)
+
+    return engine
+
+
+engine = build_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -1,10 +1,12 @@
 from database import Base, engine
+from migrations import run_migrations
 import models  # <-- PRIVALO BŪTI
 
 def init_db():
     print("📦 Kuriamos DB lentelės...")
     print("🔍 Rastos lentelės:", Base.metadata.tables.keys())
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     print("✅ Lentelės sukurtos")
 
 if __name__ == "__main__":
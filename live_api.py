@@ -0,0 +1,39 @@
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from services.live_updates import broker
+
+router = APIRouter(
+    prefix="/api/live",
+    tags=["live"],
+)
+
+# Tuščias komentaras kas tiek sekundžių – proxy neuždaro „tylios“ jungties
+KEEPALIVE_SECONDS = 15
+
+
+# =========================================================
+# GET /api/live/stream (Server-Sent Events)
+# =========================================================
+@router.get("/stream")
+async def live_stream(request: Request):
+    queue = broker.subscribe()
+
+    async def events():
+        try:
+            yield b"retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 
 # DB
 from database import engine, Base
+from migrations import run_migrations
 
 # Routers
 from admin_ui import router as admin_router
@@ -12,8 +13,13 @@ from admin_api import router as admin_api_router
 from admin_purchases import router as admin_purchases_router
 from admin_etfs import router as admin_etfs_router
 from admin_portfolio_api import router as admin_portfolio_api_router
+from admin_export_api import router as admin_export_api_router
+from live_api import router as live_api_router
+from metrics_api import router as metrics_api_router
 from portfolio import router as portfolio_router
 
+from services.profiling import ProfilingMiddleware
+
 # Scheduler
 from scheduler import start_scheduler, stop_scheduler
 
@@ -22,6 +28,8 @@ from scheduler import start_scheduler, stop_scheduler
 async def lifespan(app: FastAPI):
     # 🔧 SUKURIAMOS VISOS LENTELĖS (jei jų nėra)
     Base.metadata.create_all(bind=engine)
+    # 🧱 Trūkstami stulpeliai / indeksai esamose lentelėse
+    run_migrations(engine)
 
     start_scheduler()
     yield
@@ -30,6 +38,9 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 
+# Maršrutų latency, SQL / kainų suvestinė (Server-Timing), ?profile=1
+app.add_middleware(ProfilingMiddleware)
+
 # Static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -41,3 +52,6 @@ app.include_router(admin_api_router)
 app.include_router(admin_purchases_router)
 app.include_router(admin_etfs_router)
 app.include_router(admin_portfolio_api_router)
+app.include_router(admin_export_api_router)
+app.include_router(live_api_router)
+app.include_router(metrics_api_router)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from services.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["metrics"])
+
+
+# =========================================================
+# GET /metrics (Prometheus tekstinis formatas)
+# =========================================================
+@router.get("/metrics")
+def metrics():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,169 @@
+"""
+Lengvas versijuotų schemos migracijų vykdytojas.
+
+Base.metadata.create_all() sukuria tik TRŪKSTAMAS lenteles – jau
+esančioms lentelėms stulpelių ir indeksų nepriduria. Tai daro čia
+surašytos migracijos; pritaikytos versijos saugomos `schema_version`.
+
+Naujai migracijai: parašyk funkciją (conn) ir pridėk ją į MIGRATIONS
+su sekančiu numeriu. Migracijos turi būti idempotentiškos.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+
+from services.positions import rebuild_positions
+
+
+# =========================================================
+# HELPERS
+# =========================================================
+def _columns(conn, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+
+
+def _add_column(conn, table: str, column: str, ddl_type: str):
+    if column not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+
+# =========================================================
+# MIGRACIJOS
+# =========================================================
+def m001_missing_columns(conn):
+    """
+    Stulpeliai, kurie yra models.py, bet nebuvo senoje DB.
+    """
+    _add_column(conn, "etfs", "ath_updated_at", "DATETIME")
+    _add_column(conn, "alerts", "purchased_at", "DATETIME")
+    _add_column(conn, "alerts", "currency", "VARCHAR")
+    _add_column(conn, "alerts", "comment", "VARCHAR")
+
+
+def m002_hot_query_indexes(conn):
+    """
+    - purchases (etf_id, purchased_at): get_units_until, portfolio
+    - alerts (etf_id, created_at): paskutinio alerto subquery
+    - alerts (created_at): alert history ORDER BY created_at DESC
+    """
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_purchases_etf_id_purchased_at "
+        "ON purchases (etf_id, purchased_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_alerts_etf_id_created_at "
+        "ON alerts (etf_id, created_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_alerts_created_at "
+        "ON alerts (created_at)"
+    ))
+
+
+def m003_positions(conn):
+    """
+    positions lentelės pradinis užpildymas + purchased_at indeksas
+    (einamųjų metų pinigų srautams be pilno žurnalo skenavimo).
+    """
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_purchases_purchased_at "
+        "ON purchases (purchased_at)"
+    ))
+    rebuild_positions(conn)
+
+
+def m004_portfolio_ytd_stale(conn):
+    """
+    portfolio_ytd.is_stale: invalidacija pažymi reikšmę pasenusia,
+    o ne ištrina ją (rodoma, kol fone skaičiuojama nauja).
+    """
+    _add_column(conn, "portfolio_ytd", "is_stale", "BOOLEAN NOT NULL DEFAULT 0")
+
+
+VERSIONED_TABLES = ("etfs", "alerts", "purchases")
+
+
+def m005_data_versions(conn):
+    """
+    data_versions + trigeriai: bet koks INSERT / UPDATE / DELETE
+    versijuojamoje lentelėje padidina jos versiją (ETag'ams).
+    """
+    conn.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name VARCHAR PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    ))
+
+    for table in VERSIONED_TABLES:
+        conn.execute(
+            text(
+                "INSERT OR IGNORE INTO data_versions (name, version, updated_at) "
+                "VALUES (:name, 0, CURRENT_TIMESTAMP)"
+            ),
+            {"name": table},
+        )
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(text(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_version
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE data_versions
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE name = '{table}';
+                END
+                """
+            ))
+
+
+MIGRATIONS = [
+    (1, "missing columns", m001_missing_columns),
+    (2, "hot query indexes", m002_hot_query_indexes),
+    (3, "positions backfill", m003_positions),
+    (4, "portfolio_ytd stale flag", m004_portfolio_ytd_stale),
+    (5, "data versions", m005_data_versions),
+]
+
+
+# =========================================================
+# RUNNER
+# =========================================================
+def run_migrations(engine):
+    """
+    Pritaiko visas dar nepritaikytas migracijas (kiekvieną – atskiroje
+    transakcijoje). Kviečiama lifespan startup metu po create_all().
+    """
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR NOT NULL,
+                applied_at DATETIME NOT NULL
+            )
+            """
+        ))
+        applied = {
+            row[0]
+            for row in conn.execute(text("SELECT version FROM schema_version"))
+        }
+
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text(
+                    "INSERT OR IGNORE INTO schema_version (version, name, applied_at) "
+                    "VALUES (:version, :name, :applied_at)"
+                ),
+                {"version": version, "name": name, "applied_at": datetime.utcnow()},
+            )
+
+        print(f"🧱 Migracija {version:03d} pritaikyta: {name}")
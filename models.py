@@ -4,8 +4,11 @@ from sqlalchemy import (
     String,
     Float,
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -21,6 +24,7 @@ class ETF(Base):
 
     ath_price = Column(Float, nullable=True)
     drop_threshold = Column(Float, default=5.0, nullable=False)
+    ath_updated_at = Column(DateTime, nullable=True)
     ath_alert_sent = Column(Boolean, default=False, nullable=False)
     manual_reset_at = Column(DateTime, nullable=True)
 
@@ -39,6 +43,10 @@ class ETF(Base):
 
 class Purchase(Base):
     __tablename__ = "purchases"
+    __table_args__ = (
+        Index("ix_purchases_etf_id_purchased_at", "etf_id", "purchased_at"),
+        Index("ix_purchases_purchased_at", "purchased_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     etf_id = Column(Integer, ForeignKey("etfs.id"), nullable=False)
@@ -58,6 +66,10 @@ class Purchase(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_etf_id_created_at", "etf_id", "created_at"),
+        Index("ix_alerts_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     etf_id = Column(Integer, ForeignKey("etfs.id"), nullable=False)
@@ -84,3 +96,77 @@ class PortfolioYTD(Base):
     year = Column(Integer, unique=True, nullable=False)
     start_value = Column(Float, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # True – reikšmė pasenusi, fone jau skaičiuojama nauja
+    is_stale = Column(Boolean, default=False, nullable=False)
+
+
+# Paskutinės žinomos kainos (quote cache atsarginė kopija)
+class Quote(Base):
+    __tablename__ = "quotes"
+
+    ticker = Column(String, primary_key=True)
+    price = Column(Float, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Dienos OHLC istorija (vietinė kopija, papildoma inkrementiškai)
+class PriceHistory(Base):
+    __tablename__ = "price_history"
+    __table_args__ = (
+        UniqueConstraint("ticker", "date", name="uq_price_history_ticker_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+
+    open = Column(Float, nullable=True)
+    high = Column(Float, nullable=True)
+    low = Column(Float, nullable=True)
+    close = Column(Float, nullable=False)
+
+
+# Materializuotos pozicijos (palaikomos inkrementiškai su kiekvienu pirkimu)
+class Position(Base):
+    __tablename__ = "positions"
+
+    etf_id = Column(Integer, ForeignKey("etfs.id"), primary_key=True)
+
+    units = Column(Float, default=0.0, nullable=False)
+    invested = Column(Float, default=0.0, nullable=False)
+
+    first_trade_at = Column(DateTime, nullable=True)
+    last_trade_at = Column(DateTime, nullable=True)
+
+
+# Lentelių versijos (didina SQLite trigeriai – žr. migrations.m005)
+# HTTP ETag / atsakymų cache'ui: pakeitimą pamato net kiti procesai
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Laiškų eilė (outbox): įrašoma ciklo transakcijoje, siunčia atskiras darbas
+# (services.email_outbox). sent_at IS NULL – dar neišsiųsta.
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_pending", "sent_at", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    subject = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    # Kableliais atskirti gavėjai
+    recipients = Column(String, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
@@ -1,5 +1,6 @@
 import time
 from scheduler import check_etf_prices
+from services.email_outbox import drain_outbox
 
 INTERVAL_SECONDS = 60 * 15  # kas 15 min
 
@@ -11,5 +12,11 @@ while True:
     except Exception as e:
         print(f"❌ Scheduler klaida: {e}")
 
+    # Laiškai iš outbox (ciklo rezultatai jau įrašyti, SMTP klaida jų neliečia)
+    try:
+        drain_outbox()
+    except Exception as e:
+        print(f"❌ Outbox klaida: {e}")
+
     print(f"⏳ Laukiam {INTERVAL_SECONDS // 60} min...\n")
     time.sleep(INTERVAL_SECONDS)
@@ -1,21 +1,78 @@
 # scheduler.py
 
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+)
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
+from datetime import datetime, timezone
+import time
+
+from sqlalchemy import update
 
+from config import OUTBOX_INTERVAL_SECONDS
 from database import SessionLocal
 from models import ETF
-from services.price_checker import fetch_current_price
+from services.price_checker import collect_current_prices
+from services.quote_cache import quote_cache
 from services.ath_cache import (
     update_ath_if_new,
     get_or_create_ath,
 )
-from services.alerts import create_alert
-from services.email_service import send_daily_summary_if_needed
+from services.alerts import create_alert, insert_alerts
+from services.email_outbox import close_smtp, drain_outbox, enqueue_daily_summary
+from services.live_updates import publish_cycle
+from services.metrics import registry
 
 scheduler = BackgroundScheduler()
 
+# =========================================================
+# Metrikos (GET /metrics)
+# =========================================================
+CYCLE_SECONDS = registry.histogram(
+    "etf_cycle_duration_seconds",
+    "Viso kainų tikrinimo ciklo trukmė",
+)
+CYCLE_TICKERS = registry.gauge(
+    "etf_cycle_tickers",
+    "Kiek ETF tikrinta paskutiniame cikle",
+)
+CYCLE_LAST_SUCCESS = registry.gauge(
+    "etf_cycle_last_success_timestamp_seconds",
+    "Paskutinio sėkmingo ciklo pabaiga (unix laikas)",
+)
+ALERTS_CREATED = registry.counter(
+    "etf_alerts_created_total",
+    "Sukurti (įrašyti) alertai",
+)
+JOB_LAG_SECONDS = registry.histogram(
+    "etf_scheduler_lag_seconds",
+    "Vėlavimas nuo suplanuoto paleidimo iki pateikimo vykdymui",
+    ("job",),
+)
+JOB_EVENTS = registry.counter(
+    "etf_scheduler_job_events_total",
+    "Darbo įvykiai: error, missed, skipped (ankstesnis paleidimas dar vyksta)",
+    ("job", "event"),
+)
+
+_JOB_EVENT_NAMES = {
+    EVENT_JOB_ERROR: "error",
+    EVENT_JOB_MISSED: "missed",
+    EVENT_JOB_MAX_INSTANCES: "skipped",
+}
+
+# ETF laukai, kuriuos keičia ciklas (rašomi vienu bulk UPDATE)
+CYCLE_FIELDS = (
+    "ath_price",
+    "ath_updated_at",
+    "ath_alert_sent",
+    "manual_reset_at",
+)
+
 
 def is_alert_allowed(etf: ETF) -> bool:
     """
@@ -39,11 +96,12 @@ def calculate_drop_percentage(etf: ETF, current_price: float) -> float | None:
     return ((etf.ath_price - current_price) / etf.ath_price) * 100
 
 
-def process_single_etf(db, etf, triggered_alerts):
+def process_single_etf(etf, prices, triggered_alerts, alert_rows):
     """
-    Apdoroja vieną ETF
+    Apdoroja vieną ETF pagal jau surinktą kainų žemėlapį.
+    Tik keičia objektus / kaupia alertus – DB rašo check_etf_prices.
     """
-    current_price = fetch_current_price(etf.ticker)
+    current_price = prices.get(etf.ticker)
     if current_price is None:
         return
 
@@ -60,7 +118,6 @@ def process_single_etf(db, etf, triggered_alerts):
     if etf.ath_price != old_ath:
         etf.ath_alert_sent = 0
         etf.manual_reset_at = None
-        db.commit()
         return
 
     # 2️⃣ Drop scenarijus
@@ -76,15 +133,14 @@ def process_single_etf(db, etf, triggered_alerts):
         return
 
     # 4️⃣ Alert sukūrimas
-    create_alert(
-        etf=etf,
-        current_price=current_price,
-        drop_percent=drop_percent,
+    alert_rows.append(
+        create_alert(
+            etf=etf,
+            current_price=current_price,
+            drop_percent=drop_percent,
+        )
     )
 
-    etf.ath_alert_sent = 1
-    db.commit()
-
     triggered_alerts.append(
         {
             "ticker": etf.ticker,
@@ -95,26 +151,110 @@ def process_single_etf(db, etf, triggered_alerts):
     )
 
 
+def _cycle_state(etf: ETF) -> tuple:
+    return tuple(getattr(etf, field) for field in CYCLE_FIELDS)
+
+
+def write_cycle_changes(db, etfs, before, alert_rows, triggered_alerts=()):
+    """
+    Vienas unit of work visam ciklui:
+    - pakeisti ETF → vienas executemany UPDATE pagal id
+    - nauji alertai → vienas executemany INSERT
+    - dienos ataskaita → email_outbox (siunčia atskiras darbas)
+    - vienas commit
+    Grąžina ETF pakeitimus (gyviems atnaujinimams).
+    """
+    updates = [
+        {"id": etf.id, **{f: getattr(etf, f) for f in CYCLE_FIELDS}}
+        for etf in etfs
+        if _cycle_state(etf) != before[etf.id]
+    ]
+
+    if updates:
+        db.execute(update(ETF), updates)
+    insert_alerts(db, alert_rows)
+    enqueue_daily_summary(db, triggered_alerts)
+    db.commit()
+
+    return updates
+
+
 def check_etf_prices():
     """
     Scheduler ciklas
     """
     print(f"⏱️ ETF check started @ {datetime.now()}")
+    started = time.perf_counter()
 
     db = SessionLocal()
     triggered_alerts = []
+    alert_rows = []
 
     try:
         etfs = db.query(ETF).all()
+
+        # Objektus atjungiam: ciklas juos keičia atmintyje, o į DB
+        # pakeitimai keliauja tik per write_cycle_changes()
+        db.expunge_all()
+        before = {etf.id: _cycle_state(etf) for etf in etfs}
+
+        # 1️⃣ Kainų surinkimas (lygiagrečiai, su deadline'ais)
+        prices, timed_out = collect_current_prices([etf.ticker for etf in etfs])
+        quote_cache.put_many(prices)
+
+        skipped = set(timed_out)
+        missing = [
+            etf.ticker
+            for etf in etfs
+            if etf.ticker not in prices and etf.ticker not in skipped
+        ]
+        print(f"💹 Gautos kainos: {len(prices)}/{len(etfs)}")
+        if timed_out:
+            print(f"⌛ Neatsakė laiku ({len(timed_out)}): {', '.join(timed_out)}")
+        if missing:
+            print(f"❔ Be duomenų ({len(missing)}): {', '.join(missing)}")
+
+        # 2️⃣ ATH / alertų vertinimas pagal surinktas kainas
         for etf in etfs:
-            process_single_etf(db, etf, triggered_alerts)
+            process_single_etf(etf, prices, triggered_alerts, alert_rows)
+
+        # 3️⃣ Vienas commit visam ciklui
+        etf_updates = write_cycle_changes(db, etfs, before, alert_rows, triggered_alerts)
+        ALERTS_CREATED.inc(len(alert_rows))
     finally:
         db.close()
 
-    send_daily_summary_if_needed(triggered_alerts)
+    # 4️⃣ Vienas įvykis visiems atidarytiems dashboardams
+    try:
+        listeners = publish_cycle(prices, etfs, etf_updates, alert_rows)
+        if listeners:
+            print(f"📡 Atnaujinimas išsiųstas {listeners} klientams")
+    except Exception as e:
+        print(f"❌ Gyvas atnaujinimas nepavyko: {e}")
+
+    # 5️⃣ Laiškas jau eilėje – siuntėją pažadinam, nelaukiant intervalo
+    if triggered_alerts and scheduler.running:
+        scheduler.modify_job("email_outbox", next_run_time=datetime.now(timezone.utc))
+
+    CYCLE_SECONDS.observe(time.perf_counter() - started)
+    CYCLE_TICKERS.set(len(etfs))
+    CYCLE_LAST_SUCCESS.set(time.time())
     print(f"✅ ETF check finished @ {datetime.now()}")
 
 
+def _on_job_event(event):
+    """
+    APScheduler įvykiai → metrikos. SUBMITTED nešasi suplanuotą laiką,
+    tad vėlavimas = dabar - paskutinis suplanuotas paleidimas.
+    """
+    if event.code == EVENT_JOB_SUBMITTED:
+        lag = datetime.now(timezone.utc) - max(event.scheduled_run_times)
+        JOB_LAG_SECONDS.observe(max(lag.total_seconds(), 0.0), job=event.job_id)
+        return
+
+    JOB_EVENTS.inc(job=event.job_id, event=_JOB_EVENT_NAMES[event.code])
+
+
 def start_scheduler():
     if scheduler.running:
         return
@@ -125,6 +265,19 @@ def start_scheduler():
         id="etf_price_check",
         replace_existing=True,
     )
+    # SMTP ciklo nestabdo: laiškai siunčiami iš outbox atskiru darbu
+    scheduler.add_job(
+        drain_outbox,
+        trigger=IntervalTrigger(seconds=OUTBOX_INTERVAL_SECONDS),
+        id="email_outbox",
+        replace_existing=True,
+        coalesce=True,
+    )
+
+    scheduler.add_listener(
+        _on_job_event,
+        EVENT_JOB_SUBMITTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES,
+    )
 
     scheduler.start()
     print(f"🟢 Scheduler started @ {datetime.now()}")
@@ -133,4 +286,5 @@ def start_scheduler():
 def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown()
+        close_smtp()
         print("🔴 Scheduler stopped")
@@ -0,0 +1,295 @@
+"""
+Bendras admin servisų sluoksnis.
+
+Jį kviečia ir JSON API (admin_api.py), ir HTML routeriai
+(admin_purchases.py, admin_etfs.py) – tiesiogiai, be HTTP kvietimų
+atgal į tą patį serverį.
+"""
+import base64
+from datetime import date, datetime, time, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from config import ADMIN_PAGE_SIZE, ADMIN_PAGE_SIZE_MAX
+from models import Alert, ETF, Position, Purchase
+from services.positions import refresh_position
+from services.ytd_service import apply_purchase_change_to_ytd
+
+
+# =========================================================
+# SERIALIZACIJA
+# =========================================================
+def etf_to_dict(etf: ETF) -> dict:
+    return {
+        "id": etf.id,
+        "ticker": etf.ticker,
+        "ath_price": etf.ath_price,
+        "drop_threshold": etf.drop_threshold,
+        "ath_alert_sent": etf.ath_alert_sent,
+        "manual_reset_at": etf.manual_reset_at,
+    }
+
+
+def purchase_to_dict(p: Purchase) -> dict:
+    return {
+        "id": p.id,
+        "etf_id": p.etf_id,
+        "units": p.units,
+        "price": p.price,
+        "purchased_at": p.purchased_at,
+        "currency": p.currency,
+        "comment": p.comment,
+    }
+
+
+# =========================================================
+# KEYSET PUSLAPIAVIMAS
+# =========================================================
+def encode_cursor(moment: datetime | None, row_id: int) -> str:
+    # NULL momentas – tuščia rakto dalis
+    raw = f"{moment.isoformat() if moment is not None else ''}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        moment, row_id = raw.rsplit("|", 1)
+        return (datetime.fromisoformat(moment) if moment else None), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_size(limit: int | None) -> int:
+    if limit is None:
+        return ADMIN_PAGE_SIZE
+    return max(1, min(limit, ADMIN_PAGE_SIZE_MAX))
+
+
+def _keyset_page(query, moment_col, id_col, cursor, limit, to_dict) -> dict:
+    """
+    Naujausi pirma: ORDER BY (moment, id) DESC, kitas puslapis – nuo
+    paskutinės eilutės rakto (be OFFSET, todėl kaina nepriklauso nuo
+    puslapio numerio). Imam limit + 1, kad žinotume, ar yra daugiau.
+
+    Eilutės be momento (NULL) – gale, tarpusavyje pagal id DESC. Jos
+    imamos atskira užklausa: OR sąlyga atimtų indekso paiešką nuo rakto.
+    """
+    limit = page_size(limit)
+    moment, row_id = decode_cursor(cursor) if cursor else (None, None)
+
+    def fetch(q, count):
+        return q.order_by(moment_col.desc(), id_col.desc()).limit(count).all()
+
+    if cursor and moment is None:
+        rows = fetch(query.filter(moment_col.is_(None), id_col < row_id), limit + 1)
+    else:
+        dated = query.filter(moment_col.isnot(None))
+        if cursor:
+            dated = dated.filter(tuple_(moment_col, id_col) < tuple_(moment, row_id))
+        rows = fetch(dated, limit + 1)
+        if len(rows) <= limit:
+            rows += fetch(query.filter(moment_col.is_(None)), limit + 1 - len(rows))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, moment_col.key),
+            getattr(last, id_col.key),
+        )
+
+    return {"items": [to_dict(r) for r in rows], "next_cursor": next_cursor}
+
+
+def parse_date(value: str | None, field: str) -> date | None:
+    """
+    Data iš formos / query string (YYYY-MM-DD); tuščia – None.
+    """
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}: expected YYYY-MM-DD")
+
+
+def date_range(query, column, date_from: date | None, date_to: date | None):
+    """
+    Datų filtras ORM užklausai arba select() (naudoja ir data_export).
+    date_to imtinai – iki kitos dienos pradžios.
+    """
+    if date_from is not None:
+        query = query.filter(column >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        query = query.filter(column < datetime.combine(date_to + timedelta(days=1), time.min))
+    return query
+
+
+# =========================================================
+# ETF
+# =========================================================
+def list_etfs(db: Session) -> list[dict]:
+    return [etf_to_dict(etf) for etf in db.query(ETF).all()]
+
+
+def get_etf(db: Session, etf_id: int) -> dict:
+    etf = db.query(ETF).filter(ETF.id == etf_id).first()
+    if not etf:
+        raise HTTPException(status_code=404, detail="ETF not found")
+
+    return etf_to_dict(etf)
+
+
+def delete_etf(db: Session, etf_id: int) -> dict:
+    etf = db.query(ETF).filter(ETF.id == etf_id).first()
+    if not etf:
+        raise HTTPException(status_code=404, detail="ETF not found")
+
+    has_purchases = (
+        db.query(Purchase)
+        .filter(Purchase.etf_id == etf_id)
+        .count() > 0
+    )
+
+    if has_purchases:
+        raise HTTPException(
+            status_code=400,
+            detail="ETF cannot be deleted because it has purchases",
+        )
+
+    db.query(Alert).filter(Alert.etf_id == etf_id).delete()
+    db.query(Position).filter(Position.etf_id == etf_id).delete()
+    db.delete(etf)
+    db.commit()
+
+    return {"status": "deleted", "id": etf_id}
+
+
+# =========================================================
+# ALERTS
+# =========================================================
+def alert_to_dict(r) -> dict:
+    return {
+        "id": r.id,
+        "ticker": r.ticker,
+        "price": r.price,
+        "ath_price": r.ath_price,
+        "created_at": r.created_at,
+    }
+
+
+def list_alerts(
+    db: Session,
+    ticker: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> dict:
+    """
+    Alertų istorijos puslapis (naujausi pirma, raktas – (created_at, id)).
+    """
+    query = (
+        db.query(
+            Alert.id,
+            ETF.ticker,
+            Alert.price,
+            ETF.ath_price,
+            Alert.created_at,
+        )
+        .join(ETF, Alert.etf_id == ETF.id)
+    )
+
+    if ticker:
+        query = query.filter(ETF.ticker == ticker.upper())
+
+    query = date_range(query, Alert.created_at, date_from, date_to)
+
+    return _keyset_page(query, Alert.created_at, Alert.id, cursor, limit, alert_to_dict)
+
+
+def last_alerts(db: Session) -> dict[int, dict]:
+    """
+    Paskutinis kiekvieno ETF alertas (etf_id → alertas), vienu grupuotu
+    užklausimu – nepriklauso nuo to, kiek alertų istorijoje.
+    """
+    latest = (
+        db.query(
+            Alert.etf_id,
+            func.max(Alert.created_at).label("last_time"),
+        )
+        .group_by(Alert.etf_id)
+        .subquery()
+    )
+
+    rows = (
+        db.query(Alert.id, Alert.etf_id, ETF.ticker, Alert.price, ETF.ath_price, Alert.created_at)
+        .join(ETF, Alert.etf_id == ETF.id)
+        .join(
+            latest,
+            (Alert.etf_id == latest.c.etf_id)
+            & (Alert.created_at == latest.c.last_time),
+        )
+        .order_by(Alert.id)
+        .all()
+    )
+
+    # Tas pats momentas keliems alertams – imam vėliausią id
+    return {r.etf_id: alert_to_dict(r) for r in rows}
+
+
+# =========================================================
+# PURCHASES
+# =========================================================
+def list_purchases(
+    db: Session,
+    etf_id: int | None = None,
+    ticker: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> dict:
+    """
+    Pirkimų puslapis (naujausi pirma, raktas – (purchased_at, id)).
+    """
+    query = db.query(Purchase)
+
+    if etf_id is not None:
+        query = query.filter(Purchase.etf_id == etf_id)
+    if ticker:
+        query = query.join(ETF, ETF.id == Purchase.etf_id).filter(ETF.ticker == ticker.upper())
+
+    query = date_range(query, Purchase.purchased_at, date_from, date_to)
+
+    return _keyset_page(
+        query, Purchase.purchased_at, Purchase.id, cursor, limit, purchase_to_dict
+    )
+
+
+def get_purchase(db: Session, purchase_id: int) -> dict:
+    purchase = db.query(Purchase).filter(Purchase.id == purchase_id).first()
+    if not purchase:
+        raise HTTPException(status_code=404, detail="Purchase not found")
+
+    return purchase_to_dict(purchase)
+
+
+def delete_purchase(db: Session, purchase_id: int) -> dict:
+    purchase = db.query(Purchase).filter(Purchase.id == purchase_id).first()
+    if not purchase:
+        raise HTTPException(status_code=404, detail="Purchase not found")
+
+    etf_id = purchase.etf_id
+    old = (purchase.units, purchase.purchased_at)
+
+    db.delete(purchase)
+    refresh_position(db, etf_id)
+    db.commit()
+    apply_purchase_change_to_ytd(db, etf_id, old=old)
+
+    return {"status": "deleted", "id": purchase_id}
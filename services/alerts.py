@@ -1,37 +1,18 @@
 from datetime import datetime
-from database import SessionLocal
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
 from models import Alert, ETF
-from sqlalchemy import text
 
 
-def create_alert(etf: ETF, current_price: float, drop_percent: float) -> Alert:
+def create_alert(etf: ETF, current_price: float, drop_percent: float) -> dict:
     """
-    Sukuria alert DB įrašą (1 alert = 1 ATH ciklas)
+    Paruošia alert įrašą (1 alert = 1 ATH ciklas) ir pažymi ETF.
+    Į DB rašoma vėliau, visi ciklo alertai kartu – insert_alerts().
     drop_percent NESAUGOMAS DB – naudojamas tik logikai / email
     """
-    db = SessionLocal()
-
-    # ⛔ NE naudojam ORM insert, nes DB schema sena
-    # ✅ Explicit INSERT tik su egzistuojančiais stulpeliais
-    db.execute(
-        text(
-            """
-            INSERT INTO alerts (etf_id, price, created_at)
-            VALUES (:etf_id, :price, :created_at)
-            """
-        ),
-        {
-            "etf_id": etf.id,
-            "price": current_price,
-            "created_at": datetime.utcnow(),
-        },
-    )
-
     # Pažymim, kad šiam ATH alertas jau išsiųstas
     etf.ath_alert_sent = True
-    db.merge(etf)
-
-    db.commit()
 
     print(
         f"🚨 ALERT sukurtas: {etf.ticker} | "
@@ -39,6 +20,19 @@ def create_alert(etf: ETF, current_price: float, drop_percent: float) -> Alert:
         f"Kritimas: {drop_percent:.2f}%"
     )
 
-    db.close()
+    return {
+        "etf_id": etf.id,
+        "price": current_price,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def insert_alerts(db: Session, rows: list[dict]):
+    """
+    Vienas executemany INSERT visiems ciklo alertams (be commit'o).
+    """
+    if not rows:
+        return
 
-    return None
+    # Core INSERT (executemany) – be ORM objektų kūrimo kiekvienai eilutei
+    db.execute(insert(Alert), rows)
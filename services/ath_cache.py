@@ -1,13 +1,20 @@
 from datetime import datetime, timedelta
-from services.yf_service import get_all_time_high
-from database import SessionLocal
+from services.price_history import get_all_time_high
 from models import ETF
+from services.metrics import registry
+
+ATH_UPDATES = registry.counter(
+    "etf_ath_updates_total",
+    "ATH pakeitimai (initial – iš istorijos, new – nauja aukštuma)",
+    ("kind",),
+)
 
 
 def get_or_create_ath(etf: ETF) -> float | None:
     """
     1. Jei ATH jau yra DB – grąžinam
-    2. Jei nėra – pasiimam iš Yahoo, išsaugom DB, grąžinam
+    2. Jei nėra – skaičiuojam iš vietinės istorijos, pažymim ETF, grąžinam
+    Keičiamas tik objektas – commit'ą daro kviečiantysis (vienas per ciklą).
     """
     if etf.ath_price is not None:
         return etf.ath_price
@@ -16,34 +23,28 @@ def get_or_create_ath(etf: ETF) -> float | None:
     if ath is None:
         return None
 
-    db = SessionLocal()
     etf.ath_price = ath
     etf.ath_updated_at = datetime.utcnow()
     etf.ath_alert_sent = False
     etf.manual_reset_at = None
-    db.merge(etf)
-    db.commit()
-    db.close()
 
+    ATH_UPDATES.inc(kind="initial")
     print(f"📌 ATH cache sukurtas {etf.ticker}: {ath:.2f}")
     return ath
 
 
 def update_ath_if_new(etf: ETF, current_price: float) -> bool:
     """
-    Jei kaina > ATH → atnaujinam DB.
+    Jei kaina > ATH → atnaujinam ETF (kviečiančiojo sesijoje).
     Grąžina True jei tai NAUJAS ATH.
     """
     if etf.ath_price is None or current_price > etf.ath_price:
-        db = SessionLocal()
         etf.ath_price = current_price
         etf.ath_updated_at = datetime.utcnow()
         etf.ath_alert_sent = False
         etf.manual_reset_at = None
-        db.merge(etf)
-        db.commit()
-        db.close()
 
+        ATH_UPDATES.inc(kind="new")
         print(f"🚀 Naujas ATH {etf.ticker}: {current_price:.2f}")
         return True
 
@@ -79,10 +80,6 @@ def is_alert_allowed(etf: ETF) -> bool:
 
 def mark_alert_sent(etf: ETF):
     """
-    Pažymi, kad alertas buvo išsiųstas.
+    Pažymi, kad alertas buvo išsiųstas (commit'as – kviečiančiojo).
     """
-    db = SessionLocal()
     etf.ath_alert_sent = True
-    db.merge(etf)
-    db.commit()
-    db.close()
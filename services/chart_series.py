@@ -0,0 +1,191 @@
+"""
+Grafikų eilutės portfolio.html: NAV ir tickerių kainos, sumažintos
+iki nurodyto taškų skaičiaus (LTTB – Largest Triangle Three Buckets).
+
+Atsakymo dydis priklauso tik nuo `points`, ne nuo saugomos istorijos
+ilgio. Rezultatai cache'uojami pagal (range, points) ir tampa negaliojantys,
+kai atsiranda naujų barų arba pasikeičia pirkimai / ETF (data_versions).
+"""
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import ETF, Position
+from services.http_cache import get_versions
+from services.nav_series import load_price_matrix, portfolio_nav_series
+from services.positions import UNITS_EPSILON
+from services.price_history import bars_version, schedule_sync
+
+RANGES = {
+    "1m": 31,
+    "3m": 92,
+    "6m": 183,
+    "1y": 365,
+    "5y": 1826,
+}
+RANGE_NAMES = [*RANGES, "ytd", "max"]
+
+MIN_POINTS = 10
+MAX_POINTS = 2000
+CACHE_MAX_SIZE = 64
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    LTTB: iš kiekvieno kibiro paliekamas taškas, sudarantis didžiausią
+    trikampį su ankstesniu pasirinktu tašku ir kito kibiro vidurkiu.
+    Pirmas ir paskutinis taškai išlieka visada.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    every = (n - 2) / (threshold - 2)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return selected
+
+
+def range_start(range_name: str, today: date | None = None) -> date | None:
+    today = today or date.today()
+
+    if range_name == "max":
+        return None
+    if range_name == "ytd":
+        return date(today.year, 1, 1)
+
+    return today - timedelta(days=RANGES[range_name])
+
+
+def _data_token(db: Session) -> tuple:
+    """
+    Kas pasikeitus cache'as nebegalioja: nauji barai (bars_version) ir
+    bet koks purchases / etfs pakeitimas (data_versions – trigeriai didina
+    versiją kiekvienam INSERT / UPDATE / DELETE, net pakeitus tik datą).
+    """
+    tag, _ = get_versions(db, ("purchases", "etfs"))
+
+    return (bars_version(), tag)
+
+
+def _downsample(dates, columns: dict[str, np.ndarray], key: str, points: int) -> dict:
+    idx = lttb_indices(columns[key], points)
+
+    return {
+        "dates": [dates[i].date().isoformat() for i in idx],
+        **{
+            name: [round(float(v), 2) for v in values[idx]]
+            for name, values in columns.items()
+        },
+    }
+
+
+def build_chart_series(db: Session, range_name: str, points: int) -> dict:
+    start = range_start(range_name)
+
+    nav = portfolio_nav_series(db, start)
+    portfolio = (
+        _downsample(
+            nav.index,
+            {"nav": nav["nav"].to_numpy(), "invested": nav["invested"].to_numpy()},
+            "nav",
+            points,
+        )
+        if not nav.empty
+        else {"dates": [], "nav": [], "invested": []}
+    )
+
+    held = [
+        t for (t,) in (
+            db.query(ETF.ticker)
+            .join(Position, Position.etf_id == ETF.id)
+            .filter(func.abs(Position.units) > UNITS_EPSILON)
+            .order_by(ETF.ticker)
+            .all()
+        )
+    ]
+
+    tickers = {}
+    if held:
+        prices = load_price_matrix(db, held, start)
+        for ticker in held:
+            close = prices[ticker].dropna()
+            if close.empty:
+                continue
+            tickers[ticker] = _downsample(
+                close.index,
+                {"close": close.to_numpy()},
+                "close",
+                points,
+            )
+
+    return {
+        "range": range_name,
+        "points": points,
+        "portfolio": portfolio,
+        "tickers": tickers,
+    }
+
+
+def get_chart_series(db: Session, range_name: str, points: int) -> bytes:
+    """
+    Cache'uota build_chart_series() – jau užkoduotas JSON, kad cache
+    pataikymas nekainuotų serializacijos. Istorija papildoma fone –
+    atsiradę barai pakeičia raktą, o užklausa Yahoo nelaukia.
+    """
+    points = max(MIN_POINTS, min(points, MAX_POINTS))
+
+    traded = [
+        t for (t,) in db.query(ETF.ticker).join(Position, Position.etf_id == ETF.id).all()
+    ]
+    schedule_sync(traded)
+
+    key = (range_name, range_start(range_name), points)
+    token = _data_token(db)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == token:
+            _cache.move_to_end(key)
+            return cached[1]
+
+    payload = json.dumps(
+        build_chart_series(db, range_name, points),
+        separators=(",", ":"),
+    ).encode()
+
+    with _cache_lock:
+        _cache[key] = (token, payload)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_SIZE:
+            _cache.popitem(last=False)
+
+    return payload
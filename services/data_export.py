@@ -0,0 +1,247 @@
+"""
+Srautinis duomenų eksportas (mokesčių ataskaitoms / analizei).
+
+Eilutės skaitomos dalimis (yield_per) savoje sesijoje ir iškart
+siunčiamos klientui, tad atmintis nepriklauso nuo lentelės dydžio,
+o pirmi baitai išeina prieš perskaitant visą lentelę.
+
+Formatai: csv visada; parquet ir arrow (IPC stream) – jei įdiegtas
+pyarrow (pip install pyarrow).
+"""
+import csv
+import io
+from datetime import date
+from typing import Iterator
+
+from sqlalchemy import case, func, select
+from sqlalchemy.sql import Select
+
+from database import SessionLocal
+from models import Alert, ETF, PriceHistory, Purchase
+from services.admin_service import date_range
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_ROWS = 10_000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Stulpeliai ir jų tipai (arrow schema); pavadinimai – kaip CSV antraštė
+EXPORTS = {
+    # Tie patys stulpeliai kaip purchase_import – eksportą galima importuoti atgal
+    "purchases": (
+        ("id", "int64"),
+        ("ticker", "string"),
+        ("side", "string"),
+        ("units", "float64"),
+        ("price", "float64"),
+        ("purchased_at", "timestamp"),
+        ("currency", "string"),
+        ("comment", "string"),
+    ),
+    "alerts": (
+        ("id", "int64"),
+        ("ticker", "string"),
+        ("price", "float64"),
+        ("created_at", "timestamp"),
+    ),
+    "price_history": (
+        ("ticker", "string"),
+        ("date", "date"),
+        ("open", "float64"),
+        ("high", "float64"),
+        ("low", "float64"),
+        ("close", "float64"),
+    ),
+}
+
+
+def available_formats() -> list[str]:
+    return ["csv", "parquet", "arrow"] if pa is not None else ["csv"]
+
+
+def build_statement(
+    name: str,
+    ticker: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> Select:
+    """
+    SELECT eksportui. Tvarka chronologinė (price_history – pagal tickerį ir
+    datą, per unikalų indeksą).
+    """
+    if name == "purchases":
+        stmt = (
+            select(
+                Purchase.id,
+                ETF.ticker,
+                case((Purchase.units < 0, "SELL"), else_="BUY"),
+                func.abs(Purchase.units),
+                Purchase.price,
+                Purchase.purchased_at,
+                Purchase.currency,
+                Purchase.comment,
+            )
+            .join(ETF, ETF.id == Purchase.etf_id)
+            .order_by(Purchase.purchased_at, Purchase.id)
+        )
+        stmt = date_range(stmt, Purchase.purchased_at, date_from, date_to)
+        if ticker:
+            stmt = stmt.where(ETF.ticker == ticker.upper())
+        return stmt
+
+    if name == "alerts":
+        stmt = (
+            select(Alert.id, ETF.ticker, Alert.price, Alert.created_at)
+            .join(ETF, ETF.id == Alert.etf_id)
+            .order_by(Alert.created_at, Alert.id)
+        )
+        stmt = date_range(stmt, Alert.created_at, date_from, date_to)
+        if ticker:
+            stmt = stmt.where(ETF.ticker == ticker.upper())
+        return stmt
+
+    if name == "price_history":
+        stmt = select(
+            PriceHistory.ticker,
+            PriceHistory.date,
+            PriceHistory.open,
+            PriceHistory.high,
+            PriceHistory.low,
+            PriceHistory.close,
+        ).order_by(PriceHistory.ticker, PriceHistory.date)
+        # date stulpelis – be laiko dalies
+        if date_from is not None:
+            stmt = stmt.where(PriceHistory.date >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(PriceHistory.date <= date_to)
+        if ticker:
+            stmt = stmt.where(PriceHistory.ticker == ticker.upper())
+        return stmt
+
+    raise ValueError(f"Unknown export {name!r}")
+
+
+def _batches(stmt: Select) -> Iterator[list]:
+    """
+    Eilutės dalimis po EXPORT_CHUNK_ROWS. Sesija atidaroma čia, ne per
+    FastAPI dependency – generatorius gyvena ilgiau nei endpoint'as.
+    """
+    db = SessionLocal()
+    try:
+        # Core vykdymas per sesijos jungtį – be ORM eilučių apdorojimo
+        result = db.connection().execution_options(
+            yield_per=EXPORT_CHUNK_ROWS
+        ).execute(stmt)
+        for rows in result.partitions():
+            yield rows
+    finally:
+        db.close()
+
+
+def _csv_chunks(name: str, stmt: Select) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # Antraštė išsiunčiama dar prieš užklausą
+    writer.writerow([column for column, _ in EXPORTS[name]])
+    yield buffer.getvalue().encode()
+
+    # ISO formatas tik datų stulpeliams, ne kiekvienai reikšmei
+    temporal = [i for i, (_, kind) in enumerate(EXPORTS[name]) if kind in ("timestamp", "date")]
+
+    for rows in _batches(stmt):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            row = list(row)
+            for i in temporal:
+                if row[i] is not None:
+                    row[i] = row[i].isoformat()
+            writer.writerow(row)
+        yield buffer.getvalue().encode()
+
+
+class _Sink:
+    """
+    Minimalus rašomas „failas“ pyarrow writeriams: surinktus baitus
+    atiduodam po kiekvienos dalies.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(name: str):
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "date": pa.date32(),
+    }
+    return pa.schema([(column, types[kind]) for column, kind in EXPORTS[name]])
+
+
+def _arrow_chunks(name: str, stmt: Select, fmt: str) -> Iterator[bytes]:
+    schema = _arrow_schema(name)
+    sink = _Sink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    for rows in _batches(stmt):
+        columns = list(zip(*rows))
+        writer.write_batch(pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        ))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(name: str, stmt: Select, fmt: str = "csv") -> Iterator[bytes]:
+    if fmt == "csv":
+        return _csv_chunks(name, stmt)
+    if fmt in ("parquet", "arrow"):
+        if pa is None:
+            raise ValueError(f"Format {fmt!r} requires pyarrow")
+        return _arrow_chunks(name, stmt, fmt)
+    raise ValueError(f"Unknown format {fmt!r}")
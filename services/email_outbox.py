@@ -0,0 +1,249 @@
+"""
+Laiškų outbox: ciklas laiškų nesiunčia, o įrašo juos į `email_outbox`
+toje pačioje transakcijoje kaip alertus. Atskiras scheduler darbas
+(drain_outbox) eilę iškrauna:
+
+- vienas SMTP prisijungimas pernaudojamas visiems batch'o laiškams ir
+  tarp paleidimų (prieš naudojant patikrinamas NOOP)
+- nepavykęs laiškas atidedamas eksponentiškai (OUTBOX_BACKOFF_SECONDS,
+  2x, ... iki OUTBOX_BACKOFF_MAX_SECONDS); po OUTBOX_MAX_ATTEMPTS
+  bandymų (5xx atsakymo laiškui – iš karto) paliekamas lentelėje su
+  last_error; prisijungimo ir login klaidos visada laikinos
+- nutrūkus prisijungimui likę batch'o laiškai lieka eilėje be bandymo
+
+Pristatymas – bent kartą: jei procesas nukrenta po siuntimo, bet prieš
+commit, laiškas bus išsiųstas dar kartą.
+"""
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from sqlalchemy import func, select
+
+from config import (
+    OUTBOX_BACKOFF_MAX_SECONDS,
+    OUTBOX_BACKOFF_SECONDS,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    SMTP_TIMEOUT_SECONDS,
+)
+from database import SessionLocal
+from models import EmailOutbox
+from services.email_service import (
+    ALERT_EMAIL,
+    EMAIL_FAILURES,
+    EMAIL_SEND_SECONDS,
+    conf,
+    daily_summary,
+)
+from services.metrics import registry
+
+OUTBOX_SENT = registry.counter(
+    "etf_outbox_sent_total",
+    "Iš outbox išsiųsti laiškai",
+)
+OUTBOX_GIVEN_UP = registry.counter(
+    "etf_outbox_given_up_total",
+    "Laiškai, kuriems išnaudoti visi bandymai",
+)
+OUTBOX_PENDING = registry.gauge(
+    "etf_outbox_pending",
+    "Neišsiųsti laiškai eilėje (po paskutinio iškrovimo)",
+)
+
+# =========================================================
+# Įrašymas (ciklo transakcijoje)
+# =========================================================
+def enqueue_email(db, subject: str, body: str, recipients: list[str] | None = None) -> EmailOutbox:
+    """
+    Prideda laišką į eilę. Commit – kviečiančiojo (kartu su kitais pakeitimais).
+    """
+    row = EmailOutbox(
+        subject=subject,
+        body=body,
+        recipients=",".join(recipients or [ALERT_EMAIL]),
+    )
+    db.add(row)
+    return row
+
+
+def enqueue_daily_summary(db, triggered_etfs) -> EmailOutbox | None:
+    summary = daily_summary(triggered_etfs)
+    if summary is None:
+        print("📭 Nėra ETF kritusių žemiau ribos – email nesiunčiamas")
+        return None
+
+    return enqueue_email(db, *summary)
+
+
+# =========================================================
+# SMTP prisijungimas
+# =========================================================
+class _SmtpSession:
+    """
+    Vienas smtplib prisijungimas, pernaudojamas tarp iškrovimų.
+    Serveriai nutraukia neaktyvius prisijungimus – tai pagaunama NOOP.
+    """
+
+    def __init__(self):
+        self._smtp: smtplib.SMTP | None = None
+
+    def get(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+
+        smtp = smtplib.SMTP(conf.MAIL_SERVER, conf.MAIL_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            if conf.MAIL_STARTTLS:
+                smtp.starttls()
+            smtp.ehlo_or_helo_if_needed()
+            if smtp.has_extn("auth"):
+                smtp.login(conf.MAIL_USERNAME, conf.MAIL_PASSWORD.get_secret_value())
+        except Exception:
+            smtp.close()
+            raise
+
+        self._smtp = smtp
+        return smtp
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+
+_session = _SmtpSession()
+# Iškrovimas vienu metu tik vienas (scheduleris + rankinis paleidimas)
+_drain_lock = threading.Lock()
+
+
+def close_smtp():
+    with _drain_lock:
+        _session.close()
+
+
+# =========================================================
+# Iškrovimas
+# =========================================================
+def _message(row: EmailOutbox) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = row.subject
+    message["From"] = conf.MAIL_FROM
+    message["To"] = ", ".join(row.recipients.split(","))
+    message.set_content(row.body)
+    return message
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+
+
+def _is_permanent(error: Exception) -> bool:
+    # 5xx siunčiant laišką – nuolatinė klaida (blogas gavėjas ir pan.)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return False
+
+
+def _defer(row: EmailOutbox, error: Exception, now: datetime, permanent: bool = False):
+    EMAIL_FAILURES.inc()
+    row.attempts += 1
+    if permanent:
+        row.attempts = max(row.attempts, OUTBOX_MAX_ATTEMPTS)
+    row.last_error = f"{type(error).__name__}: {error}"[:500]
+    row.next_attempt_at = now + timedelta(seconds=backoff_seconds(row.attempts))
+
+    if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+        OUTBOX_GIVEN_UP.inc()
+        print(f"❌ Laiškas #{row.id} neišsiųstas po {row.attempts} bandymų: {row.last_error}")
+    else:
+        print(f"⚠️ Laiškas #{row.id} atidėtas (bandymas {row.attempts}): {row.last_error}")
+
+
+def _pending_filter():
+    return (
+        EmailOutbox.sent_at.is_(None),
+        EmailOutbox.attempts < OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def _send_batch(rows: list[EmailOutbox], now: datetime) -> tuple[int, int]:
+    try:
+        smtp = _session.get()
+    except (smtplib.SMTPException, OSError) as e:
+        # Prisijungimo / STARTTLS / login klaida (ir 5xx, pvz. 535) – ne
+        # laiško kaltė: visą batch'ą atidedam įprastai, su backoff
+        for row in rows:
+            _defer(row, e, now)
+        return 0, len(rows)
+
+    sent = deferred = 0
+    for row in rows:
+        try:
+            with EMAIL_SEND_SECONDS.time():
+                smtp.send_message(_message(row))
+        except smtplib.SMTPServerDisconnected as e:
+            _defer(row, e, now)
+            _session.close()
+            return sent, deferred + 1
+        except smtplib.SMTPException as e:
+            # Laiško lygio atsakymas – prisijungimas tinkamas, tęsiam
+            _defer(row, e, now, permanent=_is_permanent(e))
+            deferred += 1
+        except OSError as e:
+            # Tinklo klaida (SMTPException irgi OSError – todėl po jo)
+            _defer(row, e, now)
+            _session.close()
+            return sent, deferred + 1
+        else:
+            row.sent_at = datetime.utcnow()
+            sent += 1
+
+    return sent, deferred
+
+
+def drain_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> dict:
+    """
+    Išsiunčia iki batch_size laiškų, kurių laikas atėjo, vienu SMTP
+    prisijungimu ir vienu commit. Grąžina {"sent", "deferred"}.
+    """
+    if not _drain_lock.acquire(blocking=False):
+        return {"sent": 0, "deferred": 0}
+
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        rows = db.execute(
+            select(EmailOutbox)
+            .where(*_pending_filter(), EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id)
+            .limit(batch_size)
+        ).scalars().all()
+
+        sent = deferred = 0
+        if rows:
+            sent, deferred = _send_batch(rows, now)
+            db.commit()
+            OUTBOX_SENT.inc(sent)
+            if sent:
+                print(f"📧 Išsiųsta laiškų: {sent}")
+
+        OUTBOX_PENDING.set(
+            db.scalar(select(func.count()).select_from(EmailOutbox).where(*_pending_filter()))
+        )
+        return {"sent": sent, "deferred": deferred}
+    finally:
+        db.close()
+        _drain_lock.release()
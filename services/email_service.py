@@ -2,6 +2,17 @@ from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 import os
 import asyncio
 
+from services.metrics import registry
+
+EMAIL_SEND_SECONDS = registry.histogram(
+    "etf_email_send_seconds",
+    "Laiško siuntimo trukmė",
+)
+EMAIL_FAILURES = registry.counter(
+    "etf_email_failures_total",
+    "Nepavykę laiškų siuntimai",
+)
+
 
 # --- ENV ---
 # Render nenaudoja .env failo, jis perduoda ENV tiesiogiai
@@ -20,11 +31,20 @@ conf = ConnectionConfig(
     MAIL_FROM=SMTP_USER,
     MAIL_PORT=int(os.getenv("MAIL_PORT", "587")),
     MAIL_SERVER=os.getenv("MAIL_SERVER", "smtp.gmail.com"),
-    MAIL_STARTTLS=True,
+    MAIL_STARTTLS=os.getenv("MAIL_STARTTLS", "1") == "1",
     MAIL_SSL_TLS=False,
 )
 
 
+def _send_sync(fm: FastMail, message: MessageSchema):
+    with EMAIL_SEND_SECONDS.time():
+        try:
+            asyncio.run(fm.send_message(message))
+        except Exception:
+            EMAIL_FAILURES.inc()
+            raise
+
+
 # --- ASYNC ---
 async def send_alert_email(ticker: str, ath: float, current: float, drop_percent: float):
     fm = FastMail(conf)
@@ -50,7 +70,12 @@ Automatinis pranešimas
         subtype="plain",
     )
 
-    await fm.send_message(message)
+    with EMAIL_SEND_SECONDS.time():
+        try:
+            await fm.send_message(message)
+        except Exception:
+            EMAIL_FAILURES.inc()
+            raise
 
 
 # --- SYNC WRAPPER (kad išvengti asyncio scheduler konfliktų) ---
@@ -76,13 +101,16 @@ def send_alert_email_sync(triggered_etfs):
         subtype="plain",
     )
 
-    asyncio.run(fm.send_message(message))
+    _send_sync(fm, message)
 
 
-def send_daily_summary_if_needed(triggered_etfs):
+def daily_summary(triggered_etfs) -> tuple[str, str] | None:
+    """
+    Dienos kritimo ataskaitos (subject, body); None – nėra ką siųsti.
+    Siunčia ne ciklas, o outbox (services.email_outbox).
+    """
     if not triggered_etfs:
-        print("📭 Nėra ETF kritusių žemiau ribos – email nesiunčiamas")
-        return
+        return None
 
     subject = "📉 Dienos ETF kritimo ataskaita"
     body = "Šie ETF nukrito nuo ATH daugiau nei nustatyta riba:\n\n"
@@ -96,12 +124,4 @@ def send_daily_summary_if_needed(triggered_etfs):
             f"{'-'*30}\n"
         )
 
-    fm = FastMail(conf)
-    message = MessageSchema(
-        subject=subject,
-        recipients=[ALERT_EMAIL],
-        body=body,
-        subtype="plain",
-    )
-
-    asyncio.run(fm.send_message(message))
+    return subject, body
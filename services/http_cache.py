@@ -0,0 +1,102 @@
+"""
+Sąlyginiai GET (ETag / Last-Modified → 304) ir atsakymų cache'as
+admin JSON API sąrašams.
+
+Versijas laiko data_versions lentelė (ją didina SQLite trigeriai, tad
+pakeitimai matomi ir iš scheduler proceso). Pasikartojanti užklausa
+kainuoja vieną PK užklausą: 304 arba jau užkoduotas JSON iš cache'o.
+"""
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from models import DataVersion
+
+CACHE_MAX_SIZE = 128
+
+_cache: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_versions(db: Session, tables: tuple[str, ...]) -> tuple[str, datetime | None]:
+    """
+    Grąžina (versijų žymė, vėliausias pakeitimo laikas UTC).
+    """
+    rows = {
+        r.name: r
+        for r in db.query(DataVersion).filter(DataVersion.name.in_(tables)).all()
+    }
+
+    tag = ".".join(str(rows[t].version) if t in rows else "0" for t in tables)
+    updated = max((r.updated_at for r in rows.values()), default=None)
+    if updated is not None:
+        updated = updated.replace(tzinfo=timezone.utc)
+
+    return tag, updated
+
+
+def _not_modified(request: Request, etag: str, updated: datetime | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Jei ETag atsiųstas – Last-Modified ignoruojam (RFC 9110)
+        return etag in (t.strip() for t in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and updated is not None:
+        try:
+            return updated.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+def cached_json(
+    request: Request,
+    db: Session,
+    tables: tuple[str, ...],
+    build: Callable[[], Any],
+) -> Response:
+    """
+    JSON atsakymas su ETag / Last-Modified pagal `tables` versijas.
+    Raktas – kelias + query string, tad skirtingi filtrai cache'uojami atskirai.
+    """
+    key = str(request.url.path) + ("?" + request.url.query if request.url.query else "")
+    tag, updated = get_versions(db, tables)
+    etag = f'"{tag}"'
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if updated is not None:
+        headers["Last-Modified"] = format_datetime(updated, usegmt=True)
+
+    if _not_modified(request, etag, updated):
+        return Response(status_code=304, headers=headers)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == etag:
+            _cache.move_to_end(key)
+            body = cached[1]
+        else:
+            body = None
+
+    if body is None:
+        body = json.dumps(
+            jsonable_encoder(build()),
+            separators=(",", ":"),
+        ).encode()
+        with _cache_lock:
+            _cache[key] = (etag, body)
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_MAX_SIZE:
+                _cache.popitem(last=False)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,140 @@
+"""
+Gyvi kainų atnaujinimai dashboardams (Server-Sent Events).
+
+Scheduleris po kiekvieno ciklo publikuoja VIENĄ įvykį: tik pasikeitusias
+kainas, tų ETF eilutes ir perskaičiuotas sumas. Įvykis į JSON
+serializuojamas vieną kartą ir išdalinamas visiems prenumeratoriams –
+kiek dashboardų beatidaryta, Yahoo užklausų skaičius nesikeičia.
+
+Scheduleris veikia atskirame thread'e, SSE jungtys – asyncio cikle,
+todėl pristatymas eina per loop.call_soon_threadsafe().
+"""
+import asyncio
+import json
+import threading
+from datetime import datetime
+
+from database import SessionLocal
+from services.portfolio_calc import calculate_portfolio
+
+# Kiek neišsiųstų įvykių laikom vienam lėtam klientui (seniausi metami)
+SUBSCRIBER_QUEUE_SIZE = 8
+
+
+class LiveBroker:
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._last_prices: dict[str, float] = {}
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Kviečiama iš asyncio konteksto (SSE handlerio).
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def changed_prices(self, prices: dict[str, float]) -> dict[str, float]:
+        """
+        Grąžina tik pasikeitusias kainas ir įsimena naujas.
+        """
+        with self._lock:
+            changed = {
+                t: p for t, p in prices.items()
+                if self._last_prices.get(t) != p
+            }
+            self._last_prices.update(changed)
+        return changed
+
+    def publish(self, event: str, data: dict) -> int:
+        """
+        Išsiunčia įvykį visiems prenumeratoriams (galima kviesti iš bet
+        kurio thread'o). Grąžina prenumeratorių skaičių.
+        """
+        message = (
+            f"event: {event}\n"
+            f"data: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+        ).encode()
+
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # Uždarytas event loop'as – jungtis jau mirusi
+                self.unsubscribe(queue)
+
+        return len(subscribers)
+
+
+def _offer(queue: asyncio.Queue, message: bytes):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+broker = LiveBroker()
+
+
+def publish_cycle(
+    prices: dict[str, float],
+    etfs: list,
+    etf_updates: list[dict],
+    alert_rows: list[dict],
+) -> int:
+    """
+    Po scheduler ciklo: pasikeitusios kainos + jų portfelio eilutės,
+    sumos, pasikeitę ETF (ATH / alert būsena) ir nauji alertai.
+    Jei niekas nepasikeitė arba niekas neklauso – nieko nesiunčiam.
+    """
+    changed = broker.changed_prices(prices)
+    if not (changed or etf_updates or alert_rows):
+        return 0
+    if broker.subscriber_count() == 0:
+        return 0
+
+    by_id = {etf.id: etf for etf in etfs}
+
+    db = SessionLocal()
+    try:
+        portfolio = calculate_portfolio(db)
+    finally:
+        db.close()
+
+    return broker.publish("prices", {
+        "at": datetime.utcnow().isoformat(),
+        "prices": changed,
+        "rows": [r for r in portfolio["rows"] if r["ticker"] in changed],
+        "totals": portfolio["totals"],
+        "etfs": [
+            {
+                "ticker": by_id[u["id"]].ticker,
+                "ath_price": u["ath_price"],
+                "ath_alert_sent": bool(u["ath_alert_sent"]),
+            }
+            for u in etf_updates
+        ],
+        "alerts": [
+            {
+                "ticker": by_id[a["etf_id"]].ticker,
+                "price": a["price"],
+                "ath_price": by_id[a["etf_id"]].ath_price,
+                # Tas pats formatas kaip admin/alerts.html
+                "created_at": a["created_at"].strftime("%Y.%m.%d %H:%M:%S"),
+            }
+            for a in alert_rows
+        ],
+    })
@@ -0,0 +1,163 @@
+"""
+Portfelio vertės laiko eilutė (NAV) – vektorizuotai per NumPy / pandas.
+
+Vietoje calculate_portfolio() kiekvienai dienai: pirkimų žurnalas
+paverčiamas (dienos × tickeriai) vienetų pokyčių matrica, cumsum per
+dienas duoda turimus vienetus, o padauginus iš kainų matricos –
+vertę. Viskas vienu perėjimu.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from models import ETF, PriceHistory, Purchase
+from services.price_history import schedule_sync
+
+
+def load_purchase_log(db: Session) -> pd.DataFrame:
+    """
+    Pirkimų žurnalas: ticker, date, units, cash (units × price).
+    """
+    rows = (
+        db.query(
+            ETF.ticker,
+            Purchase.purchased_at,
+            Purchase.units,
+            Purchase.price,
+        )
+        .join(ETF, ETF.id == Purchase.etf_id)
+        .filter(Purchase.purchased_at.isnot(None))
+        .all()
+    )
+
+    trades = pd.DataFrame(rows, columns=["ticker", "date", "units", "price"])
+    trades["date"] = pd.to_datetime(trades["date"]).dt.normalize()
+    trades["cash"] = trades["units"] * trades["price"]
+
+    return trades.drop(columns="price")
+
+
+def load_price_matrix(
+    db: Session,
+    tickers: list[str],
+    start: date | None = None,
+    end: date | None = None,
+) -> pd.DataFrame:
+    """
+    Close kainos (dienos × tickeriai) iš vietinės istorijos.
+    Tarpai (šventės, skirtingos biržos) užpildomi paskutine žinoma kaina.
+    """
+    query = db.query(
+        PriceHistory.date,
+        PriceHistory.ticker,
+        PriceHistory.close,
+    ).filter(PriceHistory.ticker.in_(tickers))
+    if start is not None:
+        query = query.filter(PriceHistory.date >= start)
+    if end is not None:
+        query = query.filter(PriceHistory.date <= end)
+
+    bars = pd.DataFrame(query.all(), columns=["date", "ticker", "close"])
+    if bars.empty:
+        return pd.DataFrame(columns=tickers, dtype=float)
+
+    bars["date"] = pd.to_datetime(bars["date"])
+
+    return (
+        bars.pivot(index="date", columns="ticker", values="close")
+        .reindex(columns=tickers)
+        .sort_index()
+        .ffill()
+    )
+
+
+def compute_nav_series(trades: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    trades – ticker, date, units, cash; prices – (dienos × tickeriai).
+    Grąžina DataFrame (indeksas – prices dienos) su stulpeliais:
+    nav, invested, daily_pnl.
+
+    Sandoris ne prekybos dieną įskaitomas artimiausią kitą prekybos
+    dieną; sandoriai prieš pirmą kainą – pirmą dieną, o po paskutinės
+    kainos – neįskaitomi (jų dienos eilutėje dar nėra).
+    """
+    dates = prices.index
+    columns = pd.Index(prices.columns)
+
+    trades = trades[trades["ticker"].isin(columns)]
+
+    day_idx = dates.searchsorted(trades["date"].to_numpy(), side="left")
+    inside = day_idx < len(dates)
+    trades = trades[inside]
+    day_idx = day_idx[inside]
+    ticker_idx = columns.get_indexer(trades["ticker"])
+
+    # Vienetų pokyčiai (dienos × tickeriai) → turimi vienetai
+    units_delta = np.zeros((len(dates), len(columns)))
+    np.add.at(units_delta, (day_idx, ticker_idx), trades["units"].to_numpy())
+    holdings = units_delta.cumsum(axis=0)
+
+    nav = (holdings * np.nan_to_num(prices.to_numpy(dtype=float))).sum(axis=1)
+
+    invested = np.bincount(
+        day_idx,
+        weights=trades["cash"].to_numpy(),
+        minlength=len(dates),
+    ).cumsum()
+
+    # Dienos P/L – vertės pokytis be tos dienos pinigų srautų
+    pnl = np.diff(nav - invested, prepend=0.0)
+
+    return pd.DataFrame(
+        {"nav": nav, "invested": invested, "daily_pnl": pnl},
+        index=dates,
+    )
+
+
+def portfolio_nav_series(
+    db: Session,
+    start: date | None = None,
+    end: date | None = None,
+) -> pd.DataFrame:
+    """
+    NAV / investuoto kapitalo / dienos P/L eilutės nuo pirmo pirkimo.
+    Vienetai skaičiuojami nuo pirmo pirkimo, o rezultatas apkerpiamas
+    iki [start, end].
+    """
+    trades = load_purchase_log(db)
+    if end is not None:
+        # Sandoriai po `end` į eilutę iki `end` nepatenka
+        trades = trades[trades["date"] <= pd.Timestamp(end)]
+    if trades.empty:
+        return pd.DataFrame(columns=["nav", "invested", "daily_pnl"], dtype=float)
+
+    tickers = sorted(trades["ticker"].unique())
+
+    # Istorija papildoma fone – eilutė skaičiuojama iš to, kas jau saugoma
+    schedule_sync(tickers)
+
+    first_trade = trades["date"].min().date()
+    prices = load_price_matrix(db, tickers, first_trade, end)
+    if prices.empty:
+        return pd.DataFrame(columns=["nav", "invested", "daily_pnl"], dtype=float)
+
+    series = compute_nav_series(trades, prices)
+    if start is not None:
+        series = series[series.index >= pd.Timestamp(start)]
+
+    return series
+
+
+def series_to_dict(series: pd.DataFrame) -> dict:
+    """
+    Stulpelinis JSON: {"dates": [...], "nav": [...], ...}.
+    """
+    return {
+        "dates": [d.date().isoformat() for d in series.index],
+        **{
+            column: [round(float(v), 2) for v in series[column]]
+            for column in series.columns
+        },
+    }
@@ -1,51 +1,82 @@
-from sqlalchemy.orm import Session, joinedload
-from datetime import datetime, date
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime
+from types import SimpleNamespace
 
-from models import ETF, PortfolioYTD
+from models import ETF, Position, Purchase
+from services.positions import is_held
 from services.ytd_service import ensure_portfolio_ytd
-from services.price_checker import fetch_current_price
+from services.price_checker import get_current_prices_cached
+
+
+def load_etf_aggregates(db: Session, year_start: datetime):
+    """
+    Pozicijos iš materializuotos positions lentelės (O(#ETF)) +
+    einamųjų metų pinigų srautai (tik šių metų pirkimai, per indeksą).
+    """
+    cash_flows = dict(
+        db.query(
+            Purchase.etf_id,
+            func.sum(Purchase.units * Purchase.price),
+        )
+        .filter(Purchase.purchased_at >= year_start)
+        .group_by(Purchase.etf_id)
+        .all()
+    )
+
+    positions = (
+        db.query(ETF.ticker, Position.etf_id, Position.units, Position.invested)
+        .join(Position, Position.etf_id == ETF.id)
+        .order_by(ETF.id)
+        .all()
+    )
+
+    return [
+        SimpleNamespace(
+            ticker=p.ticker,
+            units=p.units,
+            invested=p.invested,
+            cash_flow_ytd=cash_flows.get(p.etf_id, 0.0),
+        )
+        for p in positions
+    ]
 
 
 def calculate_portfolio(db: Session):
-    ensure_portfolio_ytd(db)
+    # Negrąžina laukimo: bazė perskaičiuojama fone
+    ytd_row = ensure_portfolio_ytd(db)
 
     current_year = datetime.utcnow().year
-    year_start = date(current_year, 1, 1)
+    year_start = datetime(current_year, 1, 1)
 
-    etfs = (
-        db.query(ETF)
-        .options(joinedload(ETF.purchases))
-        .all()
-    )
+    aggregates = [
+        a for a in load_etf_aggregates(db, year_start)
+        if is_held(a.units)
+    ]
+
+    # Kainos iš quote cache – vienu kartu visiems turimiems ETF
+    prices = get_current_prices_cached([a.ticker for a in aggregates])
 
     rows = []
     total_current_value = 0.0
     total_invested = 0.0
     cash_flows_ytd = 0.0  # 👈 SVARBIAUSIA DALIS
 
-    for etf in etfs:
-        units = sum(p.units for p in etf.purchases)
-        invested = sum(p.units * p.price for p in etf.purchases)
-
-        if units == 0:
-            continue
+    for a in aggregates:
+        units = a.units
+        invested = a.invested
 
-        current_price = fetch_current_price(etf.ticker) or 0.0
+        current_price = prices.get(a.ticker) or 0.0
         current_value = units * current_price
 
         total_current_value += current_value
         total_invested += invested
 
         # 👇 PINIGŲ SRAUTAI EINAMAIS METAIS
-        cash_flows_ytd += sum(
-            p.units * p.price
-            for p in etf.purchases
-            if p.purchased_at
-            and p.purchased_at.date() >= year_start
-        )
+        cash_flows_ytd += a.cash_flow_ytd
 
         rows.append({
-            "ticker": etf.ticker,
+            "ticker": a.ticker,
             "units": round(units, 4),
             "avg_buy": round(invested / units, 2),
             "invested": round(invested, 2),
@@ -71,12 +102,6 @@ def calculate_portfolio(db: Session):
             "allocation": round(allocation, 2),
         })
 
-    ytd_row = (
-        db.query(PortfolioYTD)
-        .filter(PortfolioYTD.year == current_year)
-        .first()
-    )
-
     start_value = ytd_row.start_value if ytd_row else 0.0
 
     ytd_eur = total_current_value - start_value - cash_flows_ytd
@@ -98,5 +123,6 @@ def calculate_portfolio(db: Session):
             ),
             "ytd_eur": round(ytd_eur, 2),
             "ytd_percent": round(ytd_percent, 2),
+            "ytd_stale": ytd_row is None or ytd_row.is_stale,
         }
     }
@@ -0,0 +1,141 @@
+"""
+Materializuotos pozicijos (positions lentelė).
+
+Kiekvienas pirkimo įrašymas / keitimas / trynimas perskaičiuoja to ETF
+eilutę toje pačioje transakcijoje – dashboardams nereikia skaityti viso
+pirkimų žurnalo. check / rebuild – konsistencijos patikra ir pilnas perskaičiavimas.
+
+CLI:
+    python -m services.positions check
+    python -m services.positions rebuild
+"""
+import sys
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Position, Purchase
+
+
+# Slankiojo kablelio likutis: |units| mažiau už tai – pozicija uždaryta
+UNITS_EPSILON = 1e-9
+
+
+def refresh_position(db: Session, etf_id: int):
+    """
+    Perskaičiuoja ETF poziciją po pirkimo įrašymo / keitimo / trynimo
+    (be commit'o). Viskas vienu UPDATE su subužklausomis per
+    (etf_id, purchased_at) indeksą: SUM – ne `units + :delta`, kad
+    slankiojo kablelio likučiai nesikauptų (uždaryta pozicija = 0).
+    """
+    # Pirkimų pakeitimai turi būti DB, kad subužklausos juos matytų
+    db.flush()
+
+    db.execute(
+        sqlite_insert(Position)
+        .values(etf_id=etf_id, units=0.0, invested=0.0)
+        .on_conflict_do_nothing(index_elements=["etf_id"])
+    )
+
+    trades = select(Purchase.purchased_at).where(Purchase.etf_id == etf_id)
+
+    def aggregate(expr):
+        return trades.with_only_columns(expr).scalar_subquery()
+
+    db.execute(
+        update(Position)
+        .where(Position.etf_id == etf_id)
+        .values(
+            units=aggregate(func.total(Purchase.units)),
+            invested=aggregate(func.total(Purchase.units * Purchase.price)),
+            first_trade_at=aggregate(func.min(Purchase.purchased_at)),
+            last_trade_at=aggregate(func.max(Purchase.purchased_at)),
+        )
+    )
+
+
+def is_held(units: float) -> bool:
+    return abs(units) > UNITS_EPSILON
+
+
+def _aggregate_from_log():
+    return (
+        select(
+            Purchase.etf_id,
+            func.sum(Purchase.units).label("units"),
+            func.sum(Purchase.units * Purchase.price).label("invested"),
+            func.min(Purchase.purchased_at).label("first_trade_at"),
+            func.max(Purchase.purchased_at).label("last_trade_at"),
+        )
+        .group_by(Purchase.etf_id)
+    )
+
+
+def rebuild_positions(conn):
+    """
+    Pilnas perskaičiavimas iš pirkimų žurnalo (be commit'o).
+    conn – Session arba Connection (naudojama ir migracijoje).
+    """
+    conn.execute(delete(Position))
+    conn.execute(
+        insert(Position).from_select(
+            ["etf_id", "units", "invested", "first_trade_at", "last_trade_at"],
+            _aggregate_from_log(),
+        )
+    )
+
+
+def check_positions(db: Session, tolerance: float = 1e-6) -> list[dict]:
+    """
+    Palygina positions su pirkimų žurnalu. Grąžina neatitikimus.
+    """
+    expected = {r.etf_id: r for r in db.execute(_aggregate_from_log())}
+    actual = {p.etf_id: p for p in db.query(Position).all()}
+
+    problems = []
+    for etf_id in sorted(set(expected) | set(actual)):
+        e = expected.get(etf_id)
+        a = actual.get(etf_id)
+
+        e_units = e.units if e else 0.0
+        e_invested = e.invested if e else 0.0
+        a_units = a.units if a else 0.0
+        a_invested = a.invested if a else 0.0
+
+        if (
+            abs(e_units - a_units) > tolerance
+            or abs(e_invested - a_invested) > tolerance
+            or (e and a and (
+                e.first_trade_at != a.first_trade_at
+                or e.last_trade_at != a.last_trade_at
+            ))
+        ):
+            problems.append({
+                "etf_id": etf_id,
+                "expected_units": e_units,
+                "actual_units": a_units,
+                "expected_invested": e_invested,
+                "actual_invested": a_invested,
+            })
+
+    return problems
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            rebuild_positions(db)
+            db.commit()
+            print("✅ Pozicijos perskaičiuotos iš pirkimų žurnalo")
+        else:
+            problems = check_positions(db)
+            for p in problems:
+                print(f"❌ {p}")
+            print("✅ Pozicijos sutampa" if not problems else f"❌ Neatitikimų: {len(problems)}")
+            sys.exit(1 if problems else 0)
+    finally:
+        db.close()
@@ -1,13 +1,179 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import date
-from services.yf_service import (
-    fetch_current_price_yf,
-    fetch_historical_price_yf
+
+from config import (
+    PRICE_BATCH_SIZE,
+    PRICE_FETCH_WORKERS,
+    PRICE_FETCH_TIMEOUT_SECONDS,
+)
+from services.price_provider import get_price_provider
+from services.price_history import get_close_on_or_before, get_closes_on_or_before
+from services.metrics import registry
+from services.profiling import price_call
+from services.quote_cache import quote_cache
+
+# Kaip dažnai tikrinama, ar eilėje laukęs batch'as jau pradėtas
+PRICE_QUEUE_POLL_SECONDS = 0.05
+
+FETCH_BATCH_SECONDS = registry.histogram(
+    "etf_price_fetch_batch_seconds",
+    "Vieno grupuoto kainų užklausimo trukmė",
+)
+FETCH_TICKERS = registry.counter(
+    "etf_price_fetch_tickers_total",
+    "Kiek tickerių kainų prašyta",
+)
+FETCH_FAILURES = registry.counter(
+    "etf_price_fetch_failures_total",
+    "Tickeriai be kainos (error / timeout / no_data)",
+    ("reason",),
 )
 
 
 def fetch_current_price(ticker: str) -> float | None:
-    return fetch_current_price_yf(ticker)
+    return get_price_provider().current_price(ticker)
+
+
+def _fetch_batch(chunk: list[str]) -> dict[str, float]:
+    with FETCH_BATCH_SECONDS.time():
+        return get_price_provider().current_prices(chunk)
+
+
+def _wait_with_deadlines(futures: dict, started: dict[int, float]):
+    """
+    Laukia, kol kiekvienas batch'as baigsis arba praeis
+    PRICE_FETCH_TIMEOUT_SECONDS nuo jo pradžios. Eilėje likę batch'ai
+    nelaukiami, kai visi workeriai užimti pakibusių batch'ų.
+    """
+    pending = set(futures)
+    hung = set()
+
+    while pending:
+        now = time.monotonic()
+        deadlines = {
+            f: started[futures[f]] + PRICE_FETCH_TIMEOUT_SECONDS
+            for f in pending
+            if futures[f] in started
+        }
+
+        expired = {f for f, deadline in deadlines.items() if deadline <= now}
+        pending -= expired
+        hung = {f for f in hung | expired if not f.done()}
+
+        queued = pending - deadlines.keys()
+        if not pending or (len(hung) >= PRICE_FETCH_WORKERS and pending == queued):
+            return
+
+        running = [d for f, d in deadlines.items() if f in pending]
+        # Ką tik pradėtas batch'as būsenos nepraneša – eilei trumpas poll'as
+        timeout = min(running) - now if running else PRICE_QUEUE_POLL_SECONDS
+        if queued:
+            timeout = min(timeout, PRICE_QUEUE_POLL_SECONDS)
+
+        done, _ = wait(pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+        pending -= done
+
+
+def collect_current_prices(
+    tickers: list[str],
+) -> tuple[dict[str, float], list[str]]:
+    """
+    Kainos grupuotais užklausimais (po PRICE_BATCH_SIZE), kurie vykdomi
+    lygiagrečiai ribotame thread pool'e (PRICE_FETCH_WORKERS).
+    Batch'as, neatsakęs per PRICE_FETCH_TIMEOUT_SECONDS nuo savo
+    pradžios, nelaukiamas.
+
+    Grąžina (ticker → kaina, tickeriai, kurių batch'ai nespėjo).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}, []
+
+    chunks = [
+        tickers[i:i + PRICE_BATCH_SIZE]
+        for i in range(0, len(tickers), PRICE_BATCH_SIZE)
+    ]
+
+    # Batch'o deadline'as skaičiuojamas nuo jo pradžios (ne nuo pateikimo):
+    # eilėje laukiantis batch'as savo PRICE_FETCH_TIMEOUT_SECONDS dar turi
+    started: dict[int, float] = {}
+
+    def run(index: int, chunk: list[str]) -> dict[str, float]:
+        started[index] = time.monotonic()
+        return _fetch_batch(chunk)
+
+    # Pool'as ciklui: pakibęs Yahoo thread'as neužkemša kitų ciklų
+    executor = ThreadPoolExecutor(
+        max_workers=PRICE_FETCH_WORKERS,
+        thread_name_prefix="price-fetch",
+    )
+    futures = {
+        executor.submit(run, i, chunk): i
+        for i, chunk in enumerate(chunks)
+    }
+
+    try:
+        # Batch'ai lygiagretūs – HTTP užklausai skaičiuojam bendrą laukimą
+        with price_call():
+            _wait_with_deadlines(futures, started)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Atšaukti (taip ir nepradėti) batch'ai – kaip nespėję
+    done = [f for f in futures if f.done() and not f.cancelled()]
+    not_done = [f for f in futures if f not in done]
+
+    prices = {}
+    failed = 0
+    for future in done:
+        try:
+            prices.update(future.result())
+        except Exception as e:
+            failed += len(chunks[futures[future]])
+            print(f"Klaida gaunant kainas ({len(chunks[futures[future]])} tickeriai): {e}")
+
+    timed_out = [t for future in not_done for t in chunks[futures[future]]]
+
+    FETCH_TICKERS.inc(len(tickers))
+    FETCH_FAILURES.inc(failed, reason="error")
+    FETCH_FAILURES.inc(len(timed_out), reason="timeout")
+    FETCH_FAILURES.inc(
+        len(tickers) - len(prices) - failed - len(timed_out), reason="no_data"
+    )
+
+    return prices, timed_out
+
+
+def fetch_current_prices(tickers: list[str]) -> dict[str, float]:
+    """
+    Kaip collect_current_prices, bet grąžina tik ticker → kaina.
+    """
+    prices, _ = collect_current_prices(tickers)
+    return prices
+
+
+def get_current_prices_cached(tickers: list[str]) -> dict[str, float]:
+    """
+    Kainos dashboardams: pirmiausia iš quote cache (pildo scheduleris),
+    į Yahoo einama tik dėl trūkstamų tickerių.
+    """
+    prices = quote_cache.get_many(tickers)
+
+    missing = [t for t in tickers if t not in prices]
+    if missing:
+        fetched = fetch_current_prices(missing)
+        quote_cache.put_many(fetched)
+        prices.update(fetched)
+
+    return prices
 
 
 def fetch_historical_price(ticker: str, on_date: date) -> float | None:
-    return fetch_historical_price_yf(ticker, on_date)
+    # Vietinė istorija – tinklas tik jei trūksta naujesnių barų
+    return get_close_on_or_before(ticker, on_date)
+
+
+def fetch_historical_prices(tickers: list[str], on_date: date) -> dict[str, float]:
+    # Visiems tickeriams – vienas grupuotas istorijos užklausimas
+    return get_closes_on_or_before(tickers, on_date)
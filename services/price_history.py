@@ -0,0 +1,370 @@
+"""
+Vietinė dienos barų istorija (price_history) – patvarus
+(ticker, data) → close cache'as.
+
+Praėjusių dienų barai nesikeičia, todėl saugomi visam laikui ir į
+Yahoo einama tik dėl naujesnių barų. Išimtis – split'ai: auto_adjust
+perskaičiuoja visą istoriją, todėl tokiam tickeriui visi barai ir ATH
+ištrinami (invalidate_history) ir parsiunčiami / apskaičiuojami iš naujo.
+
+CLI:
+    python -m services.price_history prewarm [METAI ...]
+    python -m services.price_history invalidate TICKER
+"""
+import sys
+import threading
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from config import HISTORY_RETRY_MAX_SECONDS, HISTORY_RETRY_SECONDS
+from database import SessionLocal
+from models import ETF, PriceHistory
+from services.price_provider import get_price_provider
+
+# ticker -> diena, kurią jau bandėm sinchronizuoti
+# (savaitgaliais / šventėmis naujų barų nėra – nekartojam užklausų)
+_synced_on: dict[str, date] = {}
+
+# ticker -> (nesėkmių iš eilės, kada vėl galima bandyti): šaltinis barų
+# negrąžino – kartojam su backoff, ne kiekvieno kreipinio metu
+_failed: dict[str, tuple[int, datetime]] = {}
+
+# Fono sinchronizacija (grafikams / NAV – užklausa Yahoo nelaukia)
+_background_lock = threading.Lock()
+_background_pending: set[str] = set()
+_background_running = False
+
+# Didinama, kai istorija pasikeičia (nauji barai / invalidacija) –
+# pagal ją išvestiniai cache'ai (grafikai) žino, kad pasenę
+_bars_version = 0
+
+
+def bars_version() -> int:
+    return _bars_version
+
+
+def _bump_bars_version():
+    global _bars_version
+    _bars_version += 1
+
+
+def get_last_date(db, ticker: str) -> date | None:
+    return (
+        db.query(func.max(PriceHistory.date))
+        .filter(PriceHistory.ticker == ticker)
+        .scalar()
+    )
+
+
+def get_last_dates(db, tickers: list[str]) -> dict[str, date]:
+    """
+    Paskutinė saugoma data kiekvienam tickeriui (vienu GROUP BY).
+    Tickeriai be istorijos į rezultatą nepatenka.
+    """
+    if not tickers:
+        return {}
+
+    return dict(
+        db.query(PriceHistory.ticker, func.max(PriceHistory.date))
+        .filter(PriceHistory.ticker.in_(tickers))
+        .group_by(PriceHistory.ticker)
+        .all()
+    )
+
+
+def _store_bars(db, histories: dict[str, list[dict]], lasts: dict[str, date]) -> int:
+    today = date.today()
+    rows = [
+        {"ticker": ticker, **b}
+        for ticker, bars in histories.items()
+        for b in bars
+        if b["date"] < today
+        and (lasts.get(ticker) is None or b["date"] > lasts[ticker])
+    ]
+
+    if rows:
+        db.execute(
+            insert(PriceHistory).on_conflict_do_nothing(
+                index_elements=["ticker", "date"]
+            ),
+            rows,
+        )
+        db.commit()
+        _bump_bars_version()
+
+    return len(rows)
+
+
+def _expects_bars(last: date, today: date) -> bool:
+    """
+    Ar po `last` iki vakar buvo darbo diena (turėjo atsirasti naujas baras).
+    """
+    day = last + timedelta(days=1)
+    while day < today:
+        if day.weekday() < 5:
+            return True
+        day += timedelta(days=1)
+    return False
+
+
+def _needs_sync(ticker: str, today: date, now: datetime) -> bool:
+    if _synced_on.get(ticker) == today:
+        return False
+    failed = _failed.get(ticker)
+    return failed is None or failed[1] <= now
+
+
+def _record_failure(ticker: str, now: datetime):
+    count = _failed.get(ticker, (0, now))[0] + 1
+    delay = min(HISTORY_RETRY_SECONDS * 2 ** (count - 1), HISTORY_RETRY_MAX_SECONDS)
+    _failed[ticker] = (count, now + timedelta(seconds=delay))
+
+
+def sync_histories(db, tickers: list[str]) -> int:
+    """
+    Papildo vietinę istoriją keliems tickeriams:
+    - be istorijos – pilnas backfill (period="max"), vienu užklausimu
+    - su istorija – nuo anksčiausios paskutinės datos, vienu užklausimu
+    Šiandienos (dar neuždaryto) baro nesaugom.
+
+    Šaltinis klaidą grąžina kaip tuščią atsakymą, todėl sinchronizuotu
+    dienai laikomas tik tickeris, kuriam barų gauta, arba kuriam naujų
+    barų ir neturėjo būti (savaitgalis). Kiti kartojami su backoff
+    (HISTORY_RETRY_SECONDS, 2x, ... iki HISTORY_RETRY_MAX_SECONDS).
+    Grąžina įrašytų barų skaičių.
+    """
+    today = date.today()
+    now = datetime.utcnow()
+    todo = [t for t in dict.fromkeys(tickers) if _needs_sync(t, today, now)]
+    if not todo:
+        return 0
+
+    lasts = get_last_dates(db, todo)
+
+    backfill = [t for t in todo if t not in lasts]
+    incremental = [t for t in todo if t in lasts and lasts[t] < today - timedelta(days=1)]
+    synced = [t for t in todo if t in lasts and t not in incremental]
+
+    stored = 0
+    if backfill:
+        histories = get_price_provider().histories(backfill)
+        stored += _store_bars(db, histories, lasts)
+        synced += [t for t in backfill if t in histories]
+    if incremental:
+        start = min(lasts[t] for t in incremental) + timedelta(days=1)
+        histories = get_price_provider().histories(incremental, start)
+        stored += _store_bars(db, histories, lasts)
+        synced += [
+            t for t in incremental
+            if t in histories or not _expects_bars(lasts[t], today)
+        ]
+
+    for ticker in synced:
+        _synced_on[ticker] = today
+        _failed.pop(ticker, None)
+    for ticker in set(todo) - set(synced):
+        _record_failure(ticker, now)
+
+    return stored
+
+
+def schedule_sync(tickers: list[str]) -> bool:
+    """
+    Papildo istoriją fono thread'e (vienu metu – vienas; nauji tickeriai
+    prijungiami prie vykstančio). Užklausos naudoja tai, kas jau saugoma;
+    atsiradę barai padidina bars_version ir išvestiniai cache'ai pasensta.
+    Grąžina True, jei yra ką sinchronizuoti.
+    """
+    global _background_running
+
+    today = date.today()
+    now = datetime.utcnow()
+    todo = [t for t in dict.fromkeys(tickers) if _needs_sync(t, today, now)]
+    if not todo:
+        return False
+
+    with _background_lock:
+        _background_pending.update(todo)
+        if _background_running:
+            return True
+        _background_running = True
+
+    threading.Thread(
+        target=_run_background_sync,
+        name="history-sync",
+        daemon=True,
+    ).start()
+    return True
+
+
+def _run_background_sync():
+    global _background_running
+
+    while True:
+        with _background_lock:
+            batch = sorted(_background_pending)
+            _background_pending.clear()
+            if not batch:
+                _background_running = False
+                return
+
+        db = SessionLocal()
+        try:
+            sync_histories(db, batch)
+        except Exception as e:
+            print(f"❌ Istorijos sinchronizacija nepavyko: {e}")
+        finally:
+            db.close()
+
+
+def sync_history(db, ticker: str) -> int:
+    return sync_histories(db, [ticker])
+
+
+def get_all_time_high(ticker: str) -> float | None:
+    """
+    Visų laikų aukščiausia Close kaina iš vietinės istorijos.
+    """
+    db = SessionLocal()
+    try:
+        sync_history(db, ticker)
+        return (
+            db.query(func.max(PriceHistory.close))
+            .filter(PriceHistory.ticker == ticker)
+            .scalar()
+        )
+    finally:
+        db.close()
+
+
+def get_cached_close_on_or_before(db, ticker: str, on_date: date) -> float | None:
+    """
+    Close kaina datai tik iš vietinės istorijos (be tinklo).
+    None, jei saugoma istorija dar nesiekia on_date.
+    """
+    last = get_last_date(db, ticker)
+    if last is None or last < on_date:
+        return None
+
+    return (
+        db.query(PriceHistory.close)
+        .filter(
+            PriceHistory.ticker == ticker,
+            PriceHistory.date <= on_date,
+        )
+        .order_by(PriceHistory.date.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
+def get_closes_on_or_before(tickers: list[str], on_date: date) -> dict[str, float]:
+    """
+    Close kainos konkrečiai datai keliems tickeriams.
+    Jei rinka nedirbo – paskutinė ankstesnė. Trūkstama istorija
+    papildoma vienu grupuotu užklausimu.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+
+    db = SessionLocal()
+    try:
+        lasts = get_last_dates(db, tickers)
+        stale = [t for t in tickers if t not in lasts or lasts[t] < on_date]
+        if stale:
+            sync_histories(db, stale)
+
+        latest = (
+            db.query(
+                PriceHistory.ticker,
+                func.max(PriceHistory.date).label("date"),
+            )
+            .filter(
+                PriceHistory.ticker.in_(tickers),
+                PriceHistory.date <= on_date,
+            )
+            .group_by(PriceHistory.ticker)
+            .subquery()
+        )
+
+        return dict(
+            db.query(PriceHistory.ticker, PriceHistory.close)
+            .join(
+                latest,
+                (PriceHistory.ticker == latest.c.ticker)
+                & (PriceHistory.date == latest.c.date),
+            )
+            .all()
+        )
+    finally:
+        db.close()
+
+
+def get_close_on_or_before(ticker: str, on_date: date) -> float | None:
+    """
+    Close kaina konkrečiai datai.
+    Jei rinka nedirbo – paskutinė ankstesnė.
+    """
+    return get_closes_on_or_before([ticker], on_date).get(ticker)
+
+
+def prewarm_year_boundaries(tickers: list[str], years: list[int]) -> dict[int, int]:
+    """
+    Iš anksto užpildo sausio 1 d. kainas (YTD bazėms).
+    Trūkstama istorija parsiunčiama grupuotai – ne po tickerį.
+    Grąžina metai → kiek tickerių kainą turi.
+    """
+    return {
+        year: len(get_closes_on_or_before(tickers, date(year, 1, 1)))
+        for year in sorted(years)
+    }
+
+
+def invalidate_history(db, ticker: str) -> int:
+    """
+    Po split'o: ištrina VISUS saugotus tickerio barus (auto_adjust
+    perskaičiuoja ir senuosius – dalinis trynimas paliktų nekoreguotus)
+    ir ATH, kad jis būtų iš naujo apskaičiuotas iš pataisytos istorijos
+    (kitaip senas ATH sukeltų netikrą kritimo alertą).
+    Grąžina ištrintų barų skaičių.
+    """
+    deleted = (
+        db.query(PriceHistory)
+        .filter(PriceHistory.ticker == ticker)
+        .delete(synchronize_session=False)
+    )
+    db.query(ETF).filter(ETF.ticker == ticker).update(
+        {
+            "ath_price": None,
+            "ath_updated_at": None,
+            "ath_alert_sent": False,
+            "manual_reset_at": None,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+    _synced_on.pop(ticker, None)
+    _failed.pop(ticker, None)
+    _bump_bars_version()
+    return deleted
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "prewarm"
+    db = SessionLocal()
+    try:
+        if command == "invalidate":
+            ticker = sys.argv[2].upper()
+            deleted = invalidate_history(db, ticker)
+            print(f"🗑️ {ticker}: ištrinta barų {deleted}")
+        else:
+            years = [int(y) for y in sys.argv[2:]] or [date.today().year]
+            tickers = [t for (t,) in db.query(ETF.ticker).all()]
+            for year, found in prewarm_year_boundaries(tickers, years).items():
+                print(f"📅 {year}-01-01: kainos {found}/{len(tickers)} tickerių")
+    finally:
+        db.close()
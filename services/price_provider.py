@@ -0,0 +1,214 @@
+"""
+Kainų šaltinio sąsaja: dabartinė kaina, kelių tickerių kainos, istorija, ATH.
+
+Šaltinis parenkamas PRICE_PROVIDER (ENV):
+- yfinance – Yahoo per yfinance (numatytasis; importuojamas tik naudojant)
+- record   – kaip yfinance, bet atsakymai įrašomi į PRICE_RECORD_DIR
+- replay   – atsakymai iš PRICE_RECORD_DIR atmintyje, be tinklo
+
+Kviečiantieji naudoja tik get_price_provider(); naują šaltinį galima
+įdėti neliečiant price_checker / price_history.
+
+Įrašų katalogas:
+    quotes.json              – ticker → paskutinė kaina
+    history/<TICKER>.json    – dienos barai [{date, open, high, low, close}]
+"""
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import date
+from urllib.parse import quote
+
+from config import PRICE_PROVIDER, PRICE_RECORD_DIR
+
+
+class PriceProvider(ABC):
+    """
+    Bazinė klasė. Backend'as privalo realizuoti current_prices() ir
+    histories() (nepilnas backend'as nesukuriamas – TypeError);
+    pavieniai variantai ir ATH išvedami iš jų.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def current_prices(self, tickers: list[str]) -> dict[str, float]:
+        """
+        Naujausios kainos; tickeriai be duomenų į rezultatą nepatenka.
+        """
+
+    @abstractmethod
+    def histories(
+        self,
+        tickers: list[str],
+        start: date | None = None,
+    ) -> dict[str, list[dict]]:
+        """
+        Dienos OHLC barai nuo `start` (imtinai; None – visa istorija).
+        """
+
+    def current_price(self, ticker: str) -> float | None:
+        return self.current_prices([ticker]).get(ticker)
+
+    def history(self, ticker: str, start: date | None = None) -> list[dict]:
+        return self.histories([ticker], start).get(ticker, [])
+
+    def all_time_high(self, ticker: str) -> float | None:
+        bars = self.history(ticker)
+        return max((bar["close"] for bar in bars), default=None)
+
+
+# =========================================================
+# Įrašų failai (record / replay)
+# =========================================================
+def _history_path(directory: str, ticker: str) -> str:
+    # ^GSPC, BRK-B, VWCE.DE → saugūs failų vardai
+    return os.path.join(directory, "history", quote(ticker, safe="") + ".json")
+
+
+def _read_json(path: str, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _write_json(path: str, data):
+    # Atomiškai: replay niekada nemato pusiau įrašyto failo
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _bars_to_json(bars: list[dict]) -> list[dict]:
+    return [{**bar, "date": bar["date"].isoformat()} for bar in bars]
+
+
+def _bars_from_json(rows: list[dict]) -> list[dict]:
+    return [{**row, "date": date.fromisoformat(row["date"])} for row in rows]
+
+
+class RecordingProvider(PriceProvider):
+    """
+    Perduoda užklausas vidiniam šaltiniui ir įrašo atsakymus.
+    Istorija sujungiama pagal datą, tad inkrementiniai užklausimai
+    papildo jau įrašytą.
+    """
+
+    name = "record"
+
+    def __init__(self, inner: PriceProvider, directory: str = PRICE_RECORD_DIR):
+        self.inner = inner
+        self.directory = directory
+        # Kainų batch'ai ateina iš kelių thread'ų vienu metu
+        self._lock = threading.Lock()
+        self._quotes = _read_json(os.path.join(directory, "quotes.json"), {})
+
+    def current_prices(self, tickers: list[str]) -> dict[str, float]:
+        prices = self.inner.current_prices(tickers)
+        if prices:
+            with self._lock:
+                self._quotes.update(prices)
+                _write_json(os.path.join(self.directory, "quotes.json"), self._quotes)
+        return prices
+
+    def histories(self, tickers: list[str], start: date | None = None) -> dict[str, list[dict]]:
+        result = self.inner.histories(tickers, start)
+        with self._lock:
+            for ticker, bars in result.items():
+                path = _history_path(self.directory, ticker)
+                merged = {row["date"]: row for row in _read_json(path, [])}
+                merged.update((row["date"], row) for row in _bars_to_json(bars))
+                _write_json(path, [merged[d] for d in sorted(merged)])
+        return result
+
+
+class ReplayProvider(PriceProvider):
+    """
+    Atsakymai iš įrašų: be tinklo, deterministiškai, atminties greičiu
+    (istorija užkraunama pirmo kreipimosi metu ir laikoma atmintyje).
+    Dabartinė kaina – įrašyta kaina arba paskutinis istorijos Close.
+    """
+
+    name = "replay"
+
+    def __init__(self, directory: str = PRICE_RECORD_DIR):
+        self.directory = directory
+        self._quotes: dict[str, float] = _read_json(os.path.join(directory, "quotes.json"), {})
+        self._histories: dict[str, list[dict]] = {}
+        self._lock = threading.Lock()
+
+    def _history(self, ticker: str) -> list[dict]:
+        bars = self._histories.get(ticker)
+        if bars is None:
+            bars = _bars_from_json(_read_json(_history_path(self.directory, ticker), []))
+            with self._lock:
+                self._histories[ticker] = bars
+        return bars
+
+    def current_prices(self, tickers: list[str]) -> dict[str, float]:
+        prices = {}
+        for ticker in tickers:
+            price = self._quotes.get(ticker)
+            if price is None:
+                bars = self._history(ticker)
+                price = bars[-1]["close"] if bars else None
+            if price is not None:
+                prices[ticker] = price
+        return prices
+
+    def histories(self, tickers: list[str], start: date | None = None) -> dict[str, list[dict]]:
+        result = {}
+        for ticker in tickers:
+            bars = self._history(ticker)
+            if start is not None:
+                bars = [bar for bar in bars if bar["date"] >= start]
+            if bars:
+                result[ticker] = bars
+        return result
+
+
+# =========================================================
+# Aktyvus šaltinis
+# =========================================================
+_provider: PriceProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def build_price_provider(kind: str = PRICE_PROVIDER, directory: str = PRICE_RECORD_DIR) -> PriceProvider:
+    if kind == "replay":
+        return ReplayProvider(directory)
+
+    from services.yf_service import YFinanceProvider
+
+    if kind == "record":
+        return RecordingProvider(YFinanceProvider(), directory)
+    if kind == "yfinance":
+        return YFinanceProvider()
+
+    raise ValueError(f"❌ Nežinomas PRICE_PROVIDER: {kind!r} (yfinance / record / replay)")
+
+
+def get_price_provider() -> PriceProvider:
+    global _provider
+
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = build_price_provider()
+    return _provider
+
+
+def set_price_provider(provider: PriceProvider) -> PriceProvider | None:
+    """
+    Pakeičia aktyvų šaltinį (benchmarkams / testams). Grąžina ankstesnį.
+    """
+    global _provider
+
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
@@ -0,0 +1,271 @@
+"""
+Užklausų profiliavimas: kur dingsta dashboard'o užklausos laikas
+(SQL, Yahoo ar Python / Jinja).
+
+- ProfilingMiddleware: maršruto trukmės histograma (GET /metrics),
+  SQL užklausų skaičius / laikas ir kainų užklausimų laikas kiekvienai
+  užklausai → Server-Timing antraštė, lėtos užklausos – į logą
+- instrument_engine(): before/after_cursor_execute įvykiai; užklausos,
+  lėtesnės nei SLOW_QUERY_MS, logojamos su parametrais (ir scheduleryje)
+- ?profile=1 (tik jei PROFILE_REQUESTS=1): vietoje atsakymo grąžinama
+  cProfile ataskaita; vienu metu profiliuojama tik viena užklausa
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+
+from config import PROFILE_REQUESTS, SLOW_QUERY_MS, SLOW_REQUEST_MS
+from services.metrics import registry
+
+REQUEST_SECONDS = registry.histogram(
+    "etf_http_request_duration_seconds",
+    "HTTP užklausos trukmė pagal maršrutą",
+    ("method", "route", "status"),
+)
+REQUEST_SQL_QUERIES = registry.histogram(
+    "etf_http_request_sql_queries",
+    "SQL užklausų skaičius vienai HTTP užklausai",
+    ("route",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+SLOW_QUERIES = registry.counter(
+    "etf_sql_slow_queries_total",
+    "SQL užklausos, lėtesnės nei SLOW_QUERY_MS",
+)
+
+# Kiek simbolių parametrų rodyti lėtų užklausų loge (executemany – ilgi sąrašai)
+SLOW_QUERY_PARAMS_CHARS = 500
+PROFILE_REPORT_LINES = 40
+
+
+class RequestStats:
+    """
+    Vienos HTTP užklausos suvestinė. Laikoma ContextVar'e – FastAPI
+    threadpool'as kontekstą perduoda, tad sync endpoint'ai ją mato.
+    """
+
+    __slots__ = ("sql_count", "sql_seconds", "price_count", "price_seconds", "profilers")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.price_count = 0
+        self.price_seconds = 0.0
+        self.profilers: list[cProfile.Profile] | None = None
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+# cProfile vienu metu – tik vienai užklausai
+_profile_lock = threading.Lock()
+
+
+# =========================================================
+# SQL
+# =========================================================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += elapsed
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        params = repr(parameters)
+        if len(params) > SLOW_QUERY_PARAMS_CHARS:
+            params = params[:SLOW_QUERY_PARAMS_CHARS] + "…"
+        print(
+            f"🐢 Lėta SQL užklausa {elapsed * 1000:.1f} ms"
+            f"{' (executemany)' if executemany else ''}: "
+            f"{' '.join(statement.split())} | {params}"
+        )
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# =========================================================
+# Kainų užklausimai (Yahoo)
+# =========================================================
+@contextmanager
+def price_call():
+    """
+    Išorinio kainų užklausimo laikas einamosios HTTP užklausos suvestinei.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.price_count += 1
+            stats.price_seconds += time.perf_counter() - start
+
+
+# =========================================================
+# cProfile sync endpoint'ams
+# =========================================================
+def _install_threadpool_profiling():
+    """
+    Sync endpoint'ai vykdomi threadpool'e, o cProfile mato tik savo
+    thread'ą. Profiliuojamai užklausai endpoint'as paleidžiamas su
+    atskiru profiler'iu tame thread'e; kitoms – be pakeitimų.
+    """
+    import fastapi.routing
+
+    original = fastapi.routing.run_in_threadpool
+    if getattr(original, "_profiling", False):
+        return
+
+    async def run_in_threadpool(func, *args, **kwargs):
+        stats = _current.get()
+        if stats is None or stats.profilers is None:
+            return await original(func, *args, **kwargs)
+
+        profiler = cProfile.Profile()
+        stats.profilers.append(profiler)
+
+        def call():
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+
+        return await original(call)
+
+    run_in_threadpool._profiling = True
+    fastapi.routing.run_in_threadpool = run_in_threadpool
+
+
+def _profile_report(profilers: list[cProfile.Profile], title: str) -> bytes:
+    out = io.StringIO()
+    out.write(f"{title}\n\n")
+    stats = pstats.Stats(profilers[0], stream=out)
+    for profiler in profilers[1:]:
+        stats.add(profiler)
+    stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LINES)
+    return out.getvalue().encode()
+
+
+# =========================================================
+# Middleware
+# =========================================================
+def _route_label(scope) -> str:
+    # Maršruto šablonas (/admin/api/purchases/{purchase_id}), ne konkretus kelias
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+def _server_timing(stats: RequestStats, total: float) -> bytes:
+    # Antraštės – tik ASCII
+    other = max(total - stats.sql_seconds - stats.price_seconds, 0.0)
+    return (
+        f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.sql_count} queries", '
+        f'price;dur={stats.price_seconds * 1000:.1f};desc="{stats.price_count} price calls", '
+        f'app;dur={other * 1000:.1f};desc="Python / Jinja", '
+        f"total;dur={total * 1000:.1f}"
+    ).encode("ascii")
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        if PROFILE_REQUESTS:
+            _install_threadpool_profiling()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = {"code": 500, "stream": False}
+
+        profiler = None
+        if PROFILE_REQUESTS and parse_qs(scope.get("query_string", b"").decode()).get("profile") == ["1"]:
+            if _profile_lock.acquire(blocking=False):
+                profiler = cProfile.Profile()
+                stats.profilers = [profiler]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                status["stream"] = any(
+                    k == b"content-type" and v.startswith(b"text/event-stream")
+                    for k, v in headers
+                )
+                # Įprastas Response siunčia antraštes jau po endpoint'o ir šablono
+                headers.append(
+                    (b"server-timing", _server_timing(stats, time.perf_counter() - start))
+                )
+                message = {**message, "headers": headers}
+            if profiler is None:
+                await send(message)
+
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - start
+            route = _route_label(scope)
+
+            # SSE jungtys gyvena valandas – jų trukmė ne latency
+            if not status["stream"]:
+                REQUEST_SECONDS.observe(
+                    total, method=scope["method"], route=route, status=status["code"]
+                )
+                REQUEST_SQL_QUERIES.observe(stats.sql_count, route=route)
+
+                if total * 1000 >= SLOW_REQUEST_MS:
+                    print(
+                        f"🐢 Lėta užklausa {scope['method']} {route} {total * 1000:.0f} ms | "
+                        f"SQL {stats.sql_count}× / {stats.sql_seconds * 1000:.0f} ms | "
+                        f"kainos {stats.price_count}× / {stats.price_seconds * 1000:.0f} ms"
+                    )
+
+            if profiler is not None:
+                _profile_lock.release()
+
+        if profiler is not None:
+            title = (
+                f"{scope['method']} {scope['path']} → {status['code']} | "
+                f"{total * 1000:.1f} ms | SQL {stats.sql_count}× / {stats.sql_seconds * 1000:.1f} ms | "
+                f"kainos {stats.price_count}× / {stats.price_seconds * 1000:.1f} ms"
+            )
+            body = _profile_report(stats.profilers, title)
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"server-timing", _server_timing(stats, total)),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,199 @@
+"""
+Masinis pirkimų (BUY / SELL) importas iš CSV.
+
+Vietoje create_purchase() kiekvienai eilutei (commit + YTD invalidacija +
+get_units_until per eilutę):
+- CSV skaitomas srautu, eilutė po eilutės
+- SELL galimumas tikrinamas vienu chronologiniu perėjimu per ETF
+- įrašoma executemany dalimis, viena transakcija
+- pozicijos / YTD atnaujinami vieną kartą pabaigoje
+
+CSV stulpeliai: ticker, side, units, price, purchased_at[, currency, comment]
+
+CLI:
+    python -m services.purchase_import trades.csv [--dry-run]
+"""
+import csv
+import math
+import sys
+from datetime import datetime
+from itertools import groupby
+from typing import Iterable
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import ETF, Purchase
+from services.positions import UNITS_EPSILON, refresh_position
+from services.ytd_service import invalidate_current_year_ytd
+
+IMPORT_CHUNK_SIZE = 5000
+REQUIRED_COLUMNS = ("ticker", "side", "units", "price", "purchased_at")
+
+
+def _number(record: dict, column: str) -> float:
+    # float() priima ir nan / inf – vienas toks įrašas sugadintų pozicijas
+    value = float(record[column])
+    if not math.isfinite(value):
+        raise ValueError(f"{column} must be a finite number, got {record[column]!r}")
+    return value
+
+
+def parse_rows(lines: Iterable[str], etf_ids: dict[str, int]) -> tuple[list[dict], list[dict]]:
+    """
+    Perskaito CSV srautą. Grąžina (tinkamos eilutės, klaidos).
+    Eilutės numeris – kaip faile (antraštė = 1).
+    """
+    reader = csv.DictReader(lines)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        return [], [{"line": 1, "error": f"Missing columns: {', '.join(missing)}"}]
+
+    rows = []
+    errors = []
+    for line, record in enumerate(reader, start=2):
+        try:
+            ticker = (record["ticker"] or "").strip().upper()
+            etf_id = etf_ids.get(ticker)
+            if etf_id is None:
+                raise ValueError(f"Unknown ticker {ticker!r}")
+
+            side = (record["side"] or "").strip().upper()
+            if side not in ("BUY", "SELL"):
+                raise ValueError(f"Side must be BUY or SELL, got {side!r}")
+
+            units = abs(_number(record, "units"))
+            if units == 0:
+                raise ValueError("Units must not be zero")
+
+            rows.append({
+                "line": line,
+                "etf_id": etf_id,
+                "units": -units if side == "SELL" else units,
+                "price": _number(record, "price"),
+                "purchased_at": datetime.fromisoformat(record["purchased_at"].strip()),
+                "currency": (record.get("currency") or "EUR").strip().upper(),
+                "comment": record.get("comment") or "",
+            })
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append({"line": line, "error": str(e)})
+
+    return rows, errors
+
+
+def check_sells(db: Session, rows: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Vienas chronologinis perėjimas per kiekvieną ETF: esami sandoriai
+    (nuo anksčiausios importo datos) sujungiami su importuojamais.
+    SELL priimamas, jei tą akimirką turėta pakankamai vienetų
+    (kaip get_units_until: įskaitomi sandoriai su data <= SELL data).
+    """
+    accepted = []
+    errors = []
+
+    # Tą pačią akimirką: pirma BUY, tada SELL; toliau – failo tvarka
+    ordered = sorted(
+        rows,
+        key=lambda r: (r["etf_id"], r["purchased_at"], r["units"] < 0, r["line"]),
+    )
+
+    for etf_id, group in groupby(ordered, key=lambda r: r["etf_id"]):
+        group = list(group)
+        since = group[0]["purchased_at"]
+
+        held = (
+            db.query(func.coalesce(func.sum(Purchase.units), 0.0))
+            .filter(Purchase.etf_id == etf_id, Purchase.purchased_at < since)
+            .scalar()
+        )
+        existing = (
+            db.query(Purchase.purchased_at, Purchase.units)
+            .filter(Purchase.etf_id == etf_id, Purchase.purchased_at >= since)
+            .order_by(Purchase.purchased_at)
+            .all()
+        )
+
+        i = 0
+        for row in group:
+            while i < len(existing) and existing[i].purchased_at <= row["purchased_at"]:
+                held += existing[i].units
+                i += 1
+
+            if row["units"] < 0 and -row["units"] > held + UNITS_EPSILON:
+                errors.append({
+                    "line": row["line"],
+                    "error": f"Cannot sell {-row['units']}, only {round(held, 8)} available",
+                })
+                continue
+
+            held += row["units"]
+            accepted.append(row)
+
+    return accepted, errors
+
+
+def import_purchases(db: Session, lines: Iterable[str], dry_run: bool = False) -> dict:
+    """
+    Importuoja CSV srautą. Blogos eilutės praleidžiamos ir grąžinamos
+    ataskaitoje; tinkamos įrašomos viena transakcija.
+    """
+    etf_ids = {t: i for i, t in db.query(ETF.id, ETF.ticker).all()}
+
+    rows, errors = parse_rows(lines, etf_ids)
+    accepted, sell_errors = check_sells(db, rows)
+    errors = sorted(errors + sell_errors, key=lambda e: e["line"])
+
+    report = {
+        "inserted": 0 if dry_run else len(accepted),
+        "valid": len(accepted),
+        "rejected": len(errors),
+        "dry_run": dry_run,
+        "errors": errors,
+    }
+    if dry_run or not accepted:
+        return report
+
+    # Core insert per lentelę – be ORM bulk kelio (jis brangesnis už patį SQLite)
+    for start in range(0, len(accepted), IMPORT_CHUNK_SIZE):
+        db.execute(
+            insert(Purchase.__table__),
+            [
+                {k: v for k, v in row.items() if k != "line"}
+                for row in accepted[start:start + IMPORT_CHUNK_SIZE]
+            ],
+        )
+
+    # Pozicijos – po vieną perskaičiavimą kiekvienam ETF
+    for etf_id in {r["etf_id"] for r in accepted}:
+        refresh_position(db, etf_id)
+    db.commit()
+
+    # YTD bazę keičia tik sandoriai iki metų pradžios – invaliduojam vieną kartą
+    year_start = datetime(datetime.utcnow().year, 1, 1)
+    if any(r["purchased_at"] < year_start for r in accepted):
+        invalidate_current_year_ytd(db)
+
+    return report
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print("Naudojimas: python -m services.purchase_import trades.csv [--dry-run]")
+        sys.exit(2)
+
+    db = SessionLocal()
+    try:
+        with open(args[0], newline="", encoding="utf-8-sig") as f:
+            report = import_purchases(db, f, dry_run="--dry-run" in sys.argv)
+    finally:
+        db.close()
+
+    for e in report["errors"]:
+        print(f"❌ {e['line']}: {e['error']}")
+    print(
+        f"{'🔎 Patikrinta' if report['dry_run'] else '✅ Importuota'}: "
+        f"{report['valid']} tinkamų, {report['rejected']} atmesta"
+    )
+    sys.exit(1 if report["rejected"] else 0)
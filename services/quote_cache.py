@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.sqlite import insert
+
+from config import (
+    QUOTE_CACHE_TTL_SECONDS,
+    QUOTE_CACHE_MAX_SIZE,
+    QUOTE_CACHE_PERSIST,
+)
+from database import SessionLocal
+from models import Quote
+
+
+class QuoteCache:
+    """
+    Procese bendras kainų cache (ticker → kaina):
+    - TTL: senesnės nei ttl_seconds kainos laikomos nebegaliojančiomis
+    - max_size + LRU: seniausiai naudotas tickeris išmetamas pirmas
+    - persist: kainos papildomai rašomos į `quotes` lentelę
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int, persist: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.persist = persist
+
+        self._items = OrderedDict()  # ticker -> (price, fetched_at epoch)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------
+    # Skaitymas
+    # -------------------------
+    def get(self, ticker: str) -> float | None:
+        return self.get_many([ticker]).get(ticker)
+
+    def get_many(self, tickers: list[str]) -> dict[str, float]:
+        now = time.time()
+        found = {}
+        missing = []
+
+        with self._lock:
+            for ticker in tickers:
+                item = self._items.get(ticker)
+                if item and now - item[1] <= self.ttl_seconds:
+                    self._items.move_to_end(ticker)
+                    found[ticker] = item[0]
+                else:
+                    missing.append(ticker)
+
+        if missing and self.persist:
+            for ticker, (price, fetched_at) in self._load(missing).items():
+                if now - fetched_at <= self.ttl_seconds:
+                    self._remember(ticker, price, fetched_at)
+                    found[ticker] = price
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(tickers) - len(found)
+
+        return found
+
+    # -------------------------
+    # Rašymas
+    # -------------------------
+    def put(self, ticker: str, price: float):
+        self.put_many({ticker: price})
+
+    def put_many(self, prices: dict[str, float]):
+        if not prices:
+            return
+
+        now = time.time()
+        for ticker, price in prices.items():
+            self._remember(ticker, price, now)
+
+        if self.persist:
+            self._store(prices, datetime.utcfromtimestamp(now))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+    # -------------------------
+    # Vidiniai
+    # -------------------------
+    def _remember(self, ticker: str, price: float, fetched_at: float):
+        with self._lock:
+            self._items[ticker] = (price, fetched_at)
+            self._items.move_to_end(ticker)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def _load(self, tickers: list[str]) -> dict[str, tuple[float, float]]:
+        db = SessionLocal()
+        try:
+            rows = db.query(Quote).filter(Quote.ticker.in_(tickers)).all()
+            return {
+                q.ticker: (
+                    q.price,
+                    q.fetched_at.replace(tzinfo=timezone.utc).timestamp(),
+                )
+                for q in rows
+            }
+        except Exception as e:
+            print(f"Klaida skaitant quotes lentelę: {e}")
+            return {}
+        finally:
+            db.close()
+
+    def _store(self, prices: dict[str, float], fetched_at: datetime):
+        rows = [
+            {"ticker": t, "price": p, "fetched_at": fetched_at}
+            for t, p in prices.items()
+        ]
+        stmt = insert(Quote)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Quote.ticker],
+            set_={
+                "price": stmt.excluded.price,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+        )
+
+        db = SessionLocal()
+        try:
+            db.execute(stmt, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Klaida rašant quotes lentelę: {e}")
+        finally:
+            db.close()
+
+
+quote_cache = QuoteCache(
+    ttl_seconds=QUOTE_CACHE_TTL_SECONDS,
+    max_size=QUOTE_CACHE_MAX_SIZE,
+    persist=QUOTE_CACHE_PERSIST,
+)
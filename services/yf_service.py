@@ -1,71 +1,187 @@
-import yfinance as yf
+"""
+yfinance kainų šaltinis (PRICE_PROVIDER=yfinance).
+
+yfinance (ir pandas) importuojami tik pirmo užklausimo metu, tad
+replay režimas ir įrankiai be tinklo jų nekrauna.
+"""
 from datetime import date
 
+from services.price_provider import PriceProvider
+from services.profiling import price_call
+
 
-def fetch_current_price_yf(ticker: str) -> float | None:
+def _ticker_frame(data, ticker: str):
     """
-    Grąžina naujausią uždarymo kainą (Close).
+    Vieno tickerio OHLC stulpeliai iš (galimai grupuoto) yf.download rezultato.
+    Grąžina None, jei tickerio rezultate nėra.
     """
-    try:
-        data = yf.download(
-            ticker,
-            period="5d",
-            progress=False,
-            auto_adjust=True
-        )
+    if data.columns.nlevels == 1:
+        return data
 
-        if data.empty:
-            return None
+    if ticker in data.columns.get_level_values(0):
+        return data[ticker]
+    if ticker in data.columns.get_level_values(-1):
+        return data.xs(ticker, axis=1, level=-1)
+
+    return None
 
-        return data["Close"].iloc[-1].item()
 
-    except Exception as e:
-        print(f"Klaida gaunant dabartinę kainą {ticker}: {e}")
+def _last_close(data, ticker: str) -> float | None:
+    """
+    Ištraukia paskutinę Close kainą iš (galimai grupuoto) yf.download rezultato.
+    """
+    frame = _ticker_frame(data, ticker)
+    if frame is None:
         return None
 
+    close = frame["Close"].dropna()
+    if close.empty:
+        return None
+
+    return float(close.iloc[-1])
+
+
+def _bars(frame) -> list[dict]:
+    frame = frame.dropna(subset=["Close"])
+
+    return [
+        {
+            "date": idx.date(),
+            "open": float(o),
+            "high": float(h),
+            "low": float(lo),
+            "close": float(c),
+        }
+        for idx, o, h, lo, c in zip(
+            frame.index,
+            frame["Open"],
+            frame["High"],
+            frame["Low"],
+            frame["Close"],
+        )
+    ]
+
 
-def fetch_historical_price_yf(ticker: str, on_date: date) -> float | None:
+class YFinanceProvider(PriceProvider):
     """
-    Grąžina Close kainą konkrečiai datai.
-    Jei rinka nedirbo – ima paskutinę ankstesnę.
+    yf_module – yfinance pakaitalas su download() (benchmarkų FakeYahoo);
+    None – tikras yfinance, importuojamas tingiai.
     """
-    try:
-        data = yf.download(
-            ticker,
-            end=on_date.isoformat(),
-            progress=False,
-            auto_adjust=True
-        )
 
-        if data.empty:
-            return None
+    name = "yfinance"
 
-        return data["Close"].iloc[-1].item()
+    def __init__(self, yf_module=None):
+        self._yf = yf_module
 
-    except Exception as e:
-        print(f"Klaida gaunant istorinę kainą {ticker}: {e}")
-        return None
+    @property
+    def yf(self):
+        if self._yf is None:
+            import yfinance
 
+            self._yf = yfinance
+        return self._yf
 
-def get_all_time_high(ticker: str) -> float | None:
-    """
-    Grąžina visų laikų aukščiausią Close kainą.
-    Naudojama ATH cache'ui.
-    """
-    try:
-        data = yf.download(
-            ticker,
-            period="max",
-            progress=False,
-            auto_adjust=True
-        )
+    def current_price(self, ticker: str) -> float | None:
+        """
+        Grąžina naujausią uždarymo kainą (Close).
+        """
+        try:
+            with price_call():
+                data = self.yf.download(
+                    ticker,
+                    period="5d",
+                    progress=False,
+                    auto_adjust=True
+                )
 
-        if data.empty:
-            return None
+            if data.empty:
+                return None
 
-        return data["Close"].max().item()
+            return data["Close"].iloc[-1].item()
 
-    except Exception as e:
-        print(f"Klaida gaunant ATH {ticker}: {e}")
-        return None
+        except Exception as e:
+            print(f"Klaida gaunant dabartinę kainą {ticker}: {e}")
+            return None
 
+    def current_prices(self, tickers: list[str]) -> dict[str, float]:
+        """
+        Grąžina naujausias Close kainas keliems tickeriams vienu užklausimu.
+        Tickeriai be duomenų į rezultatą nepatenka.
+        """
+        if not tickers:
+            return {}
+
+        try:
+            data = self.yf.download(
+                tickers,
+                period="5d",
+                group_by="ticker",
+                progress=False,
+                auto_adjust=True
+            )
+
+            if data.empty:
+                return {}
+
+            prices = {}
+            for ticker in tickers:
+                price = _last_close(data, ticker)
+                if price is not None:
+                    prices[ticker] = price
+
+            return prices
+
+        except Exception as e:
+            print(f"Klaida gaunant kainas ({len(tickers)} tickeriai): {e}")
+            return {}
+
+    def histories(
+        self,
+        tickers: list[str],
+        start: date | None = None,
+    ) -> dict[str, list[dict]]:
+        """
+        Dienos OHLC barai keliems tickeriams vienu užklausimu nuo `start`
+        (imtinai). Jei start nenurodytas – visa istorija (period="max").
+        Tickeriai be duomenų į rezultatą nepatenka.
+        """
+        if not tickers:
+            return {}
+
+        try:
+            with price_call():
+                if start is None:
+                    data = self.yf.download(
+                        tickers,
+                        period="max",
+                        group_by="ticker",
+                        progress=False,
+                        auto_adjust=True
+                    )
+                else:
+                    data = self.yf.download(
+                        tickers,
+                        start=start.isoformat(),
+                        group_by="ticker",
+                        progress=False,
+                        auto_adjust=True
+                    )
+
+            if data.empty:
+                return {}
+
+            histories = {}
+            for ticker in tickers:
+                frame = _ticker_frame(data, ticker)
+                if frame is None:
+                    continue
+
+                bars = _bars(frame)
+                if bars:
+                    histories[ticker] = bars
+
+            return histories
+
+        except Exception as e:
+            print(f"Klaida gaunant istoriją ({len(tickers)} tickeriai): {e}")
+            return {}
@@ -1,60 +1,269 @@
-from datetime import datetime, date
-from sqlalchemy.orm import Session, joinedload
+"""
+Portfelio vertė metų pradžioje (YTD bazė).
 
-from models import ETF, PortfolioYTD
+Bazė skaičiuojama FONE: užklausa niekada nelaukia Yahoo. Kol nauja
+reikšmė neparuošta, rodoma ankstesnė, pažymėta is_stale. Vienu metu
+vyksta daugiausia vienas perskaičiavimas (single-flight), o visų
+pozicijų sausio 1 d. kainos gaunamos vienu grupuotu istorijos užklausimu.
+
+Pirkimų pakeitimai bazės dažniausiai neliečia: ji priklauso tik nuo
+vienetų, turėtų iki sausio 1 d. Einamųjų metų sandoriai jau įskaičiuoti
+per cash_flows_ytd, o atgaline data įvesti koreguoja bazę inkrementiškai.
+
+Jei dalies sausio 1 d. kainų gauti nepavyko, saugoma dalinė bazė (vis dar
+is_stale), o kitas bandymas – tik po backoff (HISTORY_RETRY_SECONDS, 2x,
+... iki HISTORY_RETRY_MAX_SECONDS), ne kiekvieno skaitymo metu.
+"""
+import threading
+from datetime import datetime, date, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from config import HISTORY_RETRY_MAX_SECONDS, HISTORY_RETRY_SECONDS
+from database import SessionLocal
+from models import ETF, PortfolioYTD, Purchase
+from services.price_history import get_cached_close_on_or_before
+
+_recompute_lock = threading.Lock()
+_recompute_running = False
+
+# Didinama kiekvienos invalidacijos metu: jei ji įvyko skaičiuojant,
+# rezultatas jau pasenęs ir skaičiuojama iš naujo
+_generation = 0
+
+# Nepilnų perskaičiavimų iš eilės ir kada vėl bandyti (None – bet kada)
+_failures = 0
+_retry_at: datetime | None = None
 
 
 def invalidate_current_year_ytd(db: Session):
+    """
+    Pažymi einamųjų metų bazę pasenusia (reikšmė lieka rodymui)
+    ir paleidžia perskaičiavimą fone.
+    """
+    global _generation, _retry_at
+
+    # Karta didinama PRIEŠ žymą: jau vykstantis skaičiavimas arba
+    # pastebės pasikeitimą, arba jo įrašą perrašys is_stale=True.
+    # Duomenys pasikeitė – backoff nebegalioja
+    with _recompute_lock:
+        _generation += 1
+        _retry_at = None
+
     current_year = datetime.utcnow().year
     db.query(PortfolioYTD).filter(
         PortfolioYTD.year == current_year
-    ).delete()
+    ).update({"is_stale": True})
     db.commit()
 
+    schedule_ytd_recompute()
+
+
+def _units_before(trade: tuple[float, datetime] | None, year_start: datetime) -> float:
+    if trade is None:
+        return 0.0
+
+    units, purchased_at = trade
+    if purchased_at is None or purchased_at >= year_start:
+        return 0.0
 
-def ensure_portfolio_ytd(db: Session):
+    return units
+
+
+def apply_purchase_change_to_ytd(
+    db: Session,
+    etf_id: int,
+    old: tuple[float, datetime] | None = None,
+    new: tuple[float, datetime] | None = None,
+):
+    """
+    Atnaujina bazę po pirkimo sukūrimo / keitimo / trynimo (po commit'o).
+    old / new – (units, purchased_at) prieš ir po pakeitimo
+    (None – pirkimo nebuvo / jis ištrintas).
+
+    - einamųjų metų sandoris – bazė nesikeičia, nieko nedarom
+    - atgalinė data – start_value += Δunits × sausio 1 d. kaina iš
+      vietinės istorijos (be tinklo)
+    - jei kainos vietoje nėra arba bazė jau perskaičiuojama – invalidacija
+    """
+    year_start = datetime(datetime.utcnow().year, 1, 1)
+    units_delta = _units_before(new, year_start) - _units_before(old, year_start)
+    if units_delta == 0:
+        return
+
+    # Po užraktu: kol koreguojam, fono perskaičiavimas negali prasidėti
+    # ir perrašyti bazės sena reikšme
+    with _recompute_lock:
+        if not _recompute_running:
+            row = (
+                db.query(PortfolioYTD)
+                .filter(PortfolioYTD.year == year_start.year)
+                .first()
+            )
+            ticker = db.query(ETF.ticker).filter(ETF.id == etf_id).scalar()
+
+            price = None
+            if row is not None and not row.is_stale and ticker:
+                price = get_cached_close_on_or_before(db, ticker, year_start.date())
+
+            if price is not None:
+                row.start_value = round(row.start_value + units_delta * price, 2)
+                db.commit()
+                return
+
+    invalidate_current_year_ytd(db)
+
+
+def ensure_portfolio_ytd(db: Session) -> PortfolioYTD | None:
+    """
+    Grąžina einamųjų metų bazę iš karto (galimai pasenusią arba None).
+    Jei jos nėra arba ji pasenusi – perskaičiavimas paleidžiamas fone
+    (po nepilno perskaičiavimo – ne anksčiau nei baigiasi backoff).
+    """
     current_year = datetime.utcnow().year
-    year_start = date(current_year, 1, 1)
 
     existing = (
         db.query(PortfolioYTD)
         .filter(PortfolioYTD.year == current_year)
         .first()
     )
-    if existing:
+    if (existing is None or existing.is_stale) and _retry_due():
+        schedule_ytd_recompute()
+
+    return existing
+
+
+def _retry_due() -> bool:
+    with _recompute_lock:
+        return _retry_at is None or _retry_at <= datetime.utcnow()
+
+
+def _record_result(complete: bool):
+    # Kviečiama po _recompute_lock
+    global _failures, _retry_at
+
+    if complete:
+        _failures = 0
+        _retry_at = None
         return
 
-    etfs = (
-        db.query(ETF)
-        .options(joinedload(ETF.purchases))
-        .all()
-    )
+    _failures += 1
+    delay = min(HISTORY_RETRY_SECONDS * 2 ** (_failures - 1), HISTORY_RETRY_MAX_SECONDS)
+    _retry_at = datetime.utcnow() + timedelta(seconds=delay)
 
-    start_value = 0.0
 
-    from services.price_checker import fetch_historical_price
+def schedule_ytd_recompute() -> bool:
+    """
+    Paleidžia perskaičiavimą fono thread'e, jei jis dar nevyksta.
+    Grąžina True, jei buvo paleistas naujas.
+    """
+    global _recompute_running
 
-    for etf in etfs:
-        units = sum(
-            p.units
-            for p in etf.purchases
-            if p.purchased_at
-            and p.purchased_at.date() < year_start
-        )
+    with _recompute_lock:
+        if _recompute_running:
+            return False
+        _recompute_running = True
 
-        if units == 0:
-            continue
+    threading.Thread(
+        target=_run_recompute,
+        name="ytd-recompute",
+        daemon=True,
+    ).start()
+    return True
 
-        price = fetch_historical_price(etf.ticker, year_start)
-        if price is None:
-            continue
 
-        start_value += units * price
+def _run_recompute():
+    global _recompute_running
 
-    ytd = PortfolioYTD(
-        year=current_year,
-        start_value=round(start_value, 2),
-    )
+    try:
+        while True:
+            with _recompute_lock:
+                generation = _generation
 
-    db.add(ytd)
-    db.commit()
+            start_value, missing = _compute_start_value()
+
+            with _recompute_lock:
+                if generation != _generation:
+                    continue
+                # Įrašom po užraktu: invalidacija negali įsiterpti tarp
+                # kartos patikros ir is_stale=False. Dalinė bazė lieka
+                # is_stale – kitas bandymas po backoff
+                store_ytd_start_value(start_value, stale=bool(missing))
+                _record_result(not missing)
+                if missing:
+                    print(
+                        f"⚠️ YTD bazė dalinė (trūksta sausio 1 d. kainų: "
+                        f"{', '.join(missing)}), kitas bandymas {_retry_at:%H:%M:%S}"
+                    )
+                break
+    except Exception as e:
+        print(f"❌ YTD bazės perskaičiavimas nepavyko: {e}")
+    finally:
+        with _recompute_lock:
+            _recompute_running = False
+
+
+def compute_ytd_start_value(year: int | None = None) -> float | None:
+    """
+    Pozicijų iki metų pradžios vertė sausio 1 d. kainomis.
+    Vienetai – vienu GROUP BY, kainos – vienu grupuotu užklausimu.
+    None – bent vienam tickeriui kainos negauta (nesaugoti kaip šviežios).
+    """
+    start_value, missing = _compute_start_value(year)
+    return None if missing else start_value
+
+
+def _compute_start_value(year: int | None = None) -> tuple[float, list[str]]:
+    """
+    Kaip compute_ytd_start_value, bet grąžina (vertė be trūkstamų
+    tickerių, tickeriai be sausio 1 d. kainos).
+    """
+    from services.price_checker import fetch_historical_prices
+
+    year = year or datetime.utcnow().year
+    year_start = date(year, 1, 1)
+
+    db = SessionLocal()
+    try:
+        units = {
+            ticker: total
+            for ticker, total in (
+                db.query(ETF.ticker, func.sum(Purchase.units))
+                .join(Purchase, Purchase.etf_id == ETF.id)
+                .filter(Purchase.purchased_at < datetime(year, 1, 1))
+                .group_by(ETF.ticker)
+                .all()
+            )
+            if total
+        }
+    finally:
+        db.close()
+
+    prices = fetch_historical_prices(list(units), year_start)
+
+    missing = [t for t in units if t not in prices]
+    if missing:
+        print(f"❔ Nėra {year_start} kainų: {', '.join(missing)}")
+
+    start_value = round(sum(u * prices[t] for t, u in units.items() if t in prices), 2)
+    return start_value, missing
+
+
+def store_ytd_start_value(start_value: float, year: int | None = None, stale: bool = False):
+    year = year or datetime.utcnow().year
+
+    db = SessionLocal()
+    try:
+        row = db.query(PortfolioYTD).filter(PortfolioYTD.year == year).first()
+        if row is None:
+            db.add(PortfolioYTD(year=year, start_value=start_value, is_stale=stale))
+        else:
+            row.start_value = start_value
+            row.is_stale = stale
+            row.created_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"📅 YTD bazė {year}: {start_value:.2f}")
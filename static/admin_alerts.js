@@ -4,19 +4,26 @@ async function loadEtfs() {
 }
 
 async function loadAlerts() {
-    const res = await fetch("/admin/api/alerts");
+    // Puslapiuotas atsakymas: { items, next_cursor } – naujausi pirma
+    const res = await fetch("/admin/api/alerts?limit=100");
+    const page = await res.json();
+    return page.items;
+}
+
+async function loadLastAlerts() {
+    // Paskutinis alertas kiekvienam ETF (serveris grupuoja) – nepriklauso
+    // nuo to, kas pateko į istorijos puslapį
+    const res = await fetch("/admin/api/alerts/latest");
     return await res.json();
 }
 
-function renderEtfStatus(etfs, alerts) {
+function renderEtfStatus(etfs, lastAlerts) {
     const tbody = document.getElementById("etf-status-body");
     tbody.innerHTML = "";
 
     const lastAlertByEtf = {};
-    for (const a of alerts) {
-        if (!lastAlertByEtf[a.ticker]) {
-            lastAlertByEtf[a.ticker] = a;
-        }
+    for (const a of lastAlerts) {
+        lastAlertByEtf[a.ticker] = a;
     }
 
     for (const etf of etfs) {
@@ -52,12 +59,13 @@ function renderAlertHistory(alerts) {
 }
 
 async function initAdminAlerts() {
-    const [etfs, alerts] = await Promise.all([
+    const [etfs, lastAlerts, alerts] = await Promise.all([
         loadEtfs(),
+        loadLastAlerts(),
         loadAlerts(),
     ]);
 
-    renderEtfStatus(etfs, alerts);
+    renderEtfStatus(etfs, lastAlerts);
     renderAlertHistory(alerts);
 }
 